@@ -0,0 +1,129 @@
+from contextlib import contextmanager
+from django.db import transaction
+from projects.models import ProjectActivity, IssueActivity
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+
+PROJECT = "project"
+CONTRIBUTOR = "contributor"
+ISSUE = "issue"
+COMMENT = "comment"
+
+# Champs techniques : présents dans chaque diff, ils n'apprennent rien
+IGNORED_FIELDS = {"id", "created_time", "updated_at", "version"}
+
+
+def field_values(instance):
+    """
+    Returns the audited field values of a model instance, foreign keys as identifiers.
+    """
+    return {
+        field.name: field.value_from_object(instance)
+        for field in instance._meta.concrete_fields
+        if field.name not in IGNORED_FIELDS
+    }
+
+
+def diff(before, after):
+    """
+    Returns the fields whose value changed, as {field: [old value, new value]}.
+
+    `before` or `after` may be None, for a creation or a deletion.
+    """
+    before = before or {}
+    after = after or {}
+    return {
+        name: [before.get(name), after.get(name)]
+        for name in before.keys() | after.keys()
+        if before.get(name) != after.get(name)
+    }
+
+
+class ActivityRecorder:
+    """
+    Buffers the activity entries of a change and writes them with one INSERT per table.
+
+    Changes are made inside `atomic()`: the buffered entries are inserted at the end of the
+    block, in the same transaction as the change they describe. A change is never committed
+    without its entries, and rolled-back changes are never audited.
+
+    Entries about a project, its contributors, or the deletion of an issue go to
+    `ProjectActivity`; entries about the creation or update of an issue and its comments go
+    to `IssueActivity`. The activity survives its project or issue: the entry recording its
+    deletion, and the older entries, keep `target` and `target_id`.
+
+    Args:
+        actor (User): The user making the request.
+    """
+
+    def __init__(self, actor):
+        self.actor_id = actor.pk
+        self.buffer = []
+
+    @contextmanager
+    def atomic(self):
+        """
+        Runs the block in a transaction, then inserts the entries it recorded in that transaction.
+        """
+        try:
+            with transaction.atomic(savepoint=False):
+                yield self
+                self.flush()
+        finally:
+            # Après une erreur, les entrées annulées avec la transaction ne doivent pas être réécrites
+            self.buffer = []
+
+    def record(self, action, target, instance=None, changes=None, project_id=None, issue_id=None, target_id=None):
+        """
+        Records a change of `instance`, or of an object known only by its parents and id.
+
+        Args:
+            action (str): "create", "update" or "delete".
+            target (str): "project", "contributor", "issue" or "comment".
+            instance (Model): The changed object; its parents are read from it.
+            changes (dict): The field-level diff. Defaults to every field, for a creation
+                or a deletion.
+        """
+        if instance is not None:
+            target_id = instance.pk
+            if changes is None:
+                values = field_values(instance)
+                changes = diff(None, values) if action == CREATE else diff(values, None)
+            if target == PROJECT:
+                # Écrite après la suppression du projet : l'entrée ne peut plus le référencer
+                project_id = None if action == DELETE else instance.pk
+            elif target in (CONTRIBUTOR, ISSUE):
+                project_id = instance.project_id
+            if target == ISSUE:
+                issue_id = instance.pk
+            elif target == COMMENT:
+                issue_id = instance.issue_id
+
+        if target in (PROJECT, CONTRIBUTOR) or (target == ISSUE and action == DELETE):
+            entry = ProjectActivity(project_id=project_id)
+        else:
+            entry = IssueActivity(issue_id=issue_id)
+        entry.action = action
+        entry.target = target
+        entry.target_id = target_id
+        entry.actor_id = self.actor_id
+        entry.changes = changes or {}
+        entry.desc = f"{target} {target_id} {action}d" if target_id else f"{target} {action}d"
+        self.buffer.append(entry)
+
+    def flush(self):
+        entries, self.buffer = self.buffer, []
+        ProjectActivity.objects.bulk_create([e for e in entries if isinstance(e, ProjectActivity)])
+        IssueActivity.objects.bulk_create([e for e in entries if isinstance(e, IssueActivity)])
+
+
+def get_activity_recorder(request):
+    """
+    Returns the ActivityRecorder of the request, creating it on first use.
+    """
+    recorder = getattr(request, "_activity_recorder", None)
+    if recorder is None:
+        recorder = request._activity_recorder = ActivityRecorder(request.user)
+    return recorder
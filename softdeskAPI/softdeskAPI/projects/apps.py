@@ -7,3 +7,7 @@ class ProjectsConfig(AppConfig):
     """
     default_auto_field = "django.db.models.BigAutoField"
     name = "projects"
+
+    def ready(self):
+        # Enregistre les signaux d'invalidation du cache des rôles
+        from projects import signals  # noqa: F401
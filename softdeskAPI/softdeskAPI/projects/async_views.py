@@ -0,0 +1,253 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import classonlymethod
+from django.utils.http import http_date
+from django.views import View
+from django_filters.filters import QuerySetRequestMixin
+from rest_framework import exceptions, permissions
+from rest_framework.mixins import ListModelMixin
+from rest_framework.request import Request
+from rest_framework.response import Response
+from projects import views
+from projects.caching import get_response_cache
+from projects.membership import aget_project_access
+
+# Permissions de DRF qui ne lisent que request.user : vérifiées directement dans la boucle
+PURE_PERMISSIONS = (permissions.AllowAny, permissions.IsAuthenticated)
+
+
+def _filters_query_database(view):
+    """
+    Tells whether filtering the view's queryset runs queries: a model choice filter
+    (`assignee`, `author`) checks its value against the database.
+    """
+    filterset_class = getattr(view, "filterset_class", None)
+    if filterset_class is None:
+        return False
+    params = view.request.query_params
+    return any(
+        isinstance(filter, QuerySetRequestMixin) and name in params
+        for name, filter in filterset_class.base_filters.items()
+    )
+
+
+class AsyncReadView(View):
+    """
+    Async counterpart of a DRF read endpoint, serving GET and HEAD in the event loop.
+
+    The DRF view `view_class` is reused for everything that does not touch the database:
+    querysets, serializers, permission classes, validators, pagination links, response
+    cache keys and error rendering, so both views answer with the same bytes. Queries go
+    through the async ORM (`aget`, `afirst`, `acount`, async iteration) and the async
+    permission checks (`ahas_permission`).
+
+    Requests the async path does not handle are passed to `view_class` through
+    `sync_to_async`: writes, OPTIONS, non-JSON renderers (browsable API) and requests
+    without a valid JWT, whose 401 carries the WWW-Authenticate header of the sync view.
+
+    Attributes:
+        view_class (class): The synchronous DRF view of the endpoint.
+    """
+    view_class = None
+    sync_view = None
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(sync_view=sync_to_async(cls.view_class.as_view()), **initkwargs)
+        # Comme les vues DRF : SessionAuthentication applique elle-même la protection CSRF
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method in ("GET", "HEAD"):
+            return await self.get(request, *args, **kwargs)
+        return await self.sync_view(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        view = await self.initialize(request, args, kwargs)
+        if view is None:
+            return await self.sync_view(request, *args, **kwargs)
+        try:
+            response = await self.respond(view)
+        except (exceptions.APIException, Http404, PermissionDenied) as exc:
+            response = view.get_exception_handler()(exc, view.get_exception_handler_context())
+            if response is None:
+                raise
+            response.exception = True
+        response = view.finalize_response(view.request, response, *args, **kwargs)
+        return self.render(response)
+
+    async def initialize(self, request, args, kwargs):
+        """
+        Builds the DRF view and request, and authenticates the request with the async API
+        of the first authentication class.
+
+        Returns:
+            APIView: The view ready to serve the request, or None to fall back to the sync view.
+        """
+        view = self.view_class()
+        view.setup(request, *args, **kwargs)
+        view.format_kwarg = view.get_format_suffix(**kwargs)
+        view.request = Request(
+            request,
+            parsers=view.get_parsers(),
+            negotiator=view.get_content_negotiator(),
+            parser_context=view.get_parser_context(request),
+        )
+        view.headers = view.default_response_headers
+        if view.get_throttles():
+            return None
+
+        try:
+            renderer, media_type = view.perform_content_negotiation(view.request)
+        except exceptions.NotAcceptable:
+            return None
+        if renderer.format != "json":
+            return None
+        view.request.accepted_renderer = renderer
+        view.request.accepted_media_type = media_type
+
+        authenticators = view.get_authenticators()
+        authenticator = authenticators[0] if authenticators else None
+        if not hasattr(authenticator, "aauthenticate"):
+            return None
+        try:
+            result = await authenticator.aauthenticate(view.request)
+        except exceptions.APIException:
+            return None
+        if result is None:
+            return None
+        view.request._authenticator = authenticator
+        view.request.user, view.request.auth = result
+        return view
+
+    async def check_permissions(self, view):
+        request = view.request
+        for permission in view.get_permissions():
+            if isinstance(permission, PURE_PERMISSIONS):
+                allowed = permission.has_permission(request, view)
+            elif hasattr(permission, "ahas_permission"):
+                allowed = await permission.ahas_permission(request, view)
+            else:
+                allowed = await sync_to_async(permission.has_permission)(request, view)
+            if not allowed:
+                view.permission_denied(
+                    request,
+                    message=getattr(permission, "message", None),
+                    code=getattr(permission, "code", None),
+                )
+
+    async def respond(self, view):
+        await self.check_permissions(view)
+        if isinstance(view, views.ProjectAccessMixin):
+            # Chargés ici : les méthodes synchrones de la vue les lisent sans requête
+            access = await aget_project_access(view.request, view)
+            await access.aproject()
+
+        validators = view.get_validators() if isinstance(view, views.ConditionalGetMixin) else None
+        if validators is None:
+            return await self.read(view)
+        etag, last_modified = validators
+        timestamp = int(last_modified.timestamp())
+        response = get_conditional_response(view.request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = await self.read(view)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(timestamp)
+        return response
+
+    async def read(self, view):
+        if not isinstance(view, ListModelMixin):
+            return Response(view.get_serializer(await self.get_object(view)).data)
+        if isinstance(view, views.CachedListMixin):
+            return await self.cached_list(view)
+        return await self.list(view)
+
+    async def get_object(self, view):
+        if getattr(view, "prefetch_related_fields", ()):
+            # Pas de prefetch_related_objects asynchrone avant Django 5.0 : un passage par un thread
+            return await sync_to_async(view.get_object)()
+        return view.get_object()
+
+    async def list(self, view):
+        queryset = view.get_queryset()
+        if _filters_query_database(view):
+            queryset = await sync_to_async(view.filter_queryset)(queryset)
+        else:
+            queryset = view.filter_queryset(queryset)
+
+        paginator = view.paginator
+        if paginator is None:
+            return Response(view.get_serializer([obj async for obj in queryset], many=True).data)
+        if hasattr(paginator, "apaginate_queryset"):
+            page = await paginator.apaginate_queryset(queryset, view.request, view=view)
+        else:
+            page = await sync_to_async(paginator.paginate_queryset)(queryset, view.request, view=view)
+        if page is None:
+            return Response(view.get_serializer([obj async for obj in queryset], many=True).data)
+        return view.get_paginated_response(view.get_serializer(page, many=True).data)
+
+    async def cached_list(self, view):
+        # Même clé que CachedListMixin : les deux vues partagent les entrées du cache
+        request = view.request
+        access = await aget_project_access(request, view)
+        cache = get_response_cache()
+        key = cache.make_key(
+            type(view).__name__, access.project_pk, (await access.aproject()).version,
+            request.get_full_path(), access.role,
+        )
+        entry = await cache.aget(key)
+        if entry is not None:
+            content, content_type = entry
+            response = HttpResponse(content, content_type=content_type)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = await self.list(view)
+        response.accepted_renderer = request.accepted_renderer
+        response.accepted_media_type = request.accepted_media_type
+        response.renderer_context = view.get_renderer_context()
+        response.render()
+        await cache.aset(key, response.content, response["Content-Type"])
+        response["X-Cache"] = "MISS"
+        return response
+
+    def render(self, response):
+        """
+        Returns the response rendered, as a plain HttpResponse: the handler would otherwise
+        render a DRF Response through `sync_to_async`.
+        """
+        if not isinstance(response, Response):
+            return response
+        if not response.is_rendered:
+            response.render()
+        rendered = HttpResponse(response.content, status=response.status_code)
+        for header, value in response.items():
+            rendered[header] = value
+        return rendered
+
+
+class AsyncProjectList(AsyncReadView):
+    view_class = views.ProjectList
+
+
+class AsyncProjectDetail(AsyncReadView):
+    view_class = views.ProjectDetail
+
+
+class AsyncContributorList(AsyncReadView):
+    view_class = views.ContributorList
+
+
+class AsyncIssueList(AsyncReadView):
+    view_class = views.IssueList
+
+
+class AsyncIssueDetail(AsyncReadView):
+    view_class = views.IssueDetail
+
+
+class AsyncCommentList(AsyncReadView):
+    view_class = views.CommentList
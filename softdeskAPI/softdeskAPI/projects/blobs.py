@@ -0,0 +1,136 @@
+import os
+from collections import Counter
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+from projects.models import Blob, Attachment, IssueAttachment, ProjectAttachment
+from projects.storage import file_sha256, get_blob_storage
+
+ATTACHMENT_MODELS = (Attachment, IssueAttachment, ProjectAttachment)
+
+
+def get_blob(sha256, size):
+    """
+    Returns the blob of this content, creating its row if needed.
+
+    The caller then moves the file into place with `BlobStorage.adopt`, as the last step of
+    the transaction referencing the blob: a new content is renamed into the blob storage, a
+    duplicate is deleted and its bytes are never written again.
+    """
+    blob, _ = Blob.objects.get_or_create(sha256=sha256, defaults={"size": size})
+    return blob
+
+
+def find_project_blob(project_id, sha256, size):
+    """
+    Returns the blob with this content if it is attached somewhere in the project, else None.
+
+    Lets a client attach a file again without sending its bytes. The lookup is limited to the
+    project: knowing the hash of a file must not give access to other projects' attachments.
+    """
+    issue_attachments = IssueAttachment.objects.filter(blob=OuterRef("pk"), issue__project_id=project_id)
+    project_attachments = ProjectAttachment.objects.filter(blob=OuterRef("pk"), project_id=project_id)
+    return Blob.objects.filter(
+        Exists(issue_attachments) | Exists(project_attachments), sha256=sha256, size=size
+    ).first()
+
+
+def add_references(deltas):
+    """
+    Adds the given increments to the reference counts of blobs: {blob_id: delta}.
+    """
+    for blob_id, delta in deltas.items():
+        if delta > 0:
+            Blob.objects.filter(pk=blob_id).update(refcount=F("refcount") + delta)
+        elif delta < 0:
+            # Jamais en dessous de zéro, même si un décompte a été manqué
+            Blob.objects.filter(pk=blob_id, refcount__gte=-delta).update(refcount=F("refcount") + delta)
+
+
+def _unreferenced(blobs):
+    # Un compteur faux ne doit pas faire supprimer un blob encore utilisé
+    for model in ATTACHMENT_MODELS:
+        blobs = blobs.filter(~Exists(model.objects.filter(blob=OuterRef("pk"))))
+    return blobs
+
+
+def collect_garbage(batch_size=500):
+    """
+    Deletes the blobs no attachment references, one batch per transaction.
+
+    Each batch is deleted with a DELETE conditional on `refcount = 0`, so a blob referenced
+    again in the meantime is kept. Files are deleted in the same transaction, after the rows:
+    an upload of the same content waits for it (unique sha256) and then stores its own file.
+
+    Returns:
+        int: The number of blobs deleted.
+    """
+    storage = get_blob_storage()
+    deleted = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            candidates = dict(
+                _unreferenced(Blob.objects.filter(refcount=0, pk__gt=last_id))
+                .order_by("pk").values_list("pk", "sha256")[:batch_size]
+            )
+            if not candidates:
+                return deleted
+            last_id = max(candidates)
+            Blob.objects.filter(pk__in=candidates, refcount=0).delete()
+            kept = set(Blob.objects.filter(pk__in=candidates).values_list("pk", flat=True))
+            for pk, sha256 in candidates.items():
+                if pk not in kept:
+                    storage.delete(Blob(sha256=sha256).name)
+                    deleted += 1
+
+
+def migrate_attachment_files(batch_size=500, progress=None):
+    """
+    Moves the attachment files stored before blobs into the blob storage.
+
+    Files are processed by name, in batches of attachments without a blob: each distinct
+    file is hashed once, moved (or deleted if its content is already stored), and every
+    attachment of the three models using it is pointed to the blob. Missing files are
+    skipped and reported.
+
+    Args:
+        batch_size (int): Number of attachments per transaction.
+        progress (callable): Called with the number of files migrated after each batch.
+
+    Returns:
+        tuple: (number of files migrated, list of missing file names).
+    """
+    storage = get_blob_storage()
+    migrated = 0
+    missing = []
+    for model in ATTACHMENT_MODELS:
+        last_id = 0
+        while True:
+            rows = list(
+                model.objects.filter(blob=None, pk__gt=last_id).order_by("pk").values_list("pk", "file")[:batch_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            with transaction.atomic():
+                for name in sorted({name for _, name in rows}):
+                    if not storage.exists(name):
+                        if name not in missing:
+                            missing.append(name)
+                        continue
+                    with storage.open(name, "rb") as content:
+                        sha256 = file_sha256(content)
+                        size = content.size
+                    blob = get_blob(sha256, size)
+                    references = Counter()
+                    for attachment_model in ATTACHMENT_MODELS:
+                        attachments = attachment_model.objects.filter(blob=None, file=name)
+                        # Le nom d'origine n'est connu que par le chemin de l'ancien fichier
+                        attachments.filter(filename="").update(filename=os.path.basename(name))
+                        references[blob.pk] += attachments.update(blob=blob, file=blob.name)
+                    add_references(references)
+                    storage.adopt(storage.path(name), blob.name)
+                    migrated += 1
+            if progress is not None:
+                progress(migrated)
+    return migrated, missing
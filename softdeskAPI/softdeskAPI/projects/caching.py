@@ -0,0 +1,315 @@
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Valeur sentinelle : distingue "absent du cache" d'une valeur None mise en cache
+MISSING = object()
+
+# Backends en mémoire du processus : appelés directement depuis la boucle asynchrone
+IN_PROCESS_BACKENDS = (LocMemCache, DummyCache)
+
+
+class CacheStats:
+    """
+    Hit, miss and eviction counters for an in-process cache.
+
+    Attributes:
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that fell through to the database.
+        evictions (int): Number of entries dropped to respect the size bound.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hit_ratio, 4),
+        }
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded mapping evicting the least recently used entries.
+
+    Args:
+        max_entries (int): Maximum number of entries kept in memory.
+        ttl (float): Optional lifetime of an entry, in seconds.
+    """
+
+    def __init__(self, max_entries, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._data.get(key, MISSING)
+            if entry is not MISSING:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.stats.hits += 1
+                    return value
+                del self._data[key]
+            self.stats.misses += 1
+            return default
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class MembershipCache:
+    """
+    Process-wide cache mapping (user_id, project_id) to the user's role in the project.
+
+    Entries are kept in a bounded in-process LRU, or in a shared Django cache backend when
+    `CACHE_ALIAS` is configured, so that several workers can reuse each other's lookups.
+    Keys embed a per-project generation: invalidating a whole project only bumps its
+    generation instead of enumerating its entries.
+
+    Invalidations made by the signals only reach the in-process LRU of the worker that
+    handled the write: another worker keeps granting a removed contributor access until
+    its entry expires. In-process entries (and generations) therefore only live for
+    `local_timeout`, a few seconds; with several workers, configure `CACHE_ALIAS` with a
+    backend they share (Redis, Memcached) to make invalidations immediate everywhere.
+
+    Args:
+        max_entries (int): Size bound of the in-process LRU.
+        cache_alias (str): Optional name of a Django cache from `CACHES`.
+        timeout (int): Lifetime of the entries in the shared backend, in seconds.
+        local_timeout (int): Lifetime of the entries in the in-process LRU, in seconds.
+    """
+
+    key_prefix = "membership"
+
+    def __init__(self, max_entries=10000, cache_alias=None, timeout=300, local_timeout=5):
+        self.timeout = timeout
+        self.shared = caches[cache_alias] if cache_alias else None
+        self.local = LRUCache(max_entries, ttl=local_timeout)
+        # Générations locales, tirées d'un compteur global pour ne jamais être réutilisées
+        self._generations = LRUCache(max_entries, ttl=local_timeout)
+        self._counter = itertools.count(1)
+        self.stats = self.local.stats if self.shared is None else CacheStats()
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, "MEMBERSHIP_CACHE", {})
+        return cls(
+            max_entries=options.get("MAX_ENTRIES", 10000),
+            cache_alias=options.get("CACHE_ALIAS"),
+            timeout=options.get("TIMEOUT", 300),
+            local_timeout=options.get("LOCAL_TIMEOUT", 5),
+        )
+
+    def _generation(self, project_id):
+        if self.shared is not None:
+            key = f"{self.key_prefix}:gen:{project_id}"
+            generation = self.shared.get(key)
+            if generation is None:
+                self.shared.add(key, time.time_ns(), timeout=None)
+                generation = self.shared.get(key)
+            return generation
+        generation = self._generations.get(project_id)
+        if generation is MISSING:
+            generation = next(self._counter)
+            self._generations.set(project_id, generation)
+        return generation
+
+    def _key(self, user_id, project_id):
+        return f"{self.key_prefix}:{project_id}:{self._generation(project_id)}:{user_id}"
+
+    def get_role(self, user_id, project_id):
+        """
+        Returns the cached role ("AUTHOR", "CONTRIBUTOR" or None), or MISSING if unknown.
+        """
+        key = self._key(user_id, project_id)
+        if self.shared is None:
+            return self.local.get(key)
+        # Le rôle None est stocké sous forme de chaîne vide dans le cache partagé
+        role = self.shared.get(key)
+        if role is None:
+            self.stats.misses += 1
+            return MISSING
+        self.stats.hits += 1
+        return role or None
+
+    async def aget_role(self, user_id, project_id):
+        """
+        Async `get_role`: the in-process LRU is read in the event loop, a shared backend
+        from a thread.
+        """
+        if self.shared is None:
+            return self.get_role(user_id, project_id)
+        return await sync_to_async(self.get_role)(user_id, project_id)
+
+    async def aset_role(self, user_id, project_id, role):
+        if self.shared is None:
+            self.set_role(user_id, project_id, role)
+        else:
+            await sync_to_async(self.set_role)(user_id, project_id, role)
+
+    def set_role(self, user_id, project_id, role):
+        key = self._key(user_id, project_id)
+        if self.shared is None:
+            self.local.set(key, role)
+        else:
+            self.shared.set(key, role or "", timeout=self.timeout)
+
+    def invalidate(self, user_id, project_id):
+        key = self._key(user_id, project_id)
+        if self.shared is None:
+            self.local.delete(key)
+        else:
+            self.shared.delete(key)
+
+    def invalidate_project(self, project_id):
+        if self.shared is None:
+            self._generations.set(project_id, next(self._counter))
+        else:
+            self.shared.set(f"{self.key_prefix}:gen:{project_id}", time.time_ns(), timeout=None)
+
+    def clear(self):
+        self.local.clear()
+        self._generations.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+
+_membership_cache = None
+
+
+def get_membership_cache():
+    """
+    Returns the process-wide MembershipCache, built from the `MEMBERSHIP_CACHE` setting.
+    """
+    global _membership_cache
+    if _membership_cache is None:
+        _membership_cache = MembershipCache.from_settings()
+    return _membership_cache
+
+
+def reset_membership_cache():
+    global _membership_cache
+    _membership_cache = None
+
+
+class ResponseCache:
+    """
+    Cache of rendered list responses, stored as bytes in a Django cache backend.
+
+    Keys embed the project version, which is bumped on every write under the project,
+    so entries never need to be deleted: stale ones are simply never looked up again
+    and expire with the backend's timeout.
+
+    Args:
+        cache_alias (str): Name of the Django cache from `CACHES` (locmem, file-based, ...).
+        timeout (int): Lifetime of the entries, in seconds.
+    """
+
+    key_prefix = "response"
+
+    def __init__(self, cache_alias="default", timeout=300):
+        self.backend = caches[cache_alias]
+        self.timeout = timeout
+        self.stats = CacheStats()
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, "RESPONSE_CACHE", {})
+        return cls(
+            cache_alias=options.get("CACHE_ALIAS", "default"),
+            timeout=options.get("TIMEOUT", 300),
+        )
+
+    def make_key(self, *parts):
+        digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()
+        return f"{self.key_prefix}:{digest}"
+
+    def get(self, key):
+        """
+        Returns the cached (content, content_type) pair, or None.
+        """
+        entry = self.backend.get(key)
+        if entry is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return entry
+
+    def set(self, key, content, content_type):
+        self.backend.set(key, (bytes(content), content_type), timeout=self.timeout)
+
+    async def aget(self, key):
+        """
+        Async `get`: in-process backends are read in the event loop, the others through
+        their async API.
+        """
+        if isinstance(self.backend, IN_PROCESS_BACKENDS):
+            return self.get(key)
+        entry = await self.backend.aget(key)
+        if entry is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return entry
+
+    async def aset(self, key, content, content_type):
+        if isinstance(self.backend, IN_PROCESS_BACKENDS):
+            self.set(key, content, content_type)
+        else:
+            await self.backend.aset(key, (bytes(content), content_type), timeout=self.timeout)
+
+
+_response_cache = None
+
+
+def get_response_cache():
+    """
+    Returns the process-wide ResponseCache, built from the `RESPONSE_CACHE` setting.
+    """
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache.from_settings()
+    return _response_cache
+
+
+def reset_response_cache():
+    global _response_cache
+    _response_cache = None
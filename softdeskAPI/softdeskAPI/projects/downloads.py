@@ -0,0 +1,237 @@
+import io
+import mimetypes
+import re
+import uuid
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, parse_etags
+from django.utils.http import content_disposition_header
+from projects.storage import get_blob_storage
+
+DIRECT = "direct"
+X_ACCEL_REDIRECT = "x-accel-redirect"
+X_SENDFILE = "x-sendfile"
+
+DEFAULT_OPTIONS = {
+    # "direct" : Django envoie le fichier ; sinon le proxy le sert après la vérification des droits
+    "MODE": DIRECT,
+    # Emplacement interne (nginx `internal;`) correspondant à MEDIA_ROOT, pour X-Accel-Redirect
+    "ACCEL_PREFIX": "/protected-media/",
+    # Au-delà, l'en-tête Range est ignoré et le fichier est envoyé en entier
+    "MAX_RANGES": 16,
+}
+
+BLOCK_SIZE = 64 * 1024
+
+_RANGE = re.compile(r"^(\d*)-(\d*)$")
+
+
+def get_download_options():
+    return {**DEFAULT_OPTIONS, **getattr(settings, "ATTACHMENT_DOWNLOADS", {})}
+
+
+def parse_range(header, size, max_ranges):
+    """
+    Returns the (start, end) byte ranges requested by a `Range: bytes=…` header, end included.
+
+    Ranges past the end of the file are dropped and the others are clipped to it.
+
+    Returns:
+        list: The satisfiable ranges, possibly empty; None when the header must be ignored
+        (malformed, another unit, or more than `max_ranges` ranges).
+    """
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes":
+        return None
+    specs = [spec.strip() for spec in specs.split(",")]
+    if not specs or len(specs) > max_ranges:
+        return None
+
+    ranges = []
+    for spec in specs:
+        match = _RANGE.match(spec)
+        if match is None or match.groups() == ("", ""):
+            return None
+        first, last = match.groups()
+        if first == "":
+            # Suffixe : les N derniers octets
+            length = int(last)
+            if length:
+                ranges.append((max(size - length, 0), size - 1))
+            continue
+        start = int(first)
+        if last != "" and int(last) < start:
+            return None
+        if start < size:
+            ranges.append((start, size - 1 if last == "" else min(int(last), size - 1)))
+    return ranges
+
+
+class FileRange(io.RawIOBase):
+    """
+    Read-only view of bytes `start` to `end` (included) of an open file.
+
+    Keeps the file descriptor, positioned at `start`: `FileResponse` computes the
+    Content-Length from it, and WSGI servers with `wsgi.file_wrapper` send the range with
+    `os.sendfile`, without copying the bytes through Python.
+    """
+
+    def __init__(self, file, start, end):
+        super().__init__()
+        self.file = file
+        self.start = start
+        self.stop = end + 1
+        self.name = file.name
+        file.seek(start)
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.file.tell()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_END:
+            position = self.stop + offset
+        elif whence == io.SEEK_CUR:
+            position = self.file.tell() + offset
+        else:
+            position = offset
+        return self.file.seek(min(max(position, self.start), self.stop))
+
+    def read(self, size=-1):
+        remaining = self.stop - self.file.tell()
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        return self.file.read(max(size, 0))
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
+def _multipart_delimiters(ranges, size, content_type, boundary):
+    """
+    Returns the header of each part of a multipart/byteranges body, and its closing delimiter.
+    """
+    heads = [
+        (
+            f"\r\n--{boundary}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        ).encode()
+        for start, end in ranges
+    ]
+    return heads, f"\r\n--{boundary}--\r\n".encode()
+
+
+def _multipart(path, ranges, heads, closing):
+    """
+    Yields the multipart/byteranges body, read from the file in BLOCK_SIZE pieces.
+
+    Raises:
+        OSError: When the file is shorter than the ranges. Content-Length is already sent,
+            so the response is aborted rather than ended early with a body the client would
+            take as complete.
+    """
+    with open(path, "rb") as file:
+        for (start, end), head in zip(ranges, heads):
+            yield head
+            file.seek(start)
+            remaining = end - start + 1
+            while remaining:
+                data = file.read(min(BLOCK_SIZE, remaining))
+                if not data:
+                    raise OSError(f"{path} ends at byte {file.tell()}, before the end of range {start}-{end}.")
+                yield data
+                remaining -= len(data)
+        yield closing
+
+
+def serve_blob(request, blob, filename):
+    """
+    Returns the response sending the content of `blob` as the attachment file `filename`.
+
+    The ETag is the SHA-256 of the content: If-None-Match is answered with 304 before the
+    file is opened. The file is streamed from disk, never read in memory as a whole:
+
+    - without Range, with `FileResponse`, sent with `os.sendfile` by WSGI servers that support
+      it;
+    - with a single range, through a `FileRange`, which keeps that zero-copy path;
+    - with several ranges, as a streamed multipart/byteranges body, read in BLOCK_SIZE pieces.
+
+    In "x-accel-redirect" or "x-sendfile" mode, the response only carries the headers and the
+    front proxy sends the bytes, ranges included.
+
+    Args:
+        request (HttpRequest): The request, already authorized.
+        blob (Blob): The content to send.
+        filename (str): The name given to the file in Content-Disposition.
+
+    Returns:
+        HttpResponse: 200, 206, 304, 412 or 416.
+    """
+    options = get_download_options()
+    etag = f'"{blob.sha256}"'
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        # Réponse réservée aux membres : revalidée à chaque usage, ce qui ne coûte qu'un 304
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": content_disposition_header(True, filename or blob.sha256),
+        "X-Content-Type-Options": "nosniff",
+    }
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None and options["MODE"] != DIRECT:
+        response = HttpResponse(content_type=content_type)
+        if options["MODE"] == X_ACCEL_REDIRECT:
+            response["X-Accel-Redirect"] = options["ACCEL_PREFIX"].rstrip("/") + "/" + blob.name
+        else:
+            response["X-Sendfile"] = get_blob_storage().path(blob.name)
+    if response is not None:
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    path = get_blob_storage().path(blob.name)
+    size = blob.size
+    ranges = None
+    range_header = request.META.get("HTTP_RANGE")
+    if_range = request.META.get("HTTP_IF_RANGE")
+    # If-Range : la plage ne vaut que pour la version du fichier que le client a déjà
+    if range_header and (if_range is None or etag in parse_etags(if_range)):
+        ranges = parse_range(range_header, size, options["MAX_RANGES"])
+
+    if ranges == []:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+    elif ranges is None:
+        response = FileResponse(open(path, "rb"), content_type=content_type)
+    elif len(ranges) == 1:
+        start, end = ranges[0]
+        response = FileResponse(FileRange(open(path, "rb"), start, end), content_type=content_type, status=206)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    else:
+        boundary = uuid.uuid4().hex
+        heads, closing = _multipart_delimiters(ranges, size, content_type, boundary)
+        response = StreamingHttpResponse(
+            _multipart(path, ranges, heads, closing),
+            content_type=f"multipart/byteranges; boundary={boundary}",
+            status=206,
+        )
+        response["Content-Length"] = (
+            sum(len(head) for head in heads) + len(closing) + sum(end - start + 1 for start, end in ranges)
+        )
+
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
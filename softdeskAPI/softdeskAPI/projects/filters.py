@@ -0,0 +1,33 @@
+import django_filters
+from rest_framework.filters import OrderingFilter
+from projects.models import Issue
+
+
+class IssueFilter(django_filters.FilterSet):
+    """
+    Filters of the issue list: `status`, `priority`, `tag`, `assignee`, `author` and
+    `created_time_after` / `created_time_before` (ISO 8601).
+
+    Each filter, combined with the project and either sort key, is served by one of the
+    composite indexes declared in `Issue.Meta.indexes`.
+    """
+    created_time = django_filters.IsoDateTimeFromToRangeFilter()
+
+    class Meta:
+        model = Issue
+        fields = ["status", "priority", "tag", "assignee", "author", "created_time"]
+
+
+class StableOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter that always ends the ordering with the primary key, in the same direction.
+
+    Rows sharing a `created_time` then come in a fixed order, which keeps pages (and cursor
+    positions) stable, and matches the indexes, whose last column is the implicit rowid.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view) or [])
+        if ordering and ordering[-1].lstrip("-") not in ("id", "pk"):
+            ordering.append("-id" if ordering[-1].startswith("-") else "id")
+        return ordering
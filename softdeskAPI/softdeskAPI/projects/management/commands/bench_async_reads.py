@@ -0,0 +1,215 @@
+import asyncio
+import itertools
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import AsyncClient, Client, override_settings
+from django.urls import resolve
+from rest_framework_simplejwt.tokens import AccessToken
+from projects.async_views import AsyncReadView
+from projects.membership import deferred_membership_sync
+from projects.models import Project, Contributor, Issue, Comment
+
+WSGI = "wsgi"
+ASGI = "asgi"
+MODES = [WSGI, ASGI]
+
+
+def percentile(values, rank):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[rank - 1]
+
+
+def peak_rss_kb():
+    """
+    Returns the peak resident memory of the process in KiB, or None where unavailable.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Octets sous macOS, kilo-octets sous Linux
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def read_urls(project_id, issue_id):
+    return [
+        "/projects/",
+        f"/projects/{project_id}/",
+        f"/projects/{project_id}/contributors/",
+        f"/projects/{project_id}/issues/",
+        f"/projects/{project_id}/issues/{issue_id}/",
+        f"/projects/{project_id}/issues/{issue_id}/comments/",
+    ]
+
+
+class Command(BaseCommand):
+    """
+    Compares the read endpoints of the projects served by WSGI (threads, DRF views) and by
+    ASGI (coroutines, `projects.async_views`).
+
+    A temporary user and project, with `--issues` issues, are created in the configured
+    database; each mode then runs in its own process, SOFTDESK_ASYNC_VIEWS selecting the
+    views as in production, and sends `--requests` GETs from `--concurrency` clients:
+    threads with the Django test client for WSGI, coroutines with the async test client for
+    ASGI. Both go through the middleware and the URL resolver, not through a server. The
+    report gives the throughput, the latency and the growth of the peak resident memory
+    divided by the number of concurrent clients. The temporary data is deleted at the end.
+    """
+    help = "Benchmarks throughput and memory per concurrent connection of the read endpoints, WSGI vs ASGI."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="GET requests sent per mode.")
+        parser.add_argument("--concurrency", type=int, default=50, help="Concurrent clients.")
+        parser.add_argument("--issues", type=int, default=200, help="Issues of the temporary project.")
+        parser.add_argument("--mode", choices=MODES, action="append", help="Mode to run (both by default).")
+        # Utilisées par les processus enfants
+        parser.add_argument("--serve", choices=MODES, help="Run one mode in this process against existing data.")
+        parser.add_argument("--project", type=int, help="Project read with --serve.")
+        parser.add_argument("--user", type=int, help="User authenticated with --serve.")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+        if options["serve"]:
+            if options["project"] is None or options["user"] is None:
+                raise CommandError("--serve requires --project and --user.")
+            result = self.serve(options["serve"], options)
+            self.stdout.write(json.dumps(result))
+            return
+
+        user, project = self.create_fixtures(options["issues"])
+        try:
+            for mode in options["mode"] or MODES:
+                self.report(self.run_child(mode, user, project, options))
+        finally:
+            # Synchronisation différée : les contributeurs supprimés en cascade ne recréent pas d'adhésion
+            with transaction.atomic(), deferred_membership_sync():
+                project.delete()
+            user.delete()
+
+    def create_fixtures(self, issues):
+        with transaction.atomic():
+            user = User.objects.create_user(username=f"bench-{uuid.uuid4().hex[:12]}")
+            project = Project.objects.create(
+                title="Benchmark", description="Temporary project", type="BACKEND",
+                tags="BUG", priority="LOW", status="OPEN", author=user,
+            )
+            assignee = Contributor.objects.create(user=user, project=project)
+            first = None
+            for i in range(max(issues, 1)):
+                issue = Issue.objects.create(
+                    title=f"Issue {i}", desc="Description", tag="BUG", status="OPEN",
+                    project=project, author=user, assignee=assignee,
+                )
+                first = first or issue
+            Comment.objects.bulk_create(
+                Comment(issue=first, desc=f"Comment {i}", author=user) for i in range(20)
+            )
+        return user, project
+
+    def run_child(self, mode, user, project, options):
+        command = [
+            sys.executable, "-m", "django", "bench_async_reads", "--serve", mode,
+            "--project", str(project.pk), "--user", str(user.pk),
+            "--requests", str(options["requests"]), "--concurrency", str(options["concurrency"]),
+        ]
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE,
+            "SOFTDESK_ASYNC_VIEWS": "1" if mode == ASGI else "0",
+        }
+        child = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        if child.returncode != 0:
+            raise CommandError(f"The {mode} run failed:\n{child.stderr}")
+        return json.loads(child.stdout.strip().splitlines()[-1])
+
+    def serve(self, mode, options):
+        user = User.objects.get(pk=options["user"])
+        issue_id = Issue.objects.filter(project_id=options["project"]).order_by("id").values_list("id", flat=True).first()
+        urls = read_urls(options["project"], issue_id)
+        headers = {"authorization": f"Bearer {AccessToken.for_user(user)}"}
+        views = "async" if issubclass(getattr(resolve(urls[0]).func, "view_class", object), AsyncReadView) else "sync"
+
+        # Les clients de test envoient l'hôte "testserver"
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            run = self.run_wsgi if mode == WSGI else self.run_asgi
+            # Première passe : imports, caches et connexions ne comptent pas dans la mesure
+            run(urls, headers, len(urls), 1)
+            baseline = peak_rss_kb()
+            started = time.perf_counter()
+            statuses, latencies = run(urls, headers, options["requests"], options["concurrency"])
+            elapsed = time.perf_counter() - started
+            peak = peak_rss_kb()
+
+        memory = None if baseline is None else (peak - baseline) / options["concurrency"]
+        return {
+            "mode": mode,
+            "views": views,
+            "requests": len(statuses),
+            "failed": len(statuses) - statuses.count(200),
+            "seconds": elapsed,
+            "throughput": len(statuses) / elapsed,
+            "p50": percentile(latencies, 50),
+            "p99": percentile(latencies, 99),
+            "peak_rss_kb": peak,
+            "memory_per_connection_kb": memory,
+        }
+
+    def run_wsgi(self, urls, headers, requests, concurrency):
+        counter = itertools.count()
+        statuses, latencies = [], []
+
+        def client_thread(_):
+            client = Client()
+            try:
+                while (number := next(counter)) < requests:
+                    started = time.perf_counter()
+                    statuses.append(client.get(urls[number % len(urls)], headers=headers).status_code)
+                    latencies.append((time.perf_counter() - started) * 1000)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(client_thread, range(concurrency)))
+        return statuses, latencies
+
+    def run_asgi(self, urls, headers, requests, concurrency):
+        counter = itertools.count()
+        statuses, latencies = [], []
+
+        async def client_task():
+            client = AsyncClient()
+            while (number := next(counter)) < requests:
+                started = time.perf_counter()
+                statuses.append((await client.get(urls[number % len(urls)], headers=headers)).status_code)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        async def main():
+            await asyncio.gather(*(client_task() for _ in range(concurrency)))
+            await sync_to_async(connections.close_all)()
+
+        asyncio.run(main())
+        return statuses, latencies
+
+    def report(self, result):
+        memory = "n/a"
+        if result["memory_per_connection_kb"] is not None:
+            memory = f"{result['memory_per_connection_kb']:.1f} KiB/connection (peak RSS {result['peak_rss_kb'] / 1024:.1f} MiB)"
+        self.stdout.write(
+            f"{result['mode'].upper()} ({result['views']} views): {result['requests']} request(s), "
+            f"{result['failed']} failed, {result['throughput']:.1f} req/s, "
+            f"p50 {result['p50']:.1f} ms, p99 {result['p99']:.1f} ms; {memory}"
+        )
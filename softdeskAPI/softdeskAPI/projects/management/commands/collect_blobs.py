@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from projects.blobs import collect_garbage
+
+
+class Command(BaseCommand):
+    """
+    Deletes the attachment blobs that no attachment references anymore.
+    """
+    help = "Deletes unreferenced attachment blobs and their files, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Blobs per transaction.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+        deleted = collect_garbage(batch_size=options["batch_size"])
+        self.stdout.write(f"{deleted} blob(s) deleted.")
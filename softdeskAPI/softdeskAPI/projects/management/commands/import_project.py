@@ -0,0 +1,46 @@
+import sys
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from projects.transfer import CHUNK_SIZE, TransferError, import_project
+
+
+class Command(BaseCommand):
+    """
+    Imports a project exported by `export_project`, under new primary keys.
+
+    The file is read one line at a time and rows are inserted with `bulk_create` in chunks,
+    each in a savepoint of a single transaction: a failed import leaves nothing behind.
+    Users are matched by username.
+    """
+    help = "Imports a project exported as NDJSON by export_project."
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", nargs="?", help="File to read; the standard input by default.")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per bulk insert.")
+        parser.add_argument("--default-user", help="Username replacing the users that do not exist here.")
+
+    def report(self, record_type, rows, seconds):
+        self.stdout.write(f"{record_type}: {rows} row(s) in {seconds:.1f}s ({rows / max(seconds, 1e-6):.0f} rows/s)")
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+        default_user = None
+        if options["default_user"]:
+            default_user = User.objects.filter(username=options["default_user"]).first()
+            if default_user is None:
+                raise CommandError(f"User {options['default_user']} does not exist.")
+
+        started = time.monotonic()
+        try:
+            if options["input"]:
+                with open(options["input"], encoding="utf-8") as source:
+                    project = import_project(source, options["chunk_size"], default_user, self.report)
+            else:
+                project = import_project(sys.stdin, options["chunk_size"], default_user, self.report)
+        except TransferError as error:
+            raise CommandError(str(error))
+        self.stdout.write(self.style.SUCCESS(
+            f"Project imported as {project.pk} in {time.monotonic() - started:.1f}s."
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from projects.blobs import migrate_attachment_files
+
+
+class Command(BaseCommand):
+    """
+    Moves the attachment files stored before the blob storage into it.
+
+    Can be interrupted and run again: only attachments without a blob are processed.
+    """
+    help = "Moves existing attachment files into the deduplicated blob storage."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Attachments per transaction.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+        migrated, missing = migrate_attachment_files(
+            batch_size=options["batch_size"],
+            progress=lambda count: self.stdout.write(f"{count} file(s) migrated..."),
+        )
+        for name in missing:
+            self.stderr.write(f"Missing file: {name}")
+        self.stdout.write(f"{migrated} file(s) migrated, {len(missing)} missing.")
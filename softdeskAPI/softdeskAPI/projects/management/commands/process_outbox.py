@@ -0,0 +1,29 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from projects.notifications import drain_outbox
+
+
+class Command(BaseCommand):
+    """
+    Worker fanning out the notification outbox into per-user notifications.
+
+    Runs until interrupted, polling the outbox when it is empty, or drains it once with --once.
+    """
+    help = "Turns notification outbox events into notifications, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the outbox, then exit.")
+        parser.add_argument("--batch-size", type=int, default=100, help="Events per transaction.")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds between polls of an empty outbox.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        while True:
+            processed = drain_outbox(batch_size=options["batch_size"])
+            if processed:
+                self.stdout.write(f"{processed} event(s) processed.")
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
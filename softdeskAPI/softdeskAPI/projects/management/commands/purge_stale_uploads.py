@@ -0,0 +1,20 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from projects.uploads import purge_stale_uploads
+
+
+class Command(BaseCommand):
+    """
+    Deletes the attachment uploads abandoned before completion, with their partial files.
+    """
+    help = "Deletes incomplete attachment uploads that received no chunk for a while."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=float, default=24, help="Idle time after which an upload is abandoned.")
+
+    def handle(self, *args, **options):
+        if options["hours"] <= 0:
+            raise CommandError("--hours must be positive.")
+        deleted = purge_stale_uploads(timezone.now() - timedelta(hours=options["hours"]))
+        self.stdout.write(f"{deleted} upload(s) deleted.")
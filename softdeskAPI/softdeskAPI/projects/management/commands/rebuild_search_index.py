@@ -0,0 +1,50 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from projects.search import (
+    ISSUE,
+    COMMENT,
+    search_available,
+    rebuild_index,
+    clear_index,
+    optimize_index,
+)
+
+
+class Command(BaseCommand):
+    """
+    Indexes the existing issues and comments in the full-text search index.
+
+    New and modified rows are indexed by triggers; this command fills the index for data
+    created before the index existed, or repairs it. It works in batches of ids, each in its
+    own transaction, and can be resumed with --start-after.
+    """
+    help = "Rebuilds the full-text search index of issues and comments, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--only", choices=[ISSUE, COMMENT], help="Only index issues or comments.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per transaction.")
+        parser.add_argument("--start-after", type=int, default=0, help="Resume after this id.")
+        parser.add_argument("--clear", action="store_true", help="Empty the index first.")
+
+    def handle(self, *args, **options):
+        if not search_available():
+            raise CommandError("Full-text search requires SQLite with FTS5.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        if options["clear"]:
+            clear_index()
+
+        sources = [options["only"]] if options["only"] else [ISSUE, COMMENT]
+        for source in sources:
+            started = time.monotonic()
+            last_id = rebuild_index(
+                source,
+                start_after=options["start_after"],
+                batch_size=options["batch_size"],
+                progress=lambda last: self.stdout.write(f"{source}: indexed up to id {last}"),
+            )
+            self.stdout.write(f"{source}: done up to id {last_id} in {time.monotonic() - started:.1f}s")
+
+        optimize_index()
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from projects.models import Project
+from projects.stats import reconcile_counters
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the issue counters of every project (or of the given ones) and fixes drift.
+
+    Counters are maintained incrementally; writes that bypass the model signals, such as
+    `QuerySet.update()` on issues, can make them drift. Projects are processed in batches,
+    each with a few GROUP BY queries and one transaction.
+    """
+    help = "Recomputes the per-project issue counters and fixes the ones that drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, action="append", help="Only this project (repeatable).")
+        parser.add_argument("--batch-size", type=int, default=500, help="Projects per batch.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        projects = Project.objects.order_by("id")
+        if options["project"]:
+            projects = projects.filter(id__in=options["project"])
+
+        fixed = checked = 0
+        last_id = 0
+        while True:
+            project_ids = list(projects.filter(id__gt=last_id).values_list("id", flat=True)[:batch_size])
+            if not project_ids:
+                break
+            fixed += reconcile_counters(project_ids)
+            checked += len(project_ids)
+            last_id = project_ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"{checked} project(s) checked, {fixed} counter(s) fixed."))
@@ -0,0 +1,303 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from django.db.models import OuterRef, Subquery
+from django.http import Http404
+from projects.models import Project, Contributor, Issue, ProjectMembership
+from projects.caching import MISSING, get_membership_cache
+
+AUTHOR = "AUTHOR"
+CONTRIBUTOR = "CONTRIBUTOR"
+
+
+class ProjectAccess:
+    """
+    Result of resolving the project targeted by a request.
+
+    Attributes:
+        project_pk (int): The identifier of the project.
+        project (Project): The project identified by the URL, loaded on first access
+            when the role came from the membership cache.
+        role (str): "AUTHOR", "CONTRIBUTOR" or None when the user is not a member.
+        issue (Issue): The parent issue when the URL has one, otherwise None.
+    """
+
+    def __init__(self, project_pk, role, project=None, issue=None):
+        self.project_pk = project_pk
+        self.role = role
+        self.issue = issue
+        self._project = project
+
+    @property
+    def project(self):
+        if self._project is None:
+            self._project = Project.objects.filter(pk=self.project_pk).first()
+            if self._project is None:
+                raise Http404
+        return self._project
+
+    async def aproject(self):
+        """
+        Async access to `project`, loading it with the async ORM if needed.
+        """
+        if self._project is None:
+            self._project = await Project.objects.filter(pk=self.project_pk).afirst()
+            if self._project is None:
+                raise Http404
+        return self._project
+
+    @property
+    def is_author(self):
+        return self.role == AUTHOR
+
+    @property
+    def is_member(self):
+        return self.role is not None
+
+
+def _membership_annotations(user, project_ref):
+    """
+    Returns the annotation reading the user's role in the project referenced by `project_ref`.
+
+    The role comes from the `ProjectMembership` index, through its (user, project) unique index,
+    and is evaluated as a subquery of the same SELECT.
+    """
+    return {
+        "_membership_role": Subquery(
+            ProjectMembership.objects.filter(
+                project_id=project_ref, user_id=user.id
+            ).values("role")[:1]
+        ),
+    }
+
+
+def _role(user, project, annotated):
+    if user.id is None:
+        return None
+    if project.author_id == user.id:
+        return AUTHOR
+    if annotated._membership_role is not None:
+        return CONTRIBUTOR
+    return None
+
+
+def resolve_project_access(user, project_pk, issue_pk=None):
+    """
+    Fetches the project, the user's role and the optional parent issue in a single query.
+
+    When the role is already in the membership cache, the project itself is only loaded if
+    the caller needs it, and the issue is fetched without the membership subqueries.
+
+    Args:
+        user (User): The user making the request.
+        project_pk (int): The project identifier from the URL.
+        issue_pk (int): The issue identifier from the URL, if any.
+
+    Returns:
+        ProjectAccess: The resolved project, role and issue.
+
+    Raises:
+        Http404: If the project, or the issue within this project, does not exist.
+    """
+    cache = get_membership_cache()
+    role = cache.get_role(user.id, project_pk) if user.id is not None else MISSING
+
+    if issue_pk is not None:
+        issues = Issue.objects.select_related("project").filter(pk=issue_pk, project_id=project_pk)
+        if role is MISSING:
+            issues = issues.annotate(**_membership_annotations(user, OuterRef("project_id")))
+        issue = issues.first()
+        if issue is None:
+            raise Http404
+        if role is MISSING:
+            role = _role(user, issue.project, issue)
+            _remember(cache, user, project_pk, role)
+        return ProjectAccess(project_pk, role, project=issue.project, issue=issue)
+
+    if role is not MISSING:
+        return ProjectAccess(project_pk, role)
+
+    project = (
+        Project.objects.annotate(**_membership_annotations(user, OuterRef("pk")))
+        .filter(pk=project_pk)
+        .first()
+    )
+    if project is None:
+        raise Http404
+    role = _role(user, project, project)
+    _remember(cache, user, project_pk, role)
+    return ProjectAccess(project_pk, role, project=project)
+
+
+def _remember(cache, user, project_pk, role):
+    if user.id is not None:
+        cache.set_role(user.id, project_pk, role)
+
+
+async def aresolve_project_access(user, project_pk, issue_pk=None):
+    """
+    Async `resolve_project_access`, with the same queries run through the async ORM.
+    """
+    cache = get_membership_cache()
+    role = await cache.aget_role(user.id, project_pk) if user.id is not None else MISSING
+
+    if issue_pk is not None:
+        issues = Issue.objects.select_related("project").filter(pk=issue_pk, project_id=project_pk)
+        if role is MISSING:
+            issues = issues.annotate(**_membership_annotations(user, OuterRef("project_id")))
+        issue = await issues.afirst()
+        if issue is None:
+            raise Http404
+        if role is MISSING:
+            role = _role(user, issue.project, issue)
+            await _aremember(cache, user, project_pk, role)
+        return ProjectAccess(project_pk, role, project=issue.project, issue=issue)
+
+    if role is not MISSING:
+        return ProjectAccess(project_pk, role)
+
+    project = await (
+        Project.objects.annotate(**_membership_annotations(user, OuterRef("pk")))
+        .filter(pk=project_pk)
+        .afirst()
+    )
+    if project is None:
+        raise Http404
+    role = _role(user, project, project)
+    await _aremember(cache, user, project_pk, role)
+    return ProjectAccess(project_pk, role, project=project)
+
+
+async def _aremember(cache, user, project_pk, role):
+    if user.id is not None:
+        await cache.aset_role(user.id, project_pk, role)
+
+
+def _access_key(request, view):
+    project_pk = view.kwargs.get("project_pk") or view.kwargs.get("pk")
+    issue_pk = view.kwargs.get("issue_pk")
+    return (request.user.id, project_pk, issue_pk)
+
+
+def get_project_access(request, view):
+    """
+    Returns the ProjectAccess for the request, resolving it only once per request.
+
+    The result is cached on the request so that permission classes, `get_queryset`,
+    `get_object` and `perform_create` all share the same lookup.
+    """
+    key = _access_key(request, view)
+    access = getattr(request, "_project_access", None)
+    if access is None or request._project_access_key != key:
+        access = resolve_project_access(request.user, *key[1:])
+        request._project_access = access
+        request._project_access_key = key
+    return access
+
+
+async def aget_project_access(request, view):
+    """
+    Async `get_project_access`, sharing its per-request cache: once resolved here, the
+    synchronous helpers of the view (`project_access`, `get_validators`...) reuse the result.
+    """
+    key = _access_key(request, view)
+    access = getattr(request, "_project_access", None)
+    if access is None or request._project_access_key != key:
+        access = await aresolve_project_access(request.user, *key[1:])
+        request._project_access = access
+        request._project_access_key = key
+    return access
+
+
+def sync_memberships(project_id, user_ids):
+    """
+    Recomputes the `ProjectMembership` rows of the given users for a project.
+
+    The role is derived from the sources of truth: the project author, the `Contributor`
+    table and `Project.contributors`. Users that are no longer members lose their row.
+
+    Args:
+        project_id (int): The project whose memberships changed.
+        user_ids (iterable): The users whose membership may have changed.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+
+    author_id = Project.objects.filter(pk=project_id).values_list("author_id", flat=True).first()
+    if author_id is None:
+        # Projet supprimé : la suppression en cascade s'occupe des lignes restantes
+        return
+
+    contributor_ids = set(
+        Contributor.objects.filter(project_id=project_id, user_id__in=user_ids).values_list("user_id", flat=True)
+    )
+    contributor_ids.update(
+        Project.contributors.through.objects.filter(
+            project_id=project_id, user_id__in=user_ids
+        ).values_list("user_id", flat=True)
+    )
+
+    members = []
+    for user_id in user_ids:
+        if user_id == author_id:
+            members.append(ProjectMembership(user_id=user_id, project_id=project_id, role=AUTHOR))
+        elif user_id in contributor_ids:
+            members.append(ProjectMembership(user_id=user_id, project_id=project_id, role=CONTRIBUTOR))
+
+    ProjectMembership.objects.filter(project_id=project_id, user_id__in=user_ids - {m.user_id for m in members}).delete()
+    ProjectMembership.objects.bulk_create(
+        members,
+        update_conflicts=True,
+        unique_fields=["user", "project"],
+        update_fields=["role"],
+    )
+
+
+def sync_project_memberships(project_id):
+    """
+    Recomputes every `ProjectMembership` row of a project.
+    """
+    user_ids = set(ProjectMembership.objects.filter(project_id=project_id).values_list("user_id", flat=True))
+    user_ids.update(Contributor.objects.filter(project_id=project_id).values_list("user_id", flat=True))
+    user_ids.update(Project.contributors.through.objects.filter(project_id=project_id).values_list("user_id", flat=True))
+    user_ids.update(Project.objects.filter(pk=project_id).values_list("author_id", flat=True))
+    sync_memberships(project_id, user_ids)
+
+
+_deferred = threading.local()
+
+
+@contextmanager
+def deferred_membership_sync():
+    """
+    Collects the membership changes made inside the block and syncs them once, set-based, on exit.
+
+    Used by bulk operations so that per-row signal handlers do not each run their own sync.
+    Nothing is synced if the block raises.
+    """
+    if getattr(_deferred, "pending", None) is not None:
+        # Bloc imbriqué : le bloc englobant se charge de la synchronisation
+        yield
+        return
+
+    _deferred.pending = defaultdict(set)
+    try:
+        yield
+        pending = _deferred.pending
+    finally:
+        _deferred.pending = None
+
+    for project_id, user_ids in pending.items():
+        sync_memberships(project_id, user_ids)
+
+
+def schedule_membership_sync(project_id, user_ids):
+    """
+    Syncs the memberships now, or at the end of the enclosing `deferred_membership_sync` block.
+    """
+    pending = getattr(_deferred, "pending", None)
+    if pending is None:
+        sync_memberships(project_id, user_ids)
+    else:
+        pending[project_id].update(user_ids)
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-18 01:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_memberships(apps, schema_editor):
+    """Builds the membership index from the existing authors and contributors."""
+    Project = apps.get_model('projects', 'Project')
+    Contributor = apps.get_model('projects', 'Contributor')
+    ProjectMembership = apps.get_model('projects', 'ProjectMembership')
+
+    roles = {}
+    for project_id, user_id in Project.contributors.through.objects.values_list('project_id', 'user_id').iterator():
+        roles[(user_id, project_id)] = 'CONTRIBUTOR'
+    for project_id, user_id in Contributor.objects.values_list('project_id', 'user_id').iterator():
+        roles[(user_id, project_id)] = 'CONTRIBUTOR'
+    for project_id, author_id in Project.objects.values_list('id', 'author_id').iterator():
+        roles[(author_id, project_id)] = 'AUTHOR'
+
+    ProjectMembership.objects.bulk_create(
+        (ProjectMembership(user_id=user_id, project_id=project_id, role=role)
+         for (user_id, project_id), role in roles.items()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0003_alter_contributor_unique_together'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('AUTHOR', 'AUTHOR'), ('CONTRIBUTOR', 'CONTRIBUTOR')], max_length=11)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='projects.project')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='project_memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'project')},
+            },
+        ),
+        migrations.RunPython(populate_memberships, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,122 @@
+from django.db import DatabaseError, migrations
+
+# Une seule table FTS5 pour les issues et les commentaires, afin de les classer ensemble (bm25).
+# rowid = 2 * id pour une issue, 2 * id + 1 pour un commentaire : les triggers mettent l'index
+# à jour par rowid, sans parcourir la table.
+# La colonne scope contient le jeton "p<id du projet>" : la restriction aux projets de
+# l'utilisateur se fait dans le MATCH, avant le classement, plutôt qu'après.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE projects_search USING fts5(
+        title, body, scope,
+        kind UNINDEXED, project_id UNINDEXED, issue_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    # Un mot du titre pèse plus lourd qu'un mot du corps ; scope n'entre pas dans le score
+    "INSERT INTO projects_search(projects_search, rank) VALUES ('rank', 'bm25(10.0, 1.0, 0.0)')",
+    """
+    CREATE TRIGGER projects_search_issue_insert AFTER INSERT ON projects_issue BEGIN
+        INSERT INTO projects_search(rowid, title, body, scope, kind, project_id, issue_id)
+        VALUES (new.id * 2, new.title, new."desc", 'p' || new.project_id, 'issue', new.project_id, new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER projects_search_issue_update AFTER UPDATE OF title, "desc", project_id ON projects_issue
+    WHEN new.title IS NOT old.title OR new."desc" IS NOT old."desc" OR new.project_id != old.project_id BEGIN
+        DELETE FROM projects_search WHERE rowid = old.id * 2;
+        INSERT INTO projects_search(rowid, title, body, scope, kind, project_id, issue_id)
+        VALUES (new.id * 2, new.title, new."desc", 'p' || new.project_id, 'issue', new.project_id, new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER projects_search_issue_move AFTER UPDATE OF project_id ON projects_issue
+    WHEN new.project_id != old.project_id BEGIN
+        UPDATE projects_search SET scope = 'p' || new.project_id, project_id = new.project_id
+        WHERE rowid IN (SELECT id * 2 + 1 FROM projects_comment WHERE issue_id = new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER projects_search_issue_delete AFTER DELETE ON projects_issue BEGIN
+        DELETE FROM projects_search WHERE rowid = old.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER projects_search_comment_insert AFTER INSERT ON projects_comment BEGIN
+        INSERT INTO projects_search(rowid, title, body, scope, kind, project_id, issue_id)
+        SELECT new.id * 2 + 1, NULL, new."desc", 'p' || project_id, 'comment', project_id, id
+        FROM projects_issue WHERE id = new.issue_id;
+    END
+    """,
+    """
+    CREATE TRIGGER projects_search_comment_update AFTER UPDATE OF "desc", issue_id ON projects_comment
+    WHEN new."desc" IS NOT old."desc" OR new.issue_id != old.issue_id BEGIN
+        DELETE FROM projects_search WHERE rowid = old.id * 2 + 1;
+        INSERT INTO projects_search(rowid, title, body, scope, kind, project_id, issue_id)
+        SELECT new.id * 2 + 1, NULL, new."desc", 'p' || project_id, 'comment', project_id, id
+        FROM projects_issue WHERE id = new.issue_id;
+    END
+    """,
+    """
+    CREATE TRIGGER projects_search_comment_delete AFTER DELETE ON projects_comment BEGIN
+        DELETE FROM projects_search WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS projects_search_comment_delete",
+    "DROP TRIGGER IF EXISTS projects_search_comment_update",
+    "DROP TRIGGER IF EXISTS projects_search_comment_insert",
+    "DROP TRIGGER IF EXISTS projects_search_issue_delete",
+    "DROP TRIGGER IF EXISTS projects_search_issue_move",
+    "DROP TRIGGER IF EXISTS projects_search_issue_update",
+    "DROP TRIGGER IF EXISTS projects_search_issue_insert",
+    "DROP TABLE IF EXISTS projects_search",
+]
+
+
+def fts5_available(connection):
+    """
+    Tells whether the SQLite library was built with FTS5, by creating a throwaway temporary table.
+    """
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.projects_fts5_probe USING fts5(body)")
+        except DatabaseError:
+            return False
+        cursor.execute("DROP TABLE temp.projects_fts5_probe")
+    return True
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Creates the FTS5 index and its triggers. The existing rows are indexed by `rebuild_search_index`.
+
+    Without FTS5, nothing is created and the search falls back to `icontains` lookups.
+    """
+    if not fts5_available(schema_editor.connection):
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_resource_versions'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_counters(apps, schema_editor):
+    """Computes the counters of the existing issues with GROUP BY queries."""
+    Issue = apps.get_model('projects', 'Issue')
+    ProjectIssueCounter = apps.get_model('projects', 'ProjectIssueCounter')
+
+    counters = []
+    for dimension in ('status', 'priority', 'tag'):
+        rows = Issue.objects.values_list('project_id', dimension).annotate(n=models.Count('id')).order_by()
+        counters += [
+            ProjectIssueCounter(project_id=project_id, dimension=dimension, value=value, count=count)
+            for project_id, value, count in rows.iterator()
+        ]
+    rows = (
+        Issue.objects.exclude(status='COMPLETED')
+        .values_list('project_id', 'assignee_id').annotate(n=models.Count('id')).order_by()
+    )
+    counters += [
+        ProjectIssueCounter(project_id=project_id, dimension='assignee_open', value=str(assignee_id), count=count)
+        for project_id, assignee_id, count in rows.iterator()
+    ]
+    ProjectIssueCounter.objects.bulk_create(counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_issue_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectIssueCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('status', 'status'), ('priority', 'priority'), ('tag', 'tag'), ('assignee_open', 'assignee_open')], max_length=20)),
+                ('value', models.CharField(max_length=200)),
+                ('count', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='issue_counters', to='projects.project')),
+            ],
+            options={
+                'unique_together': {('project', 'dimension', 'value')},
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:20
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0010_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issueactivity',
+            name='action',
+            field=models.CharField(choices=[('create', 'create'), ('update', 'update'), ('delete', 'delete')], default='update', max_length=6),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='issueactivity',
+            name='actor',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='issueactivity',
+            name='changes',
+            field=models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder),
+        ),
+        migrations.AddField(
+            model_name='issueactivity',
+            name='target',
+            field=models.CharField(choices=[('project', 'project'), ('contributor', 'contributor'), ('issue', 'issue'), ('comment', 'comment')], default='project', max_length=11),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='issueactivity',
+            name='target_id',
+            field=models.PositiveBigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='projectactivity',
+            name='action',
+            field=models.CharField(choices=[('create', 'create'), ('update', 'update'), ('delete', 'delete')], default='update', max_length=6),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='projectactivity',
+            name='actor',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='projectactivity',
+            name='changes',
+            field=models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder),
+        ),
+        migrations.AddField(
+            model_name='projectactivity',
+            name='target',
+            field=models.CharField(choices=[('project', 'project'), ('contributor', 'contributor'), ('issue', 'issue'), ('comment', 'comment')], default='project', max_length=11),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='projectactivity',
+            name='target_id',
+            field=models.PositiveBigIntegerField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='issueactivity',
+            name='issue',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='projects.issue'),
+        ),
+        migrations.AlterField(
+            model_name='projectactivity',
+            name='project',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='projects.project'),
+        ),
+        migrations.AddIndex(
+            model_name='issueactivity',
+            index=models.Index(fields=['issue', 'created_time'], name='issue_activity_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectactivity',
+            index=models.Index(fields=['project', 'created_time'], name='project_activity_created_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+import projects.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0012_upload_session'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attachment',
+            name='file',
+            field=models.FileField(storage=projects.storage.get_blob_storage, upload_to='attachments'),
+        ),
+        migrations.AlterField(
+            model_name='issueattachment',
+            name='file',
+            field=models.FileField(storage=projects.storage.get_blob_storage, upload_to='attachments'),
+        ),
+        migrations.AlterField(
+            model_name='projectattachment',
+            name='file',
+            field=models.FileField(storage=projects.storage.get_blob_storage, upload_to='attachments'),
+        ),
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('size', models.PositiveBigIntegerField()),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('created_time', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('refcount', 0)), fields=['id'], name='blob_unreferenced_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='blob',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='projects.blob'),
+        ),
+        migrations.AddField(
+            model_name='issueattachment',
+            name='blob',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='projects.blob'),
+        ),
+        migrations.AddField(
+            model_name='projectattachment',
+            name='blob',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='projects.blob'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0014_attachment_filename'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='projectactivity',
+            name='project',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='projects.project'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0015_activity_outlives_project'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='issueactivity',
+            name='issue',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='projects.issue'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.contrib.auth.models import User
+from projects.storage import blob_name, get_blob_storage
 
 # Create your models here.
 # Constants for the project model
@@ -59,7 +61,20 @@ class Project(models.Model):
     priority = models.CharField(max_length=200, choices=PRIORITIES)
     status = models.CharField(max_length=200, choices=STATUS)
     created_time = models.DateTimeField(auto_now_add=True)
+    # Mis à jour à chaque modification du projet, de ses contributeurs, issues ou commentaires
     updated_at = models.DateTimeField(auto_now=True)
+    # Incrémenté à chaque modification d'un contributeur, d'une issue ou d'un commentaire du projet
+    version = models.PositiveBigIntegerField(default=0)
+
+    def save(self, *args, **kwargs):
+        # La version n'est modifiée que par des UPDATE atomiques (F()) : ne jamais réécrire
+        # une valeur lue plus tôt, qui ferait reculer la version
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "version"
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
             """
@@ -85,10 +100,44 @@ class Contributor(models.Model):
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     project = models.ForeignKey(
-        Project, on_delete=models.CASCADE, related_name="contributor_set"
+        Project, on_delete=models.CASCADE, related_name="contributor_set", db_index=False
     )
     role = models.CharField(max_length=11, choices=ROLES, default="CONTRIBUTOR")
     #Empêcher la création de doublons de contributors pour un même projet - Un contributor ne devrait pas être présent plus d'une fois dans un projet
+    # L'index unique (user, project) sert aussi les recherches par (project, user)
+    class Meta:
+        unique_together = ('user', 'project')
+        indexes = [
+            models.Index(fields=["project", "id"], name="contributor_project_id_idx"),
+        ]
+
+
+class ProjectMembership(models.Model):
+    """
+    Denormalized index of the projects a user belongs to, as author or contributor.
+
+    Kept in sync with `Project.author`, `Project.contributors` and the `Contributor` table
+    by the signal handlers in `projects.signals`, so that "my projects" is a single range
+    scan on the (user, project) unique index.
+
+    Attributes:
+        user (ForeignKey): The member.
+        project (ForeignKey): The project the user belongs to.
+        role (CharField): "AUTHOR" or "CONTRIBUTOR".
+    """
+
+    # L'index unique (user, project) couvre les recherches par utilisateur : pas d'index séparé
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="project_memberships",
+        db_index=False,
+    )
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name="memberships"
+    )
+    role = models.CharField(max_length=11, choices=ROLES)
+
     class Meta:
         unique_together = ('user', 'project')
 
@@ -109,21 +158,109 @@ class Issue(models.Model):
     status = models.CharField(
         max_length=200, choices=STATUS, default="TODO"
     )  # Included default from the second class
-    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    # Index composites (project, id) et (project, created_time) : voir Meta.indexes
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, db_index=False)
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     assignee = models.ForeignKey(
         Contributor, on_delete=models.CASCADE
     )  # Changed from User to Contributor based on the second class
     created_time = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Un couple d'index par filtre de IssueFilter : tri par id (rowid implicite en fin d'index)
+        # et tri ou plage sur created_time
+        indexes = [
+            models.Index(fields=["project", "id"], name="issue_project_id_idx"),
+            models.Index(fields=["project", "created_time"], name="issue_project_created_idx"),
+            models.Index(fields=["project", "status"], name="issue_project_status_idx"),
+            models.Index(fields=["project", "status", "created_time"], name="issue_project_status_ct_idx"),
+            models.Index(fields=["project", "priority"], name="issue_project_priority_idx"),
+            models.Index(fields=["project", "priority", "created_time"], name="issue_project_priority_ct_idx"),
+            models.Index(fields=["project", "tag"], name="issue_project_tag_idx"),
+            models.Index(fields=["project", "tag", "created_time"], name="issue_project_tag_ct_idx"),
+            models.Index(fields=["project", "assignee"], name="issue_project_assignee_idx"),
+            models.Index(fields=["project", "assignee", "created_time"], name="issue_project_assignee_ct_idx"),
+            models.Index(fields=["project", "author"], name="issue_project_author_idx"),
+            models.Index(fields=["project", "author", "created_time"], name="issue_project_author_ct_idx"),
+        ]
+
+
+COUNTER_DIMENSIONS = [
+    ("status", "status"),
+    ("priority", "priority"),
+    ("tag", "tag"),
+    ("assignee_open", "assignee_open"),
+]
+
+
+class ProjectIssueCounter(models.Model):
+    """
+    Number of issues of a project having a given status, priority, tag, or open issues per assignee.
+
+    Maintained incrementally by `projects.stats` when issues are created, modified or deleted,
+    so that project statistics are read without aggregating the issue table.
+
+    Attributes:
+        project (ForeignKey): The project whose issues are counted.
+        dimension (CharField): "status", "priority", "tag" or "assignee_open".
+        value (CharField): The counted value (a status, ..., or a Contributor id for "assignee_open").
+        count (IntegerField): The number of matching issues.
+    """
+    # L'index unique (project, dimension, value) sert aussi les recherches par projet
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="issue_counters", db_index=False)
+    dimension = models.CharField(max_length=20, choices=COUNTER_DIMENSIONS)
+    value = models.CharField(max_length=200)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('project', 'dimension', 'value')
 
 
 class Comment(models.Model):
     """Represents a comment with issue, description, author, and creation time."""
 
-    issue = models.ForeignKey(Issue, on_delete=models.CASCADE)
+    # Index composites (issue, id) et (issue, created_time) : voir Meta.indexes
+    issue = models.ForeignKey(Issue, on_delete=models.CASCADE, db_index=False)
     desc = models.TextField(max_length=1000)
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     created_time = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["issue", "id"], name="comment_issue_id_idx"),
+            models.Index(fields=["issue", "created_time"], name="comment_issue_created_idx"),
+        ]
+
+
+class Blob(models.Model):
+    """
+    Represents the content of attachment files, stored once per distinct content.
+
+    The file lives at `blobs/<2 hex>/<2 hex>/<sha256>` in the blob storage. `refcount` counts
+    the attachments pointing to the blob; blobs left at zero are deleted by `collect_blobs`.
+
+    Attributes:
+        sha256 (str): The hexadecimal SHA-256 of the content.
+        size (int): The size of the content, in bytes.
+        refcount (int): The number of attachments using the blob.
+        created_time (datetime): The time the content was first stored.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+    created_time = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Le ramasse-miettes ne parcourt que les blobs sans référence
+            models.Index(fields=["id"], condition=models.Q(refcount=0), name="blob_unreferenced_idx"),
+        ]
+
+    @property
+    def name(self):
+        return blob_name(self.sha256)
 
 
 class Attachment(models.Model):
@@ -132,25 +269,66 @@ class Attachment(models.Model):
 
     Attributes:
         issue (Issue): The issue to which the attachment belongs.
-        file (FileField): The file uploaded as an attachment.
+        file (FileField): The file uploaded as an attachment, stored as a blob.
+        blob (Blob): The stored content of the file (None until migrated by `migrate_attachment_blobs`).
+        filename (str): The name of the file, as uploaded.
         created_time (DateTimeField): The timestamp of when the attachment was created.
     """
     issue = models.ForeignKey(Issue, on_delete=models.CASCADE)
-    file = models.FileField(upload_to="attachments")
+    file = models.FileField(upload_to="attachments", storage=get_blob_storage)
+    blob = models.ForeignKey(Blob, on_delete=models.PROTECT, null=True, related_name="+")
+    filename = models.CharField(max_length=255, blank=True)
     created_time = models.DateTimeField(auto_now_add=True)
 
 
 class Notification(models.Model):
     """
-    Represents a notification with issue, description, and creation time.
+    Represents a notification with recipient, issue, description, and creation time.
 
     Attributes:
+        user (User): The recipient of the notification, or None for the notifications
+            written before they had a recipient.
+        actor (User): The user who triggered the notification, or None for the notifications
+            written before they had an actor.
         issue (Issue): The related issue for the notification.
         desc (str): The description of the notification.
+        is_read (bool): Whether the recipient has read the notification.
         created_time (datetime): The creation time of the notification.
     """
+    # L'index (user, is_read, id) sert aussi les recherches par destinataire
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="notifications", db_index=False, null=True
+    )
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name="+")
     issue = models.ForeignKey(Issue, on_delete=models.CASCADE)
     desc = models.TextField(max_length=1000)
+    is_read = models.BooleanField(default=False)
+    created_time = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "is_read", "id"], name="notification_user_unread_idx"),
+        ]
+
+
+class NotificationOutbox(models.Model):
+    """
+    Event waiting to be turned into notifications for the members of a project.
+
+    Written in the same transaction as the issue or comment that triggers it, then drained by
+    the `process_outbox` command, so that write requests never insert one row per member.
+
+    Attributes:
+        project (Project): The project whose members are notified.
+        issue (Issue): The issue the notifications point to.
+        actor (User): The user who triggered the event; they are not notified.
+        desc (str): The text of the notifications.
+        created_time (datetime): The time of the event.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    issue = models.ForeignKey(Issue, on_delete=models.CASCADE)
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    desc = models.TextField(max_length=1000)
     created_time = models.DateTimeField(auto_now_add=True)
 
 
@@ -168,33 +346,87 @@ class Activity(models.Model):
     created_time = models.DateTimeField(auto_now_add=True)
 
 
+ACTIONS = [
+    ("create", "create"),
+    ("update", "update"),
+    ("delete", "delete"),
+]
+
+ACTIVITY_TARGETS = [
+    ("project", "project"),
+    ("contributor", "contributor"),
+    ("issue", "issue"),
+    ("comment", "comment"),
+]
+
+
 class ProjectActivity(models.Model):
     """
     Represents an activity with project, description, and creation time.
 
+    Written by `projects.activity` for the changes made to a project, its contributors, and
+    the deletion of its issues. The entries outlive the project: its deletion is recorded
+    with `target_id` as the only reference to it.
+
     Attributes:
-        project (Project): The project associated with the activity.
+        project (Project): The project associated with the activity, or None once deleted.
         desc (str): The description of the activity.
+        action (str): "create", "update" or "delete".
+        target (str): The kind of object changed: "project", "contributor" or "issue".
+        target_id (int): The identifier of the object changed, when known.
+        actor (User): The user who made the change.
+        changes (dict): The changed fields, as {field: [old value, new value]}.
         created_time (datetime): The creation time of the activity.
     """
-    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    # Index (project, created_time) : voir Meta.indexes
+    project = models.ForeignKey(Project, on_delete=models.SET_NULL, null=True, db_index=False)
     desc = models.TextField(max_length=1000)
+    action = models.CharField(max_length=6, choices=ACTIONS)
+    target = models.CharField(max_length=11, choices=ACTIVITY_TARGETS)
+    target_id = models.PositiveBigIntegerField(null=True)
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name="+")
+    changes = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
     created_time = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["project", "created_time"], name="project_activity_created_idx"),
+        ]
+
 
 class IssueActivity(models.Model):
     """
     Represents an activity with issue, description, and creation time.
 
+    Written by `projects.activity` for the creation and changes of an issue and its comments.
+    The entries outlive the issue, identified by `target` and `target_id`; its deletion is
+    recorded in the project activity.
+
     Attributes:
-        issue (Issue): The issue associated with the activity.
+        issue (Issue): The issue associated with the activity, or None once deleted.
         desc (str): The description of the activity.
+        action (str): "create", "update" or "delete".
+        target (str): The kind of object changed: "issue" or "comment".
+        target_id (int): The identifier of the object changed.
+        actor (User): The user who made the change.
+        changes (dict): The changed fields, as {field: [old value, new value]}.
         created_time (datetime): The creation time of the activity.
     """
-    issue = models.ForeignKey(Issue, on_delete=models.CASCADE)
+    # Index (issue, created_time) : voir Meta.indexes
+    issue = models.ForeignKey(Issue, on_delete=models.SET_NULL, null=True, db_index=False)
     desc = models.TextField(max_length=1000)
+    action = models.CharField(max_length=6, choices=ACTIONS)
+    target = models.CharField(max_length=11, choices=ACTIVITY_TARGETS)
+    target_id = models.PositiveBigIntegerField(null=True)
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name="+")
+    changes = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
     created_time = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["issue", "created_time"], name="issue_activity_created_idx"),
+        ]
+
 
 class IssueNotification(models.Model):
     """
@@ -230,11 +462,15 @@ class IssueAttachment(models.Model):
 
     Attributes:
         issue (Issue): The issue to which the attachment belongs.
-        file (FileField): The file attached to the issue.
+        file (FileField): The file attached to the issue, stored as a blob.
+        blob (Blob): The stored content of the file (None until migrated by `migrate_attachment_blobs`).
+        filename (str): The name of the file, as uploaded.
         created_time (DateTimeField): The timestamp of when the attachment was created.
     """
     issue = models.ForeignKey(Issue, on_delete=models.CASCADE)
-    file = models.FileField(upload_to="attachments")
+    file = models.FileField(upload_to="attachments", storage=get_blob_storage)
+    blob = models.ForeignKey(Blob, on_delete=models.PROTECT, null=True, related_name="+")
+    filename = models.CharField(max_length=255, blank=True)
     created_time = models.DateTimeField(auto_now_add=True)
 
 
@@ -244,14 +480,58 @@ class ProjectAttachment(models.Model):
 
     Attributes:
         project (Project): The project to which the attachment belongs.
-        file (FileField): The file associated with the attachment.
+        file (FileField): The file associated with the attachment, stored as a blob.
+        blob (Blob): The stored content of the file (None until migrated by `migrate_attachment_blobs`).
+        filename (str): The name of the file, as uploaded.
         created_time (DateTimeField): The timestamp when the attachment was created.
     """
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
-    file = models.FileField(upload_to="attachments")
+    file = models.FileField(upload_to="attachments", storage=get_blob_storage)
+    blob = models.ForeignKey(Blob, on_delete=models.PROTECT, null=True, related_name="+")
+    filename = models.CharField(max_length=255, blank=True)
     created_time = models.DateTimeField(auto_now_add=True)
 
 
+class UploadSession(models.Model):
+    """
+    Represents a resumable upload of an issue or project attachment, sent in chunks.
+
+    The bytes are written to a file in storage as they arrive; `offset` counts the bytes
+    received so far. When the last chunk is received, the file joins the blob storage and the
+    attachment is created.
+
+    Attributes:
+        owner (User): The user uploading the file.
+        project (Project): The project the file is attached to.
+        issue (Issue): The issue the file is attached to, or None for a project attachment.
+        filename (str): The name of the file, as sent by the client.
+        name (str): The name of the partial file in storage, then of its blob.
+        size (int): The total size of the file, in bytes.
+        offset (int): The number of bytes received.
+        sha256 (str): The hexadecimal SHA-256 of the file, once complete.
+        attachment_id (int): The IssueAttachment or ProjectAttachment created, once complete.
+        created_time (datetime): The creation time of the upload.
+        updated_at (datetime): The time of the last received chunk.
+        completed_time (datetime): The time the last chunk was received, or None.
+    """
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    issue = models.ForeignKey(Issue, on_delete=models.CASCADE, null=True)
+    filename = models.CharField(max_length=255)
+    name = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True)
+    attachment_id = models.PositiveBigIntegerField(null=True)
+    created_time = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_time = models.DateTimeField(null=True)
+
+    @property
+    def complete(self):
+        return self.completed_time is not None
+
+
 class ProjectComment(models.Model):
     """
     Represents a comment with project, description, author, and creation time.
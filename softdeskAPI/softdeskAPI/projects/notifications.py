@@ -0,0 +1,90 @@
+from collections import defaultdict
+from django.db import connection, transaction
+from projects.models import Notification, NotificationOutbox, ProjectMembership
+
+
+def issue_created_event(issue, actor):
+    return NotificationOutbox(
+        project_id=issue.project_id,
+        issue_id=issue.pk,
+        actor_id=actor.pk,
+        desc=f'New issue "{issue.title}" by {actor.username}.',
+    )
+
+
+def comment_created_event(comment, actor):
+    issue = comment.issue
+    return NotificationOutbox(
+        project_id=issue.project_id,
+        issue_id=issue.pk,
+        actor_id=actor.pk,
+        desc=f'New comment on issue "{issue.title}" by {actor.username}.',
+    )
+
+
+def enqueue(*events):
+    """
+    Writes notification events to the outbox.
+
+    Must be called inside the transaction that writes the triggering issue or comment, so
+    that the event exists if and only if the change was committed. Costs one INSERT,
+    whatever the number of project members.
+    """
+    NotificationOutbox.objects.bulk_create(events)
+
+
+def process_outbox_batch(batch_size=100, notification_batch_size=1000):
+    """
+    Turns the oldest outbox events into one notification per project member, except the actor.
+
+    The events, the recipients of all their projects and the notifications are read and
+    written in a constant number of queries per batch, and the events are deleted in the same
+    transaction as their notifications: a crashed worker leaves them to be processed again.
+    Several workers can run on databases supporting SKIP LOCKED.
+
+    Args:
+        batch_size (int): Number of events per transaction.
+        notification_batch_size (int): Number of notifications per INSERT.
+
+    Returns:
+        int: The number of events processed (0 when the outbox is empty).
+    """
+    with transaction.atomic():
+        events = NotificationOutbox.objects.order_by("id")
+        if connection.features.has_select_for_update_skip_locked:
+            events = events.select_for_update(skip_locked=True)
+        events = list(events.values("id", "project_id", "issue_id", "actor_id", "desc")[:batch_size])
+        if not events:
+            return 0
+
+        members = defaultdict(list)
+        memberships = ProjectMembership.objects.filter(
+            project_id__in={event["project_id"] for event in events}
+        ).values_list("project_id", "user_id")
+        for project_id, user_id in memberships:
+            members[project_id].append(user_id)
+
+        notifications = [
+            Notification(user_id=user_id, actor_id=event["actor_id"], issue_id=event["issue_id"], desc=event["desc"])
+            for event in events
+            for user_id in members[event["project_id"]]
+            if user_id != event["actor_id"]
+        ]
+        Notification.objects.bulk_create(notifications, batch_size=notification_batch_size)
+        NotificationOutbox.objects.filter(id__in=[event["id"] for event in events]).delete()
+    return len(events)
+
+
+def drain_outbox(batch_size=100, notification_batch_size=1000):
+    """
+    Processes outbox batches until the outbox is empty.
+
+    Returns:
+        int: The number of events processed.
+    """
+    total = 0
+    while True:
+        processed = process_outbox_batch(batch_size, notification_batch_size)
+        if not processed:
+            return total
+        total += processed
@@ -0,0 +1,177 @@
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination, _reverse_ordering
+
+PAGE = "page"
+CURSOR = "cursor"
+
+
+class PagePagination(PageNumberPagination):
+    """
+    Page-number pagination, with `apaginate_queryset` for the async views.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async `paginate_queryset`: the count and the page are read with the async ORM.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Compté ici : le Paginator n'exécute plus son COUNT(*) synchrone
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+        self.page.object_list = [obj async for obj in self.page.object_list]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        return list(self.page)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset (cursor) pagination: each page is fetched with `WHERE id > <last id>` instead of
+    `COUNT(*)` plus `OFFSET`, so deep pages cost the same as the first one.
+
+    The ordering defaults to `id` and can be overridden by a view through `cursor_ordering`.
+    Cursors are opaque, base64-encoded positions.
+    """
+    ordering = "id"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.ordering = getattr(view, "cursor_ordering", self.ordering)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async `paginate_queryset`, same cursors and links: only the page query differs,
+        read with async iteration.
+        """
+        self.ordering = getattr(view, "cursor_ordering", self.ordering)
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            order = self.ordering[0]
+            is_reversed = order.startswith("-")
+            order_attr = order.lstrip("-")
+            if self.cursor.reverse != is_reversed:
+                queryset = queryset.filter(**{order_attr + "__lt": current_position})
+            else:
+                queryset = queryset.filter(**{order_attr + "__gt": current_position})
+
+        # Une ligne de plus que la page : indique s'il existe une position suivante
+        results = [obj async for obj in queryset[offset:offset + self.page_size + 1]]
+        self.page = results[:self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+
+class FlexiblePagination(BasePagination):
+    """
+    Chooses between page-number and keyset pagination for each request.
+
+    - `?page=` always selects page-number pagination, so existing clients keep working.
+    - `?cursor=` or `?pagination=cursor` selects keyset pagination.
+    - Otherwise the view's `pagination_mode` ("page" or "cursor") applies.
+    """
+    mode_query_param = "pagination"
+    page_paginator_class = PagePagination
+    cursor_paginator_class = KeysetPagination
+
+    def get_mode(self, request, view):
+        params = request.query_params
+        if PageNumberPagination.page_query_param in params:
+            return PAGE
+        if CursorPagination.cursor_query_param in params:
+            return CURSOR
+        mode = params.get(self.mode_query_param)
+        if mode in (PAGE, CURSOR):
+            return mode
+        return getattr(view, "pagination_mode", PAGE)
+
+    def get_paginator(self, request, view):
+        if self.get_mode(request, view) == CURSOR:
+            return self.cursor_paginator_class()
+        return self.page_paginator_class()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request, view)
+        page = self.paginator.paginate_queryset(queryset, request, view)
+        self.display_page_controls = self.paginator.display_page_controls
+        return page
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request, view)
+        page = await self.paginator.apaginate_queryset(queryset, request, view)
+        self.display_page_controls = self.paginator.display_page_controls
+        return page
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_paginator_class().get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_results(self, data):
+        return data["results"]
+
+    def get_schema_operation_parameters(self, view):
+        parameters = self.page_paginator_class().get_schema_operation_parameters(view)
+        parameters += self.cursor_paginator_class().get_schema_operation_parameters(view)
+        return parameters
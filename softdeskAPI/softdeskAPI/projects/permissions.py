@@ -1,6 +1,6 @@
-﻿from rest_framework import permissions
-from rest_framework.generics import get_object_or_404
-from projects.models import Project, Issue, Comment
+from rest_framework import permissions
+from django.http import Http404
+from projects.membership import aget_project_access, get_project_access
 
 class ProjectPermissions(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -8,14 +8,18 @@ class ProjectPermissions(permissions.BasePermission):
         if project_pk is None:
             return False
 
-        project = get_object_or_404(Project, id=project_pk)
-        is_contributor = project.contributors.filter(id=request.user.id).exists()
-        is_author = project.author == request.user
+        return self.check_access(request, get_project_access(request, view))
 
+    async def ahas_permission(self, request, view):
+        if view.kwargs.get("pk") is None:
+            return False
+        return self.check_access(request, await aget_project_access(request, view))
+
+    def check_access(self, request, access):
         if request.method in permissions.SAFE_METHODS:
-            return is_contributor or is_author
+            return access.is_member
 
-        return is_author  # Pour les méthodes non-sûres (PUT, DELETE), l'utilisateur doit être l'auteur
+        return access.is_author  # Pour les méthodes non-sûres (PUT, DELETE), l'utilisateur doit être l'auteur
 
 class ContributorPermissions(permissions.BasePermission):
     """
@@ -25,21 +29,16 @@ class ContributorPermissions(permissions.BasePermission):
     - For other methods, the user must be the author of the project.
     """
     def has_permission(self, request, view):
-        project_pk = view.kwargs.get("project_pk") or view.kwargs.get("pk")
-        user_pk = view.kwargs.get("user_pk")
+        return self.check_access(request, get_project_access(request, view))
 
-        project = get_object_or_404(Project, id=project_pk)
-        is_contributor = project.contributors.filter(id=request.user.id).exists()
-        is_author = project.author == request.user
+    async def ahas_permission(self, request, view):
+        return self.check_access(request, await aget_project_access(request, view))
 
+    def check_access(self, request, access):
         if request.method in permissions.SAFE_METHODS:
-            return is_contributor or is_author
-
-        if request.method == 'DELETE' and user_pk:
-            # Pour la suppression, vérifie si l'utilisateur est l'auteur du projet
-            return is_author
+            return access.is_member
 
-        return is_author  # Pour les méthodes non-sûres autres que DELETE
+        return access.is_author  # Pour les méthodes non-sûres, y compris la suppression d'un contributeur
 
 class IssuePermissions(permissions.BasePermission):
     """
@@ -51,23 +50,18 @@ class IssuePermissions(permissions.BasePermission):
     """
 
     def has_permission(self, request, view):
-        # Récupérer l'identifiant du projet depuis l'URL
-        project_pk = view.kwargs.get("project_pk")
+        # Récupérer le projet, le rôle de l'utilisateur et l'issue éventuelle en une seule requête
+        return self.check_access(request, get_project_access(request, view))
 
-        # Récupérer le projet ou renvoyer une erreur 404 si non trouvé
-        project = get_object_or_404(Project, id=project_pk)
-
-        # Vérifier si l'utilisateur est un contributeur ou l'auteur du projet
-        is_contributor_or_author = project.contributors.filter(id=request.user.id).exists() or project.author == request.user
+    async def ahas_permission(self, request, view):
+        return self.check_access(request, await aget_project_access(request, view))
 
+    def check_access(self, request, access):
         if request.method in permissions.SAFE_METHODS or request.method == 'POST':
-            return is_contributor_or_author
+            return access.is_member
 
-        if request.method in ['PUT', 'DELETE']:
-            issue_pk = view.kwargs.get("issue_pk")
-            if issue_pk:
-                issue = get_object_or_404(Issue, id=issue_pk)
-                return request.user == issue.author
+        if request.method in ['PUT', 'DELETE'] and access.issue is not None:
+            return access.issue.author_id == request.user.id
 
         return False
 
@@ -91,12 +85,43 @@ class CommentPermissions(permissions.BasePermission):
             return False
 
         try:
-            project = Project.objects.get(pk=project_pk)
-            Issue.objects.get(pk=issue_pk, project=project)  # Vérifier que l'issue appartient bien au projet
-        except (Project.DoesNotExist, Issue.DoesNotExist):
+            # L'issue est récupérée avec son projet : elle appartient donc bien au projet
+            access = get_project_access(request, view)
+        except Http404:
+            return False
+
+        return access.is_member
+
+    async def ahas_permission(self, request, view):
+        if not view.kwargs.get('project_pk') or not view.kwargs.get('issue_pk'):
+            return False
+
+        try:
+            access = await aget_project_access(request, view)
+        except Http404:
             return False
 
-        is_contributor = project.contributors.filter(id=request.user.id).exists()
-        is_author = project.author == request.user
+        return access.is_member
+
 
-        return is_contributor or is_author
\ No newline at end of file
+class UploadPermissions(permissions.BasePermission):
+    """
+    Custom permissions for uploading attachments to a project or one of its issues.
+
+    - The user must be a contributor or the author of the project.
+    - An upload can only be read or continued by the user who started it (see `UploadDetail`).
+    """
+
+    def has_permission(self, request, view):
+        return get_project_access(request, view).is_member
+
+
+class AttachmentPermissions(permissions.BasePermission):
+    """
+    Custom permissions for downloading the attachments of a project or of one of its issues.
+
+    - The user must be a contributor or the author of the project.
+    """
+
+    def has_permission(self, request, view):
+        return get_project_access(request, view).is_member
@@ -0,0 +1,275 @@
+import re
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Q
+from projects.models import Comment, Issue, ProjectMembership
+
+# Table FTS5 créée par la migration 0007_search_index, tenue à jour par des triggers SQL.
+# Absente quand SQLite n'a pas été compilé avec FTS5 : la recherche passe alors par icontains.
+SEARCH_TABLE = "projects_search"
+
+ISSUE = "issue"
+COMMENT = "comment"
+
+SNIPPET_TOKENS = 16
+
+# Sans FTS5, nombre de caractères gardés de part et d'autre du mot trouvé
+SNIPPET_WIDTH = 60
+
+# Au-delà, la liste des projets ne tient plus dans le MATCH : filtre SQL sur project_id
+MAX_SCOPE_TERMS = 500
+
+_TOKEN = re.compile(r"\w+\*?")
+
+SEARCH_SQL = f"""
+    SELECT rowid, kind, project_id, issue_id, title,
+           snippet({SEARCH_TABLE}, 1, '<mark>', '</mark>', '…', {SNIPPET_TOKENS}), rank
+    FROM {SEARCH_TABLE}
+    WHERE {SEARCH_TABLE} MATCH %s {{project_filter}}
+    ORDER BY rank
+    LIMIT %s OFFSET %s
+"""
+
+
+# Résultat de la sonde par alias de base : la bibliothèque SQLite ne change pas en cours de route
+_search_support = {}
+
+
+def fts5_available(connection):
+    """
+    Tells whether the SQLite library was built with FTS5, by creating a throwaway temporary table.
+    """
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.projects_fts5_probe USING fts5(body)")
+        except DatabaseError:
+            return False
+        cursor.execute("DROP TABLE temp.projects_fts5_probe")
+    return True
+
+
+def search_available():
+    """
+    Tells whether the full-text index can be used: SQLite with FTS5, and the index created by
+    the 0007_search_index migration. The probe runs once per database alias.
+    """
+    if connection.alias not in _search_support:
+        _search_support[connection.alias] = (
+            fts5_available(connection) and SEARCH_TABLE in connection.introspection.table_names()
+        )
+    return _search_support[connection.alias]
+
+
+def build_match_query(text):
+    """
+    Turns free text into an FTS5 query matching every word, in any order.
+
+    Each word is quoted so that FTS5 operators and punctuation typed by the user can never
+    produce a syntax error. A trailing `*` is kept as a prefix search.
+
+    Returns:
+        str: The MATCH expression, or an empty string when the text has no word.
+    """
+    terms = []
+    for token in _TOKEN.findall(text):
+        word = token.rstrip("*")
+        terms.append(f'"{word}"*' if token.endswith("*") else f'"{word}"')
+    return " ".join(terms)
+
+
+def search(user, text, project_id=None, limit=10, offset=0):
+    """
+    Searches the issues and comments of the projects the user belongs to, best matches first.
+
+    The user's projects are read from the (user, project) index of `ProjectMembership` and
+    added to the MATCH expression as `scope` tokens, so FTS5 intersects them with the words
+    before ranking instead of ranking every match of every project. Results are ranked with
+    bm25, the title weighing ten times the body.
+
+    Without the full-text index (see `search_available`), falls back to `icontains` lookups:
+    every word must appear, issues come before comments, newest first, and the score is None.
+
+    Args:
+        user (User): The user making the request.
+        text (str): The words to look for.
+        project_id (int): Restricts the search to one project, if given.
+        limit (int): Maximum number of results.
+        offset (int): Number of results to skip.
+
+    Returns:
+        list: One dict per result, with type, id, project, issue, title, snippet and score.
+    """
+    query = build_match_query(text)
+    if not query:
+        return []
+
+    memberships = ProjectMembership.objects.filter(user_id=user.id)
+    if project_id is not None:
+        memberships = memberships.filter(project_id=project_id)
+    if not search_available():
+        return _search_without_index(memberships, text, limit, offset)
+    project_ids = list(memberships.values_list("project_id", flat=True))
+    if not project_ids:
+        return []
+
+    # Les mots de l'utilisateur ne portent que sur le titre et le corps
+    match = f"{{title body}} : ({query})"
+    params = []
+    project_filter = ""
+    if len(project_ids) <= MAX_SCOPE_TERMS:
+        match += " AND scope : (" + " OR ".join(f"p{pk}" for pk in project_ids) + ")"
+    else:
+        project_filter = "AND project_id IN (SELECT project_id FROM projects_projectmembership WHERE user_id = %s)"
+        params.append(user.id)
+
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_SQL.format(project_filter=project_filter), [match, *params, limit, offset])
+        rows = cursor.fetchall()
+
+    return [
+        {
+            "type": kind,
+            # rowid = 2 * id pour une issue, 2 * id + 1 pour un commentaire
+            "id": rowid // 2,
+            "project": project,
+            "issue": issue,
+            "title": title,
+            "snippet": snippet,
+            "score": round(-score, 4),
+        }
+        for rowid, kind, project, issue, title, snippet, score in rows
+    ]
+
+
+def _search_without_index(memberships, text, limit, offset):
+    """
+    Searches with `icontains` lookups, for databases without the FTS5 index.
+
+    Returns:
+        list: The same dicts as `search`.
+    """
+    words = [token.rstrip("*") for token in _TOKEN.findall(text)]
+    pattern = re.compile("|".join(re.escape(word) for word in words), re.IGNORECASE)
+    project_ids = memberships.values("project_id")
+    issues = Issue.objects.filter(project_id__in=project_ids)
+    comments = Comment.objects.filter(issue__project_id__in=project_ids)
+    for word in words:
+        issues = issues.filter(Q(title__icontains=word) | Q(desc__icontains=word))
+        comments = comments.filter(desc__icontains=word)
+
+    # Assez de lignes de chaque côté pour composer la page demandée
+    end = offset + limit
+    results = [
+        {
+            "type": ISSUE, "id": pk, "project": project, "issue": pk, "title": title,
+            "snippet": _snippet(desc, pattern), "score": None,
+        }
+        for pk, project, title, desc in issues.order_by("-id").values_list("id", "project_id", "title", "desc")[:end]
+    ]
+    if len(results) < end:
+        results += [
+            {
+                "type": COMMENT, "id": pk, "project": project, "issue": issue, "title": None,
+                "snippet": _snippet(desc, pattern), "score": None,
+            }
+            for pk, project, issue, desc in comments.order_by("-id").values_list(
+                "id", "issue__project_id", "issue_id", "desc",
+            )[:end - len(results)]
+        ]
+    return results[offset:end]
+
+
+def _snippet(body, pattern):
+    """
+    Cuts the body around the first word found, marked like the FTS5 snippets.
+    """
+    found = pattern.search(body)
+    if found is None:
+        # Mot trouvé dans le titre seulement
+        return body[:2 * SNIPPET_WIDTH] + ("…" if len(body) > 2 * SNIPPET_WIDTH else "")
+    start, end = found.span()
+    begin = max(0, start - SNIPPET_WIDTH)
+    return (
+        ("…" if begin else "") + body[begin:start]
+        + f"<mark>{body[start:end]}</mark>"
+        + body[end:end + SNIPPET_WIDTH] + ("…" if end + SNIPPET_WIDTH < len(body) else "")
+    )
+
+
+def _index_batch(cursor, source, last_id, batch_size):
+    """
+    Indexes the next `batch_size` rows of `source` ("issue" or "comment") after `last_id`.
+
+    Returns:
+        int: The id of the last indexed row, or None when there is nothing left.
+    """
+    table = "projects_issue" if source == ISSUE else "projects_comment"
+    cursor.execute(
+        f"SELECT MAX(id) FROM (SELECT id FROM {table} WHERE id > %s ORDER BY id LIMIT %s)",
+        [last_id, batch_size],
+    )
+    upper = cursor.fetchone()[0]
+    if upper is None:
+        return None
+
+    if source == ISSUE:
+        cursor.execute(
+            f"""
+            INSERT OR REPLACE INTO {SEARCH_TABLE}(rowid, title, body, scope, kind, project_id, issue_id)
+            SELECT id * 2, title, "desc", 'p' || project_id, %s, project_id, id
+            FROM projects_issue WHERE id > %s AND id <= %s
+            """,
+            [ISSUE, last_id, upper],
+        )
+    else:
+        cursor.execute(
+            f"""
+            INSERT OR REPLACE INTO {SEARCH_TABLE}(rowid, title, body, scope, kind, project_id, issue_id)
+            SELECT c.id * 2 + 1, NULL, c."desc", 'p' || i.project_id, %s, i.project_id, i.id
+            FROM projects_comment c JOIN projects_issue i ON i.id = c.issue_id
+            WHERE c.id > %s AND c.id <= %s
+            """,
+            [COMMENT, last_id, upper],
+        )
+    return upper
+
+
+def rebuild_index(source, start_after=0, batch_size=5000, progress=None):
+    """
+    (Re)indexes every row of `source` in batches of ids, one transaction per batch.
+
+    Rows are written with INSERT OR REPLACE, so the rebuild can run on a live index and be
+    resumed with `start_after` after an interruption.
+
+    Args:
+        source (str): "issue" or "comment".
+        start_after (int): Only rows with a greater id are indexed.
+        batch_size (int): Number of rows per transaction.
+        progress (callable): Called with the last indexed id after each batch.
+
+    Returns:
+        int: The id of the last indexed row.
+    """
+    last_id = start_after
+    while True:
+        with transaction.atomic(), connection.cursor() as cursor:
+            upper = _index_batch(cursor, source, last_id, batch_size)
+        if upper is None:
+            return last_id
+        last_id = upper
+        if progress is not None:
+            progress(last_id)
+
+
+def clear_index():
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+
+def optimize_index():
+    """
+    Merges the index segments written by the batches into one, for faster queries.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
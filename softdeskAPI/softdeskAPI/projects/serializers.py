@@ -1,5 +1,8 @@
-﻿from rest_framework import serializers
-from projects.models import Project, Contributor, Issue, Comment
+﻿from django.db import transaction
+from rest_framework import serializers
+from projects.models import Project, Contributor, Issue, Comment, Notification, ProjectActivity, IssueActivity, UploadSession
+from projects.versioning import bump_project_version
+from projects.stats import apply_deltas, count_issues
 
 
 class ProjectSerializer(serializers.ModelSerializer):
@@ -73,6 +76,23 @@ class ContributorSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "role", "project"]
 
 
+class ContributorBulkSerializer(serializers.Serializer):
+    """
+    Serializer for adding and removing many contributors of a project at once.
+
+    Fields:
+    - add: The identifiers of the users to add as contributors.
+    - remove: The identifiers of the users to remove from the contributors.
+    """
+    add = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    remove = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+    def validate(self, attrs):
+        if set(attrs["add"]) & set(attrs["remove"]):
+            raise serializers.ValidationError("A user cannot be both added and removed.")
+        return attrs
+
+
 class IssueSerializer(serializers.ModelSerializer):
     """
     Serializer for the Issue model.
@@ -101,6 +121,64 @@ class IssueSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "author", "created_time", "project"]
 
 
+class IssueBulkListSerializer(serializers.ListSerializer):
+    """
+    List serializer creating many issues of a project at once.
+
+    Items are validated in one pass: field validation needs no query, and all referenced
+    assignees are checked against the project with a single query. Valid issues are then
+    inserted with `bulk_create`, in batches, inside one transaction.
+
+    The project must be given in the serializer context under the "project" key.
+    """
+    batch_size = 500
+
+    def to_internal_value(self, data):
+        items = super().to_internal_value(data)
+
+        project = self.context["project"]
+        assignee_ids = {item["assignee"] for item in items}
+        known_ids = set(
+            Contributor.objects.filter(project=project, id__in=assignee_ids).values_list("id", flat=True)
+        )
+        errors = [
+            {} if item["assignee"] in known_ids
+            else {"assignee": [f"Contributor {item['assignee']} is not a contributor of this project."]}
+            for item in items
+        ]
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+
+    def create(self, validated_data):
+        issues = [
+            Issue(assignee_id=attrs.pop("assignee"), **attrs)
+            for attrs in validated_data
+        ]
+        with transaction.atomic():
+            for start in range(0, len(issues), self.batch_size):
+                Issue.objects.bulk_create(issues[start:start + self.batch_size])
+            # bulk_create n'envoie pas post_save : une seule incrémentation pour tout le lot
+            for project_id, deltas in count_issues(issues).items():
+                apply_deltas(project_id, deltas)
+            if issues:
+                bump_project_version(issues[0].project_id)
+        return issues
+
+
+class IssueBulkSerializer(IssueSerializer):
+    """
+    Serializer for one item of a bulk issue creation.
+
+    The assignee is validated as a plain identifier here, and checked for the whole batch
+    by IssueBulkListSerializer, instead of one query per item.
+    """
+    assignee = serializers.IntegerField()
+
+    class Meta(IssueSerializer.Meta):
+        list_serializer_class = IssueBulkListSerializer
+
+
 class ProjectDetailSerializer(serializers.ModelSerializer):
     """
     Serializer class for the ProjectDetailSerializer.
@@ -151,3 +229,64 @@ class CommentDetailSerializer(serializers.ModelSerializer):
         model = Comment
         fields = ["id", "issue", "description", "author", "created_time"]
         read_only_fields = ["id", "author", "created_time", "issue"]
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the Notification model.
+
+    Serializes the id, issue, description, read flag and creation time of a notification.
+    """
+    class Meta:
+        model = Notification
+        fields = ["id", "issue", "desc", "is_read", "created_time"]
+        read_only_fields = fields
+
+
+class ProjectActivitySerializer(serializers.ModelSerializer):
+    """
+    Serializer for the ProjectActivity model.
+
+    Serializes the action, the changed object, its author, the field-level changes and the
+    creation time of an activity entry.
+    """
+    class Meta:
+        model = ProjectActivity
+        fields = ["id", "action", "target", "target_id", "actor", "changes", "desc", "created_time"]
+        read_only_fields = fields
+
+
+class IssueActivitySerializer(serializers.ModelSerializer):
+    """
+    Serializer for the IssueActivity model.
+
+    Serializes the same fields as ProjectActivitySerializer.
+    """
+    class Meta:
+        model = IssueActivity
+        fields = ProjectActivitySerializer.Meta.fields
+        read_only_fields = fields
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the UploadSession model.
+
+    The client sends the file name and size, and optionally its SHA-256 to attach a file
+    already stored in the project without sending it again. The other fields report the
+    progress of the upload and, once complete, its SHA-256 and the attachment created.
+    """
+    complete = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = UploadSession
+        fields = ["id", "filename", "size", "offset", "complete", "sha256", "issue", "attachment_id", "created_time"]
+        read_only_fields = ["id", "offset", "complete", "issue", "attachment_id", "created_time"]
+        extra_kwargs = {"size": {"min_value": 1}, "sha256": {"required": False}}
+
+    def validate_sha256(self, value):
+        value = value.lower()
+        if len(value) != 64 or any(char not in "0123456789abcdef" for char in value):
+            raise serializers.ValidationError("Expected a hexadecimal SHA-256.")
+        return value
+
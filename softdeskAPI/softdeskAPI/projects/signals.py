@@ -0,0 +1,145 @@
+from django.core.signals import setting_changed
+from django.db.models import QuerySet
+from django.db.models.signals import post_init, pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from projects.models import Project, Contributor, ProjectMembership, Issue, Comment
+from projects.models import Attachment, IssueAttachment, ProjectAttachment
+from projects.caching import get_membership_cache, reset_membership_cache, reset_response_cache
+from projects.membership import AUTHOR, schedule_membership_sync, sync_project_memberships
+from projects.versioning import bump_project_version, bump_issue_project_version
+from projects.stats import COUNTED_FIELDS, snapshot, apply_issue_change
+from projects.blobs import add_references
+
+
+@receiver(post_save, sender=Contributor)
+def contributor_saved(sender, instance, created, **kwargs):
+    if created:
+        schedule_membership_sync(instance.project_id, [instance.user_id])
+    else:
+        # L'utilisateur d'un contributeur peut être modifié : on recalcule tout le projet
+        sync_project_memberships(instance.project_id)
+    get_membership_cache().invalidate_project(instance.project_id)
+    bump_project_version(instance.project_id)
+
+
+@receiver(post_delete, sender=Contributor)
+def contributor_deleted(sender, instance, origin=None, **kwargs):
+    schedule_membership_sync(instance.project_id, [instance.user_id])
+    get_membership_cache().invalidate(instance.user_id, instance.project_id)
+    bump_project_version(instance.project_id, origin)
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, **kwargs):
+    # L'auteur a pu changer : on recalcule l'ancien et le nouvel auteur
+    user_ids = {instance.author_id}
+    if not created:
+        user_ids.update(
+            ProjectMembership.objects.filter(project_id=instance.pk, role=AUTHOR).values_list("user_id", flat=True)
+        )
+    schedule_membership_sync(instance.pk, user_ids)
+    get_membership_cache().invalidate_project(instance.pk)
+    if not created:
+        bump_project_version(instance.pk)
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    get_membership_cache().invalidate_project(instance.pk)
+
+
+@receiver(m2m_changed, sender=Project.contributors.through)
+def project_contributors_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keeps the membership index and the role cache in sync with `Project.contributors`,
+    from either side of the relation.
+    """
+    cache = get_membership_cache()
+    if not reverse:
+        if action in ("post_add", "post_remove"):
+            schedule_membership_sync(instance.pk, pk_set)
+        elif action == "post_clear":
+            sync_project_memberships(instance.pk)
+        if action in ("post_add", "post_remove", "post_clear"):
+            cache.invalidate_project(instance.pk)
+            bump_project_version(instance.pk)
+    elif action in ("post_add", "post_remove"):
+        for project_id in pk_set:
+            schedule_membership_sync(project_id, [instance.pk])
+            cache.invalidate(instance.pk, project_id)
+            bump_project_version(project_id)
+    elif action == "pre_clear":
+        instance._cleared_project_ids = list(instance.contributor_projects.values_list("id", flat=True))
+    elif action == "post_clear":
+        for project_id in getattr(instance, "_cleared_project_ids", []):
+            schedule_membership_sync(project_id, [instance.pk])
+            cache.invalidate(instance.pk, project_id)
+            bump_project_version(project_id)
+
+
+def _counted_values(pk):
+    return Issue.objects.filter(pk=pk).values_list(*COUNTED_FIELDS).first()
+
+
+@receiver(post_init, sender=Issue)
+def issue_initialized(sender, instance, **kwargs):
+    # Valeurs comptées telles que chargées : la mise à jour des compteurs n'a pas à relire l'issue
+    instance._counted = snapshot(instance) if instance.pk is not None else None
+
+
+@receiver(pre_save, sender=Issue)
+def issue_saving(sender, instance, **kwargs):
+    if not instance._state.adding and instance._counted is None:
+        # Instance chargée avec des champs différés : on lit les anciennes valeurs en base
+        instance._counted = _counted_values(instance.pk)
+
+
+@receiver(post_save, sender=Issue)
+def issue_saved(sender, instance, created, **kwargs):
+    new = snapshot(instance) or _counted_values(instance.pk)
+    apply_issue_change(None if created else instance._counted, new)
+    instance._counted = new
+    bump_project_version(instance.project_id)
+
+
+@receiver(post_delete, sender=Issue)
+def issue_deleted(sender, instance, origin=None, **kwargs):
+    # Suppression du projet : ses compteurs sont supprimés en cascade
+    if not (isinstance(origin, Project) or (isinstance(origin, QuerySet) and origin.model is Project)):
+        apply_issue_change(instance._counted or snapshot(instance), None)
+    bump_project_version(instance.project_id, origin)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, **kwargs):
+    bump_issue_project_version(instance.issue_id)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, origin=None, **kwargs):
+    bump_issue_project_version(instance.issue_id, origin)
+
+
+@receiver(post_save, sender=Attachment)
+@receiver(post_save, sender=IssueAttachment)
+@receiver(post_save, sender=ProjectAttachment)
+def attachment_saved(sender, instance, created, **kwargs):
+    if created and instance.blob_id is not None:
+        add_references({instance.blob_id: 1})
+
+
+@receiver(post_delete, sender=Attachment)
+@receiver(post_delete, sender=IssueAttachment)
+@receiver(post_delete, sender=ProjectAttachment)
+def attachment_deleted(sender, instance, **kwargs):
+    # Le blob n'est pas supprimé ici : collect_blobs s'en charge par lots
+    if instance.blob_id is not None:
+        add_references({instance.blob_id: -1})
+
+
+@receiver(setting_changed)
+def cache_setting_changed(sender, setting, **kwargs):
+    if setting in ("MEMBERSHIP_CACHE", "CACHES"):
+        reset_membership_cache()
+    if setting in ("RESPONSE_CACHE", "CACHES"):
+        reset_response_cache()
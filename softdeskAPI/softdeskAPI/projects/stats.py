@@ -0,0 +1,223 @@
+from collections import Counter
+from functools import reduce
+from operator import or_
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, Q, When
+from projects.models import Issue, ProjectIssueCounter, STATUS, PRIORITIES, TAGS
+
+STATUS_DIMENSION = "status"
+PRIORITY_DIMENSION = "priority"
+TAG_DIMENSION = "tag"
+ASSIGNEE_OPEN_DIMENSION = "assignee_open"
+
+# Une issue est ouverte tant qu'elle n'est pas terminée
+CLOSED_STATUS = "COMPLETED"
+
+# Champs de l'issue dont dépendent les compteurs
+COUNTED_FIELDS = ("project_id", "status", "priority", "tag", "assignee_id")
+
+
+def snapshot(issue):
+    """
+    Returns the counted fields of an issue as loaded, or None if some were deferred.
+
+    Reads the instance `__dict__` so that deferred fields are never fetched.
+    """
+    values = tuple(issue.__dict__.get(field) for field in COUNTED_FIELDS)
+    if values[0] is None or any(field not in issue.__dict__ for field in COUNTED_FIELDS):
+        return None
+    return values
+
+
+def issue_keys(values):
+    """
+    Returns the (dimension, value) counters an issue with these counted fields belongs to.
+    """
+    _, status, priority, tag, assignee_id = values
+    keys = [(STATUS_DIMENSION, status), (PRIORITY_DIMENSION, priority), (TAG_DIMENSION, tag)]
+    if status != CLOSED_STATUS and assignee_id is not None:
+        keys.append((ASSIGNEE_OPEN_DIMENSION, str(assignee_id)))
+    return keys
+
+
+def issue_deltas(old, new):
+    """
+    Returns the counter increments of each project for an issue going from `old` to `new`.
+
+    Args:
+        old (tuple): The counted fields before the change, or None for a creation.
+        new (tuple): The counted fields after the change, or None for a deletion.
+
+    Returns:
+        dict: {project_id: Counter({(dimension, value): delta})}, without zero deltas.
+    """
+    deltas = {}
+    if old is not None:
+        for key in issue_keys(old):
+            deltas.setdefault(old[0], Counter())[key] -= 1
+    if new is not None:
+        for key in issue_keys(new):
+            deltas.setdefault(new[0], Counter())[key] += 1
+    return {
+        project_id: Counter({key: delta for key, delta in counter.items() if delta})
+        for project_id, counter in deltas.items()
+    }
+
+
+def apply_deltas(project_id, deltas):
+    """
+    Adds the given increments to the counters of a project, atomically.
+
+    Missing counters are created at zero, then every counter is incremented by a single
+    UPDATE computing `count + delta` in the database, so concurrent writers never overwrite
+    each other's increments. Decrements never create rows: the project may be being deleted.
+
+    Args:
+        project_id (int): The project whose issues changed.
+        deltas (Counter): {(dimension, value): delta}.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    with transaction.atomic(savepoint=False):
+        created = [
+            ProjectIssueCounter(project_id=project_id, dimension=dimension, value=value)
+            for (dimension, value), delta in deltas.items() if delta > 0
+        ]
+        if created:
+            ProjectIssueCounter.objects.bulk_create(created, ignore_conflicts=True)
+        matches = {
+            (dimension, value): Q(dimension=dimension, value=value)
+            for dimension, value in deltas
+        }
+        ProjectIssueCounter.objects.filter(project_id=project_id).filter(reduce(or_, matches.values())).update(
+            count=Case(
+                *[When(matches[key], then=F("count") + delta) for key, delta in deltas.items()],
+                default=F("count"),
+            )
+        )
+
+
+def apply_issue_change(old, new):
+    """
+    Updates the counters for one issue going from `old` to `new` (see `issue_deltas`).
+    """
+    for project_id, deltas in issue_deltas(old, new).items():
+        apply_deltas(project_id, deltas)
+
+
+def count_issues(issues):
+    """
+    Returns the counter increments of newly created issues, grouped by project.
+    """
+    totals = {}
+    for issue in issues:
+        for project_id, deltas in issue_deltas(None, snapshot(issue)).items():
+            totals.setdefault(project_id, Counter()).update(deltas)
+    return totals
+
+
+def get_project_stats(project_id):
+    """
+    Returns the issue statistics of a project, read from its counters in a single query.
+
+    Returns:
+        dict: total and open counts, counts by status, priority and tag (every choice is
+        listed, with zero when absent), and open issues per assignee (Contributor id).
+    """
+    stats = {
+        STATUS_DIMENSION: {value: 0 for value, _ in STATUS},
+        PRIORITY_DIMENSION: {value: 0 for value, _ in PRIORITIES},
+        TAG_DIMENSION: {value: 0 for value, _ in TAGS},
+    }
+    assignees = {}
+    counters = ProjectIssueCounter.objects.filter(project_id=project_id).values_list("dimension", "value", "count")
+    for dimension, value, count in counters:
+        if dimension == ASSIGNEE_OPEN_DIMENSION:
+            if count:
+                assignees[int(value)] = count
+        else:
+            stats[dimension][value] = count
+
+    total = sum(stats[STATUS_DIMENSION].values())
+    return {
+        "total": total,
+        "open": total - stats[STATUS_DIMENSION].get(CLOSED_STATUS, 0),
+        "status": stats[STATUS_DIMENSION],
+        "priority": stats[PRIORITY_DIMENSION],
+        "tag": stats[TAG_DIMENSION],
+        "assignees": [
+            {"assignee": assignee, "open": count} for assignee, count in sorted(assignees.items())
+        ],
+    }
+
+
+def compute_counters(project_ids):
+    """
+    Recomputes the counters of the given projects from the issue table, with GROUP BY queries.
+
+    Returns:
+        dict: {(project_id, dimension, value): count}, without zero counts.
+    """
+    issues = Issue.objects.filter(project_id__in=project_ids)
+    expected = {}
+    for dimension in (STATUS_DIMENSION, PRIORITY_DIMENSION, TAG_DIMENSION):
+        for project_id, value, count in issues.values_list("project_id", dimension).annotate(n=Count("id")).order_by():
+            expected[(project_id, dimension, value)] = count
+    open_issues = issues.exclude(status=CLOSED_STATUS)
+    for project_id, assignee_id, count in open_issues.values_list("project_id", "assignee_id").annotate(n=Count("id")).order_by():
+        expected[(project_id, ASSIGNEE_OPEN_DIMENSION, str(assignee_id))] = count
+    return expected
+
+
+def lock_counters(project_ids):
+    """
+    Takes the write lock on the counters of the given projects until the end of the transaction.
+
+    Issue writes increment these rows (see `apply_deltas`), so they wait for the lock to be
+    released. SQLite has no row locks: any write takes the database write lock, so a no-op
+    UPDATE is used instead of SELECT ... FOR UPDATE.
+    """
+    counters = ProjectIssueCounter.objects.filter(project_id__in=project_ids)
+    if connection.features.has_select_for_update:
+        list(counters.select_for_update().order_by("pk").values_list("pk", flat=True))
+    else:
+        counters.update(count=F("count"))
+
+
+def reconcile_counters(project_ids):
+    """
+    Rewrites the counters of the given projects that drifted from the issue table.
+
+    The counters are locked before the issues are counted, and rewritten in the same
+    transaction: an issue written meanwhile either is counted, or applies its increment
+    after the rewrite.
+
+    Returns:
+        int: The number of counters fixed (updated, created or deleted).
+    """
+    with transaction.atomic():
+        lock_counters(project_ids)
+        expected = compute_counters(project_ids)
+        stored = {
+            (project_id, dimension, value): (pk, count)
+            for pk, project_id, dimension, value, count in ProjectIssueCounter.objects.filter(
+                project_id__in=project_ids
+            ).values_list("id", "project_id", "dimension", "value", "count")
+        }
+
+        # Les compteurs sans issue sont supprimés ; seuls ceux qui n'étaient pas à zéro avaient dérivé
+        stale = {key: pk_count for key, pk_count in stored.items() if key not in expected}
+        fixed = [
+            ProjectIssueCounter(project_id=project_id, dimension=dimension, value=value, count=count)
+            for (project_id, dimension, value), count in expected.items()
+            if stored.get((project_id, dimension, value), (None, None))[1] != count
+        ]
+        ProjectIssueCounter.objects.filter(pk__in=[pk for pk, _ in stale.values()]).delete()
+        ProjectIssueCounter.objects.bulk_create(
+            fixed,
+            update_conflicts=True,
+            unique_fields=["project", "dimension", "value"],
+            update_fields=["count"],
+        )
+    return sum(1 for _, count in stale.values() if count) + len(fixed)
@@ -0,0 +1,98 @@
+import hashlib
+import os
+import tempfile
+from django.core.files.storage import FileSystemStorage
+
+BLOB_DIR = "blobs"
+
+# Lectures pour le calcul de l'empreinte d'un fichier
+HASH_BUFFER_SIZE = 64 * 1024
+
+
+def blob_name(sha256):
+    """
+    Returns the storage name of the blob with this SHA-256: blobs/ab/cd/abcd….
+
+    Two levels of 256 directories keep each directory small, whatever the number of blobs.
+    """
+    return f"{BLOB_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def file_sha256(content):
+    """
+    Returns the hexadecimal SHA-256 of a Django File, read in HASH_BUFFER_SIZE pieces.
+    """
+    hasher = hashlib.sha256()
+    content.seek(0)
+    for data in content.chunks(HASH_BUFFER_SIZE):
+        hasher.update(data)
+    content.seek(0)
+    return hasher.hexdigest()
+
+
+class BlobStorage(FileSystemStorage):
+    """
+    File system storage naming each file after the SHA-256 of its content.
+
+    The name given by the caller is ignored: identical contents share one file, which is only
+    written the first time. The blobs live under MEDIA_ROOT, next to the uploads in progress,
+    so that a completed upload is moved into place without copying its bytes.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Le nom définitif dépend du contenu : il est choisi par _save
+        return name
+
+    def _save(self, name, content):
+        name = blob_name(file_sha256(content))
+        if self.exists(name):
+            return name
+        # Écriture dans un fichier temporaire du même dossier puis renommage atomique :
+        # deux écritures concurrentes du même contenu ne se gênent pas
+        directory = self._prepare_directory(name)
+        fd, temporary = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as target:
+                for data in content.chunks(HASH_BUFFER_SIZE):
+                    target.write(data)
+            self.adopt(temporary, name)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.unlink(temporary)
+            raise
+        return name
+
+    def _prepare_directory(self, name):
+        directory = os.path.dirname(self.path(name))
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def adopt(self, path, name):
+        """
+        Moves the file at `path` to the blob `name`, or deletes it if the blob already exists.
+
+        `path` must be on the same file system: the bytes are renamed, never copied.
+        """
+        target = self.path(name)
+        if os.path.abspath(path) == target:
+            # Fichier déjà à sa place (enregistré par le FileField)
+            return
+        if os.path.exists(target):
+            os.unlink(path)
+            return
+        self._prepare_directory(name)
+        os.chmod(path, self.file_permissions_mode or 0o644)
+        os.replace(path, target)
+
+
+_blob_storage = None
+
+
+def get_blob_storage():
+    """
+    Returns the BlobStorage of the attachment file fields.
+    """
+    global _blob_storage
+    if _blob_storage is None:
+        _blob_storage = BlobStorage()
+    return _blob_storage
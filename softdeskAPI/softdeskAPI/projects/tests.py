@@ -1,10 +1,41 @@
-from django.test import TestCase
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from io import BytesIO, StringIO
+from unittest import mock
+from datetime import timedelta
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test.utils import CaptureQueriesContext
+from asgiref.sync import async_to_sync
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth.models import User
 from projects.models import Project
 from projects.models import Contributor
 from projects.models import Issue
 from projects.models import Comment
+from projects.models import ProjectMembership
+from projects.models import ProjectIssueCounter
+from projects.models import Notification, NotificationOutbox
+from projects.models import ProjectActivity, IssueActivity
+from projects.models import Blob, IssueAttachment, ProjectAttachment, UploadSession
+from projects.notifications import drain_outbox
+from projects.activity import ActivityRecorder
+from projects.uploads import reset_hashers, write_chunk
+from projects.storage import blob_name
+from projects.search import fts5_available, search, search_available
+from projects.stats import compute_counters, reconcile_counters
+from projects.caching import MISSING, LRUCache, MembershipCache, get_membership_cache, get_response_cache
+from projects import async_views
 
 
 class AuthenticationTest(TestCase):
@@ -234,3 +265,1559 @@ class CommentAuthorizationTest(TestCase):
         self.assertEqual(response.status_code, 403)  # Forbidden
 
 
+class ProjectFixturesMixin:
+    """Project with an author, a contributor, an outsider, one issue and one comment."""
+
+    def setUp(self):
+        # Les identifiants sont réutilisés d'un test à l'autre : on repart de caches vides
+        get_membership_cache().clear()
+        get_response_cache().backend.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="author", password="testpass")
+        self.contributor = User.objects.create_user(username="contributor", password="testpass")
+        self.other_user = User.objects.create_user(username="otheruser", password="otherpass")
+        self.project = Project.objects.create(
+            title="Test Project",
+            description="Description for test project",
+            type="BACKEND",
+            tags="BUG",
+            priority="LOW",
+            status="OPEN",
+            author=self.user,
+        )
+        self.assignee = Contributor.objects.create(user=self.contributor, project=self.project)
+        self.issue = Issue.objects.create(
+            title="Test Issue",
+            desc="Description for test issue",
+            tag="BUG",
+            status="OPEN",
+            project=self.project,
+            author=self.user,
+            assignee=self.assignee,
+        )
+        Comment.objects.create(issue=self.issue, desc="Test comment", author=self.user)
+
+
+class ProjectAccessTest(ProjectFixturesMixin, TestCase):
+
+    def test_issue_list_resolves_access_once(self):
+        self.client.force_authenticate(user=self.contributor)
+        # Accès + COUNT + liste (pagination par numéro de page, par défaut)
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/projects/{self.project.id}/issues/')
+        self.assertEqual(response.status_code, 200)
+        # Pagination par curseur : pas de COUNT
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/projects/{self.project.id}/issues/?pagination=cursor')
+        self.assertEqual(response.status_code, 200)
+
+    def test_comment_list_resolves_access_once(self):
+        self.client.force_authenticate(user=self.contributor)
+        # Accès + COUNT + liste
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/projects/{self.project.id}/issues/{self.issue.id}/comments/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_issue_detail(self):
+        self.client.force_authenticate(user=self.user)
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/projects/{self.project.id}/issues/{self.issue.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["id"], self.issue.id)
+
+    def test_create_comment_reuses_issue(self):
+        self.client.force_authenticate(user=self.contributor)
+        # Accès + INSERT + version du projet + événement de notification + entrée d'activité
+        with self.assertNumQueries(5):
+            response = self.client.post(f'/projects/{self.project.id}/issues/{self.issue.id}/comments/', {"desc": "Another comment"}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["issue"], self.issue.id)
+
+    def test_non_member_forbidden(self):
+        self.client.force_authenticate(user=self.other_user)
+        response = self.client.get(f'/projects/{self.project.id}/issues/')
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get(f'/projects/{self.project.id}/issues/{self.issue.id}/comments/')
+        self.assertEqual(response.status_code, 403)
+
+    def test_issue_from_other_project_not_found(self):
+        other_project = Project.objects.create(
+            title="Other", description="Other", type="IOS", tags="BUG",
+            priority="LOW", status="OPEN", author=self.user,
+        )
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(f'/projects/{other_project.id}/issues/{self.issue.id}/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_contributor_cannot_update_project(self):
+        self.client.force_authenticate(user=self.contributor)
+        response = self.client.patch(f'/projects/{self.project.id}/', {"title": "Updated"}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.patch(f'/projects/{self.project.id}/', {"title": "Updated"}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+
+class MembershipCacheTest(ProjectFixturesMixin, TestCase):
+
+    def test_second_request_skips_membership_query(self):
+        self.client.force_authenticate(user=self.contributor)
+        self.client.get(f'/projects/{self.project.id}/issues/')
+        get_response_cache().backend.clear()
+        # Rôle en cache : version du projet (ETag) + COUNT + liste
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/projects/{self.project.id}/issues/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_contributor_removal_invalidates(self):
+        self.client.force_authenticate(user=self.contributor)
+        self.assertEqual(self.client.get(f'/projects/{self.project.id}/issues/').status_code, 200)
+        self.issue.delete()
+        self.assignee.delete()
+        self.assertEqual(self.client.get(f'/projects/{self.project.id}/issues/').status_code, 403)
+
+    def test_m2m_contributors_invalidate(self):
+        self.client.force_authenticate(user=self.other_user)
+        self.assertEqual(self.client.get(f'/projects/{self.project.id}/issues/').status_code, 403)
+        self.project.contributors.add(self.other_user)
+        self.assertEqual(self.client.get(f'/projects/{self.project.id}/issues/').status_code, 200)
+        self.other_user.contributor_projects.clear()
+        self.assertEqual(self.client.get(f'/projects/{self.project.id}/issues/').status_code, 403)
+
+    def test_author_change_invalidates(self):
+        self.client.force_authenticate(user=self.other_user)
+        self.assertEqual(self.client.patch(f'/projects/{self.project.id}/', {"title": "x"}, format='json').status_code, 403)
+        self.project.author = self.other_user
+        self.project.save()
+        self.assertEqual(self.client.patch(f'/projects/{self.project.id}/', {"title": "x"}, format='json').status_code, 200)
+
+    def test_shared_backend(self):
+        cache = MembershipCache(cache_alias="default")
+        cache.set_role(1, 2, None)
+        cache.set_role(3, 2, "AUTHOR")
+        self.assertIsNone(cache.get_role(1, 2))
+        self.assertEqual(cache.get_role(3, 2), "AUTHOR")
+        cache.invalidate_project(2)
+        self.assertEqual(cache.stats.hits, 2)
+        self.assertIsNot(cache.get_role(3, 2), "AUTHOR")
+        self.assertEqual(cache.stats.misses, 1)
+
+    def test_other_workers_expire_revoked_roles(self):
+        # Deux processus : l'invalidation par signal n'atteint que celui qui a traité l'écriture
+        writer = MembershipCache()
+        other = MembershipCache()
+        writer.set_role(1, 2, "CONTRIBUTOR")
+        other.set_role(1, 2, "CONTRIBUTOR")
+        writer.invalidate_project(2)
+        self.assertIs(writer.get_role(1, 2), MISSING)
+        self.assertEqual(other.get_role(1, 2), "CONTRIBUTOR")
+        now = time.monotonic()
+        # Rôle retiré : servi au plus quelques secondes par les autres processus
+        with mock.patch("projects.caching.time.monotonic", return_value=now + 6):
+            self.assertIs(other.get_role(1, 2), MISSING)
+
+    def test_lru_eviction(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b", None))
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertEqual(cache.stats.hits, 2)
+        self.assertEqual(cache.stats.misses, 1)
+
+    def test_cache_stats_admin_only(self):
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get('/projects/cache-stats/').status_code, 403)
+        admin = User.objects.create_superuser(username="admin", password="adminpass")
+        self.client.force_authenticate(user=admin)
+        response = self.client.get('/projects/cache-stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("hit_ratio", response.data["membership"])
+
+
+class ProjectMembershipTest(ProjectFixturesMixin, TestCase):
+
+    def roles(self):
+        return dict(ProjectMembership.objects.filter(project=self.project).values_list("user__username", "role"))
+
+    def test_index_follows_sources(self):
+        self.assertEqual(self.roles(), {"author": "AUTHOR", "contributor": "CONTRIBUTOR"})
+        self.project.contributors.add(self.other_user)
+        self.assertEqual(self.roles()["otheruser"], "CONTRIBUTOR")
+        self.project.contributors.remove(self.other_user)
+        self.assertNotIn("otheruser", self.roles())
+
+    def test_author_change(self):
+        self.project.author = self.other_user
+        self.project.save()
+        self.assertEqual(self.roles(), {"otheruser": "AUTHOR", "contributor": "CONTRIBUTOR"})
+
+    def test_contributor_delete(self):
+        self.issue.delete()
+        self.assignee.delete()
+        self.assertEqual(self.roles(), {"author": "AUTHOR"})
+
+    def test_project_list_is_restricted(self):
+        Project.objects.create(
+            title="Other", description="Other", type="IOS", tags="BUG",
+            priority="LOW", status="OPEN", author=self.other_user,
+        )
+        self.client.force_authenticate(user=self.contributor)
+        response = self.client.get('/projects/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p["id"] for p in response.data["results"]], [self.project.id])
+
+    def test_created_project_is_listed(self):
+        self.client.force_authenticate(user=self.other_user)
+        response = self.client.post('/projects/', {
+            "title": "Mine", "description": "Mine", "type": "IOS", "contributors": [self.contributor.id],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        response = self.client.get('/projects/')
+        self.assertEqual(response.data["count"], 1)
+
+
+class ListQueryCountTest(ProjectFixturesMixin, TestCase):
+
+    def count_queries(self, url):
+        self.client.force_authenticate(user=self.user)
+        get_membership_cache().clear()
+        get_response_cache().backend.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def add_projects(self, count):
+        for i in range(count):
+            project = Project.objects.create(
+                title=f"Project {i}", description="Description", type="BACKEND",
+                tags="BUG", priority="LOW", status="OPEN", author=self.user,
+            )
+            project.contributors.add(self.contributor, self.other_user)
+
+    def add_issues(self, count):
+        Issue.objects.bulk_create(
+            Issue(title=f"Issue {i}", desc="Description", tag="BUG", status="OPEN",
+                  project=self.project, author=self.user, assignee=self.assignee)
+            for i in range(count)
+        )
+
+    def test_project_list(self):
+        self.add_projects(1)
+        small = self.count_queries('/projects/')
+        self.add_projects(8)
+        self.assertEqual(self.count_queries('/projects/'), small)
+
+    def test_project_detail(self):
+        self.project.contributors.add(self.contributor, self.other_user)
+        # Accès + contributeurs
+        self.assertEqual(self.count_queries(f'/projects/{self.project.id}/'), 2)
+
+    def test_issue_list(self):
+        url = f'/projects/{self.project.id}/issues/'
+        small = self.count_queries(url)
+        self.add_issues(9)
+        self.assertEqual(self.count_queries(url), small)
+
+    def test_comment_list(self):
+        url = f'/projects/{self.project.id}/issues/{self.issue.id}/comments/'
+        small = self.count_queries(url)
+        Comment.objects.bulk_create(
+            Comment(issue=self.issue, desc=f"Comment {i}", author=self.contributor) for i in range(9)
+        )
+        self.assertEqual(self.count_queries(url), small)
+
+    def test_contributor_list(self):
+        url = f'/projects/{self.project.id}/contributors/'
+        small = self.count_queries(url)
+        Contributor.objects.create(user=self.other_user, project=self.project)
+        self.assertEqual(self.count_queries(url), small)
+
+
+class KeysetPaginationTest(ProjectFixturesMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        Issue.objects.bulk_create(
+            Issue(title=f"Issue {i}", desc="Description", tag="BUG", status="OPEN",
+                  project=self.project, author=self.user, assignee=self.assignee)
+            for i in range(24)
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_default_is_page_number_pagination(self):
+        # Réponse par défaut inchangée : le curseur n'est qu'une option
+        response = self.client.get(f'/projects/{self.project.id}/issues/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["count"], len(response.data["results"])), (25, 10))
+        self.assertIsNone(response.data["previous"])
+        self.assertTrue(response.data["next"].endswith("?page=2"))
+        response = self.client.get(f'/projects/{self.project.id}/issues/{self.issue.id}/comments/')
+        self.assertEqual((response.data["count"], response.data["next"], response.data["previous"]), (1, None, None))
+
+    def test_cursor_walks_all_issues(self):
+        url = f'/projects/{self.project.id}/issues/?pagination=cursor'
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            ids += [issue["id"] for issue in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(ids, list(Issue.objects.filter(project=self.project).order_by('id').values_list('id', flat=True)))
+
+    def test_page_parameter_keeps_page_number_pagination(self):
+        response = self.client.get(f'/projects/{self.project.id}/issues/?page=3')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 25)
+        self.assertEqual(len(response.data["results"]), 5)
+
+    def test_query_parameter_selects_cursor(self):
+        response = self.client.get('/projects/?pagination=cursor')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("count", response.data)
+        response = self.client.get('/projects/')
+        self.assertIn("count", response.data)
+
+
+class QueryPlanTest(ProjectFixturesMixin, TestCase):
+    """
+    Runs EXPLAIN QUERY PLAN on every SELECT issued by the views and fails on full table scans.
+    """
+
+    def assert_no_full_scan(self, method, url, data=None):
+        get_membership_cache().clear()
+        self.client.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertLess(response.status_code, 400, response.data)
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                if not query["sql"].startswith("SELECT"):
+                    continue
+                cursor.execute("EXPLAIN QUERY PLAN " + query["sql"])
+                plan = [row[-1] for row in cursor.fetchall()]
+                scans = [step for step in plan if step.startswith("SCAN") and "CONSTANT ROW" not in step]
+                self.assertEqual(scans, [], f"{url}: {query['sql']}\n" + "\n".join(plan))
+
+    def test_project_views(self):
+        self.assert_no_full_scan("get", '/projects/')
+        self.assert_no_full_scan("get", '/projects/?pagination=cursor')
+        self.assert_no_full_scan("get", f'/projects/{self.project.id}/')
+
+    def test_contributor_views(self):
+        self.assert_no_full_scan("get", f'/projects/{self.project.id}/contributors/')
+        self.assert_no_full_scan("get", f'/projects/{self.project.id}/users/{self.contributor.id}/')
+
+    def test_issue_views(self):
+        self.assert_no_full_scan("get", f'/projects/{self.project.id}/issues/')
+        self.assert_no_full_scan("get", f'/projects/{self.project.id}/issues/?page=1')
+        self.assert_no_full_scan("get", f'/projects/{self.project.id}/issues/{self.issue.id}/')
+
+    def test_comment_views(self):
+        comment = Comment.objects.filter(issue=self.issue).first()
+        self.assert_no_full_scan("get", f'/projects/{self.project.id}/issues/{self.issue.id}/comments/')
+        self.assert_no_full_scan("get", f'/projects/{self.project.id}/issues/{self.issue.id}/comments/{comment.id}/')
+
+
+class BulkIssueCreateTest(ProjectFixturesMixin, TestCase):
+
+    def issue_payload(self, count, assignee=None):
+        return [
+            {"title": f"Issue {i}", "desc": "Imported", "tag": "TASK", "status": "OPEN",
+             "assignee": assignee or self.assignee.id}
+            for i in range(count)
+        ]
+
+    def test_bulk_create(self):
+        self.client.force_authenticate(user=self.contributor)
+        url = f'/projects/{self.project.id}/issues/'
+        # Accès + contrôle des assignees + SAVEPOINT / INSERT / compteurs (INSERT + UPDATE)
+        # / version du projet / RELEASE + événements de notification + entrées d'activité
+        with self.assertNumQueries(10):
+            response = self.client.post(url, self.issue_payload(50), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 50)
+        self.assertTrue(all(item["id"] for item in response.data))
+        self.assertEqual(Issue.objects.filter(project=self.project, author=self.contributor).count(), 50)
+
+    def test_bulk_create_reports_errors_per_item(self):
+        other_project = Project.objects.create(
+            title="Other", description="Other", type="IOS", tags="BUG",
+            priority="LOW", status="OPEN", author=self.other_user,
+        )
+        foreign = Contributor.objects.create(user=self.other_user, project=other_project)
+        payload = self.issue_payload(3)
+        payload[1]["assignee"] = foreign.id
+        payload[2]["tag"] = "UNKNOWN"
+        self.client.force_authenticate(user=self.contributor)
+        response = self.client.post(f'/projects/{self.project.id}/issues/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("tag", response.data[2])
+        self.assertEqual(Issue.objects.filter(project=self.project).count(), 1)
+
+        payload[2]["tag"] = "BUG"
+        response = self.client.post(f'/projects/{self.project.id}/issues/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("assignee", response.data[1])
+        self.assertEqual(Issue.objects.filter(project=self.project).count(), 1)
+
+    def test_bulk_create_requires_membership(self):
+        self.client.force_authenticate(user=self.other_user)
+        response = self.client.post(f'/projects/{self.project.id}/issues/', self.issue_payload(2), format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class BulkContributorTest(ProjectFixturesMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.team = [User(username=f"member{i}") for i in range(5)]
+        User.objects.bulk_create(self.team)
+        self.team = list(User.objects.filter(username__startswith="member"))
+        self.url = f'/projects/{self.project.id}/contributors/bulk/'
+
+    def members(self):
+        return set(ProjectMembership.objects.filter(project=self.project).values_list("user_id", flat=True))
+
+    def test_add_and_remove(self):
+        self.client.force_authenticate(user=self.user)
+        ids = [user.id for user in self.team]
+        response = self.client.post(self.url, {"add": ids + [self.contributor.id]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["added"], ids)
+        self.assertEqual(Contributor.objects.filter(project=self.project).count(), 6)
+        self.assertEqual(set(self.project.contributors.values_list("id", flat=True)), set(ids) | {self.contributor.id})
+        self.assertEqual(self.members(), set(ids) | {self.user.id, self.contributor.id})
+
+        response = self.client.post(self.url, {"remove": ids[:3]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["removed"], ids[:3])
+        self.assertEqual(self.members(), set(ids[3:]) | {self.user.id, self.contributor.id})
+        self.assertFalse(self.project.contributors.filter(id__in=ids[:3]).exists())
+
+    def test_add_is_idempotent(self):
+        self.client.force_authenticate(user=self.user)
+        ids = [user.id for user in self.team]
+        self.client.post(self.url, {"add": ids}, format='json')
+        response = self.client.post(self.url, {"add": ids}, format='json')
+        self.assertEqual(response.data["added"], [])
+        self.assertEqual(Contributor.objects.filter(project=self.project).count(), 6)
+
+    def test_cannot_remove_author(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url, {"remove": [self.user.id]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(self.user.id, self.members())
+
+    def test_unknown_user(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url, {"add": [987654]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_only_author(self):
+        self.client.force_authenticate(user=self.contributor)
+        response = self.client.post(self.url, {"add": [self.other_user.id]}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class ConditionalRequestTest(ProjectFixturesMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.contributor)
+
+    def assert_not_modified(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        get_membership_cache().clear()
+        # Le 304 ne coûte que la requête d'accès, qui charge aussi la version
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+        return etag
+
+    def test_issue_list(self):
+        url = f'/projects/{self.project.id}/issues/'
+        etag = self.assert_not_modified(url)
+        Comment.objects.create(issue=self.issue, desc="New comment", author=self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_issue_detail(self):
+        url = f'/projects/{self.project.id}/issues/{self.issue.id}/'
+        etag = self.assert_not_modified(url)
+        self.issue.title = "Renamed"
+        self.issue.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["title"], "Renamed")
+
+    def test_project_detail(self):
+        url = f'/projects/{self.project.id}/'
+        etag = self.assert_not_modified(url)
+        self.project.contributors.add(self.other_user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_without_validators(self):
+        url = f'/projects/{self.project.id}/issues/{self.issue.id}/'
+        with mock.patch("projects.views.IssueDetail.get_validators", return_value=None):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        self.assertEqual(response.data["id"], self.issue.id)
+
+    def test_child_changes_bump_version(self):
+        version = Project.objects.get(pk=self.project.pk).version
+        Issue.objects.filter(pk=self.issue.pk).get().delete()
+        # Suppression de l'issue et de ses commentaires en cascade : une seule incrémentation chacun
+        self.assertEqual(Project.objects.get(pk=self.project.pk).version, version + 2)
+
+
+class ResponseCacheTest(ProjectFixturesMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.contributor)
+
+    def test_hit_after_miss(self):
+        url = f'/projects/{self.project.id}/issues/{self.issue.id}/comments/'
+        first = self.client.get(url)
+        self.assertEqual(first["X-Cache"], "MISS")
+        hits = get_response_cache().stats.hits
+        # Rôle en cache : seule la version du projet est lue
+        with self.assertNumQueries(1):
+            second = self.client.get(url)
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(get_response_cache().stats.hits, hits + 1)
+
+    def test_write_invalidates(self):
+        url = f'/projects/{self.project.id}/contributors/'
+        self.client.get(url)
+        Contributor.objects.create(user=self.other_user, project=self.project)
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.json()["results"]), 2)
+
+    def test_pages_are_cached_separately(self):
+        url = f'/projects/{self.project.id}/issues/'
+        self.client.get(url)
+        self.assertEqual(self.client.get(url + '?page=1')["X-Cache"], "MISS")
+        self.assertEqual(self.client.get(url + '?page=1')["X-Cache"], "HIT")
+
+    def test_project_save_keeps_version_monotonic(self):
+        project = Project.objects.get(pk=self.project.pk)
+        Issue.objects.create(
+            title="Other", desc="Other", tag="BUG", status="OPEN",
+            project=self.project, author=self.user, assignee=self.assignee,
+        )
+        version = Project.objects.get(pk=self.project.pk).version
+        project.title = "Renamed"
+        project.save()
+        self.assertEqual(Project.objects.get(pk=self.project.pk).version, version + 1)
+
+    @override_settings(CACHES={"default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": "/tmp/softdesk-response-cache-test",
+    }})
+    def test_file_based_backend(self):
+        get_response_cache().backend.clear()
+        url = f'/projects/{self.project.id}/issues/'
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+        self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+        get_response_cache().backend.clear()
+
+
+class SearchTest(ProjectFixturesMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.contributor)
+
+    def search(self, query, **params):
+        response = self.client.get('/projects/search/', dict(params, q=query))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def create_issue(self, title, desc, project=None, assignee=None):
+        return Issue.objects.create(
+            title=title, desc=desc, tag="BUG", status="OPEN",
+            project=project or self.project, author=self.user, assignee=assignee or self.assignee,
+        )
+
+    def test_finds_issues_and_comments(self):
+        issue = self.create_issue("Crash au démarrage", "L'application plante")
+        comment = Comment.objects.create(issue=issue, desc="Le démarrage plante aussi chez moi", author=self.user)
+        results = self.search("demarrage")["results"]
+        self.assertEqual({(r["type"], r["id"]) for r in results}, {("issue", issue.id), ("comment", comment.id)})
+        # Le titre pèse plus lourd que le corps
+        self.assertEqual(results[0]["type"], "issue")
+        self.assertIn("<mark>", results[1]["snippet"])
+        self.assertEqual(results[1]["issue"], issue.id)
+
+    def test_scoped_to_member_projects(self):
+        other_project = Project.objects.create(
+            title="Secret", description="Secret", type="BACKEND", author=self.other_user,
+            tags="BUG", priority="LOW", status="OPEN",
+        )
+        assignee = Contributor.objects.create(user=self.other_user, project=other_project)
+        self.create_issue("Confidentiel", "Confidentiel", project=other_project, assignee=assignee)
+        self.assertEqual(self.search("confidentiel")["results"], [])
+        self.client.force_authenticate(user=self.other_user)
+        self.assertEqual(len(self.search("confidentiel")["results"]), 1)
+        self.assertEqual(self.search("confidentiel", project=self.project.id)["results"], [])
+        # Trop de projets pour le MATCH : filtre SQL sur l'index des appartenances
+        with mock.patch("projects.search.MAX_SCOPE_TERMS", 0):
+            self.assertEqual(len(self.search("confidentiel")["results"]), 1)
+            self.client.force_authenticate(user=self.contributor)
+            self.assertEqual(self.search("confidentiel")["results"], [])
+
+    def test_index_follows_updates_and_deletes(self):
+        issue = self.create_issue("Lenteur", "Page lente")
+        issue.title = "Performance"
+        issue.save()
+        self.assertEqual(self.search("lenteur")["results"], [])
+        self.assertEqual(self.search("performance")["results"][0]["id"], issue.id)
+        issue.delete()
+        self.assertEqual(self.search("performance")["results"], [])
+
+    def test_pagination(self):
+        Issue.objects.bulk_create(
+            Issue(title=f"Timeout {i}", desc="Description", tag="BUG", status="OPEN",
+                  project=self.project, author=self.user, assignee=self.assignee)
+            for i in range(15)
+        )
+        first = self.search("timeout")
+        self.assertEqual(len(first["results"]), 10)
+        self.assertIsNone(first["previous"])
+        second = self.client.get(first["next"]).data
+        self.assertEqual(len(second["results"]), 5)
+        self.assertIsNone(second["next"])
+        ids = {r["id"] for r in first["results"]} | {r["id"] for r in second["results"]}
+        self.assertEqual(len(ids), 15)
+
+    def test_user_input_cannot_break_the_query(self):
+        self.create_issue("Erreur", "Description")
+        self.assertEqual(len(self.search('erreur" (-:')["results"]), 1)
+        self.assertEqual(len(self.search('err*')["results"]), 1)
+        self.assertEqual(self.search('"')["results"], [])
+
+    def test_rebuild_command(self):
+        issue = self.create_issue("Reindexation", "Description")
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM projects_search")
+        self.assertEqual(self.search("reindexation")["results"], [])
+        call_command("rebuild_search_index", batch_size=1, stdout=StringIO())
+        self.assertEqual(self.search("reindexation")["results"][0]["id"], issue.id)
+        self.assertEqual([r["type"] for r in self.search("test comment")["results"]], ["comment"])
+
+    def test_falls_back_without_fts5(self):
+        issue = self.create_issue("Crash au démarrage", "L'application plante")
+        comment = Comment.objects.create(issue=issue, desc="Le démarrage plante aussi chez moi", author=self.user)
+        with mock.patch("projects.search.search_available", return_value=False):
+            results = self.search("plante démarrage")["results"]
+            self.assertEqual([(r["type"], r["id"]) for r in results], [("issue", issue.id), ("comment", comment.id)])
+            self.assertEqual(results[1]["snippet"], "Le <mark>démarrage</mark> plante aussi chez moi")
+            self.assertIsNone(results[0]["score"])
+            # Pages composées des issues puis des commentaires
+            with mock.patch("projects.views.SearchView.page_size", 1):
+                self.assertEqual([r["id"] for r in self.search("plante", page=2)["results"]], [comment.id])
+            self.assertEqual(self.search("confidentiel")["results"], [])
+
+    def test_fts5_probe(self):
+        self.assertEqual(fts5_available(connection), "projects_search" in connection.introspection.table_names())
+
+
+class IssueFilterTest(ProjectFixturesMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.contributor)
+        other = Contributor.objects.create(user=self.other_user, project=self.project)
+        self.issues = [self.issue] + [
+            Issue.objects.create(
+                title=f"Issue {i}", desc="Description", tag=tag, status=status, priority=priority,
+                project=self.project, author=author, assignee=assignee,
+            )
+            for i, (tag, status, priority, author, assignee) in enumerate([
+                ("TASK", "COMPLETED", "HIGH", self.contributor, other),
+                ("BUG", "IN PROGRESS", "HIGH", self.user, other),
+                ("UPDATE", "OPEN", "MEDIUM", self.contributor, self.assignee),
+            ])
+        ]
+
+    def ids(self, query):
+        response = self.client.get(f'/projects/{self.project.id}/issues/?{query}')
+        self.assertEqual(response.status_code, 200, response.data)
+        return [issue["id"] for issue in response.data["results"]]
+
+    def test_filters(self):
+        issues = self.issues
+        self.assertEqual(self.ids("status=OPEN"), [issues[0].id, issues[3].id])
+        self.assertEqual(self.ids("priority=HIGH&tag=BUG"), [issues[2].id])
+        self.assertEqual(self.ids(f"assignee={issues[1].assignee_id}"), [issues[1].id, issues[2].id])
+        self.assertEqual(self.ids(f"author={self.contributor.id}"), [issues[1].id, issues[3].id])
+
+    def test_created_time_range(self):
+        Issue.objects.filter(pk=self.issues[0].pk).update(created_time="2020-01-01T00:00:00Z")
+        self.assertEqual(self.ids("created_time_before=2021-01-01T00:00:00Z"), [self.issues[0].id])
+        self.assertEqual(len(self.ids("created_time_after=2021-01-01T00:00:00Z")), 3)
+
+    def test_ordering(self):
+        Issue.objects.filter(pk=self.issues[2].pk).update(created_time="2020-01-01T00:00:00Z")
+        ids = self.ids("ordering=-created_time")
+        self.assertEqual(ids[-1], self.issues[2].id)
+        self.assertEqual(self.ids("ordering=-id"), [issue.id for issue in reversed(self.issues)])
+        # Clé de tri hors liste blanche : ignorée
+        self.assertEqual(self.ids("ordering=title"), [issue.id for issue in self.issues])
+
+    def test_ordering_with_cursor_pages(self):
+        Issue.objects.bulk_create(
+            Issue(title=f"Bulk {i}", desc="Description", tag="BUG", status="OPEN",
+                  project=self.project, author=self.user, assignee=self.assignee)
+            for i in range(20)
+        )
+        url = f'/projects/{self.project.id}/issues/?status=OPEN&ordering=-created_time&pagination=cursor'
+        seen = []
+        while url:
+            response = self.client.get(url)
+            seen += [issue["id"] for issue in response.data["results"]]
+            url = response.data["next"]
+        expected = Issue.objects.filter(project=self.project, status="OPEN").order_by("-created_time", "-id")
+        self.assertEqual(seen, [issue.id for issue in expected])
+
+    def test_invalid_choice(self):
+        response = self.client.get(f'/projects/{self.project.id}/issues/?status=UNKNOWN')
+        self.assertEqual(response.status_code, 400)
+
+    def test_filter_and_sort_combinations_use_an_index(self):
+        combinations = [
+            f"{name}={value}&ordering={ordering}"
+            for name, value in [
+                ("status", "OPEN"), ("priority", "HIGH"), ("tag", "BUG"),
+                ("assignee", self.assignee.id), ("author", self.user.id),
+            ]
+            for ordering in ("id", "-id", "created_time", "-created_time")
+        ]
+        combinations += ["created_time_after=2020-01-01T00:00:00Z&ordering=-created_time"]
+        for query in combinations:
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(f'/projects/{self.project.id}/issues/?{query}')
+            sql = [q["sql"] for q in context.captured_queries if 'FROM "projects_issue"' in q["sql"]][-1]
+            with connection.cursor() as cursor:
+                cursor.execute("EXPLAIN QUERY PLAN " + sql)
+                plan = [row[-1] for row in cursor.fetchall()]
+            self.assertTrue(any("USING INDEX issue_project" in step for step in plan), f"{query}\n{plan}")
+            self.assertFalse(any("TEMP B-TREE" in step for step in plan), f"{query}\n{plan}")
+
+
+class IssueStatsTest(ProjectFixturesMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+        self.url = f'/projects/{self.project.id}/stats/'
+
+    def stats(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def assert_consistent(self):
+        # Les compteurs maintenus au fil de l'eau égalent un recalcul complet
+        stats = self.stats()
+        call_command("reconcile_issue_stats", stdout=StringIO())
+        self.assertEqual(self.stats(), stats)
+        return stats
+
+    def test_counts(self):
+        stats = self.assert_consistent()
+        self.assertEqual(stats["total"], 1)
+        self.assertEqual(stats["open"], 1)
+        self.assertEqual(stats["status"], {"OPEN": 1, "IN PROGRESS": 0, "COMPLETED": 0})
+        self.assertEqual(stats["tag"]["BUG"], 1)
+        self.assertEqual(stats["assignees"], [{"assignee": self.assignee.id, "open": 1}])
+
+    def test_transitions(self):
+        issue_url = f'/projects/{self.project.id}/issues/{self.issue.id}/'
+        self.client.put(issue_url, {"status": "COMPLETED", "priority": "HIGH"}, format='json')
+        stats = self.assert_consistent()
+        self.assertEqual(stats["open"], 0)
+        self.assertEqual(stats["status"]["COMPLETED"], 1)
+        self.assertEqual(stats["priority"], {"LOW": 0, "MEDIUM": 0, "HIGH": 1})
+        self.assertEqual(stats["assignees"], [])
+
+        other = Contributor.objects.create(user=self.other_user, project=self.project)
+        issue = Issue.objects.only("id").get(pk=self.issue.pk)
+        issue.status = "OPEN"
+        issue.assignee = other
+        issue.save()
+        stats = self.assert_consistent()
+        self.assertEqual(stats["assignees"], [{"assignee": other.id, "open": 1}])
+
+        self.client.delete(issue_url)
+        stats = self.assert_consistent()
+        self.assertEqual(stats["total"], 0)
+        self.assertEqual(stats["assignees"], [])
+
+    def test_bulk_create(self):
+        items = [
+            {"title": f"Issue {i}", "desc": "Description", "tag": "TASK", "status": "IN PROGRESS",
+             "assignee": self.assignee.id}
+            for i in range(5)
+        ]
+        self.client.post(f'/projects/{self.project.id}/issues/', items, format='json')
+        stats = self.assert_consistent()
+        self.assertEqual(stats["total"], 6)
+        self.assertEqual(stats["tag"]["TASK"], 5)
+        self.assertEqual(stats["assignees"], [{"assignee": self.assignee.id, "open": 6}])
+
+    def test_reconcile_fixes_drift(self):
+        Issue.objects.filter(project=self.project).update(status="COMPLETED")
+        self.assertEqual(self.stats()["status"]["OPEN"], 1)
+        out = StringIO()
+        call_command("reconcile_issue_stats", project=[self.project.id], stdout=out)
+        self.assertIn("1 project(s) checked, 3 counter(s) fixed", out.getvalue())
+        stats = self.stats()
+        self.assertEqual(stats["status"]["OPEN"], 0)
+        self.assertEqual(stats["assignees"], [])
+
+    def test_reconcile_locks_before_counting(self):
+        with CaptureQueriesContext(connection) as context:
+            reconcile_counters([self.project.id])
+        statements = [q["sql"] for q in context.captured_queries if not q["sql"].startswith(("SAVEPOINT", "RELEASE"))]
+        # Le verrou d'écriture est pris avant les GROUP BY : un incrément concurrent n'est pas écrasé
+        lock = "SELECT" if connection.features.has_select_for_update else "UPDATE"
+        self.assertTrue(statements[0].startswith(f'{lock} "projects_projectissuecounter"'), statements[0])
+        self.assertIn("GROUP BY", statements[1])
+
+    def test_cascades(self):
+        self.assignee.delete()
+        self.assertEqual(self.stats()["total"], 0)
+        self.project.delete()
+        self.assertFalse(ProjectIssueCounter.objects.filter(project_id=self.project.id).exists())
+
+    def test_author_deletion(self):
+        project_id = self.project.id
+        self.user.delete()
+        self.assertFalse(ProjectIssueCounter.objects.filter(project_id=project_id).exists())
+
+    def test_outsider_forbidden(self):
+        self.client.force_authenticate(user=self.other_user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class NotificationTest(ProjectFixturesMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+        self.issues_url = f'/projects/{self.project.id}/issues/'
+
+    def create_issue(self):
+        payload = {"title": "Crash", "desc": "Description", "tag": "BUG", "status": "OPEN",
+                   "assignee": self.assignee.id}
+        response = self.client.post(self.issues_url, payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response
+
+    def test_events_are_fanned_out_by_the_worker(self):
+        self.create_issue()
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+        self.assertFalse(Notification.objects.exists())
+
+        call_command("process_outbox", once=True, stdout=StringIO())
+        self.assertFalse(NotificationOutbox.objects.exists())
+        # L'auteur de l'issue n'est pas notifié
+        self.assertEqual(list(Notification.objects.values_list("user_id", flat=True)), [self.contributor.id])
+
+    def test_comment_events(self):
+        self.client.force_authenticate(user=self.contributor)
+        url = f'/projects/{self.project.id}/issues/{self.issue.id}/comments/'
+        self.client.post(url, {"desc": "Un commentaire"}, format='json')
+        drain_outbox()
+        notification = Notification.objects.get()
+        self.assertEqual(notification.user, self.user)
+        self.assertEqual(notification.issue, self.issue)
+
+    def test_write_cost_does_not_grow_with_members(self):
+        def count_create_queries():
+            with CaptureQueriesContext(connection) as context:
+                self.create_issue()
+            return len(context)
+
+        small = count_create_queries()
+        drain_outbox()
+        users = [User.objects.create_user(username=f"member{i}", password="testpass") for i in range(20)]
+        self.project.contributors.add(*users)
+        get_membership_cache().clear()
+        count_create_queries()
+        self.assertEqual(count_create_queries(), small)
+
+        drain_outbox(notification_batch_size=5)
+        self.assertEqual(Notification.objects.filter(user__in=users).count(), 40)
+
+    def test_bulk_issues_enqueue_one_event_each(self):
+        items = [
+            {"title": f"Issue {i}", "desc": "Description", "tag": "BUG", "assignee": self.assignee.id}
+            for i in range(3)
+        ]
+        self.client.post(self.issues_url, items, format='json')
+        self.assertEqual(NotificationOutbox.objects.count(), 3)
+
+    def test_failed_write_enqueues_nothing(self):
+        response = self.client.post(self.issues_url, {"title": "Incomplete"}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_unread_list_and_mark_read(self):
+        for _ in range(12):
+            self.create_issue()
+        drain_outbox()
+        self.client.force_authenticate(user=self.contributor)
+        first = self.client.get('/notifications/').data
+        self.assertEqual(len(first["results"]), 10)
+        second = self.client.get(first["next"]).data
+        ids = [n["id"] for n in first["results"] + second["results"]]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertEqual(len(ids), 12)
+
+        response = self.client.post('/notifications/read/', {"up_to": ids[5]}, format='json')
+        self.assertEqual(response.data["marked"], 7)
+        self.assertEqual(len(self.client.get('/notifications/').data["results"]), 5)
+        self.client.force_authenticate(user=self.other_user)
+        self.assertEqual(self.client.get('/notifications/').data["results"], [])
+
+
+class NotificationMigrationTest(TransactionTestCase):
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(target)
+        return executor.loader.project_state(target).apps
+
+    def test_existing_notifications_are_kept(self):
+        old_apps = self.migrate([("projects", "0009_issue_counters")])
+        self.addCleanup(self.migrate, MigrationExecutor(connection).loader.graph.leaf_nodes())
+        author = old_apps.get_model("auth", "User").objects.create(username="alice")
+        project = old_apps.get_model("projects", "Project").objects.create(
+            title="Projet", description="Description", type="BACKEND", author_id=author.pk
+        )
+        assignee = old_apps.get_model("projects", "Contributor").objects.create(user_id=author.pk, project_id=project.pk)
+        issue = old_apps.get_model("projects", "Issue").objects.create(
+            title="Issue", desc="Description", tag="BUG", project_id=project.pk, author_id=author.pk,
+            assignee_id=assignee.pk,
+        )
+        notification = old_apps.get_model("projects", "Notification").objects.create(issue_id=issue.pk, desc="Ancienne")
+
+        new_apps = self.migrate([("projects", "0010_notification_outbox")])
+        kept = new_apps.get_model("projects", "Notification").objects.get(pk=notification.pk)
+        self.assertEqual((kept.desc, kept.user_id, kept.is_read), ("Ancienne", None, False))
+
+
+class ActivityTest(ProjectFixturesMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+        self.issues_url = f'/projects/{self.project.id}/issues/'
+        self.issue_url = f'{self.issues_url}{self.issue.id}/'
+
+    def request(self, method, url, data=None):
+        # Les entrées sont écrites dans la transaction du changement : aucun callback on_commit à exécuter
+        return getattr(self.client, method)(url, data, format='json')
+
+    def test_issue_create_and_update(self):
+        response = self.request("post", self.issues_url, {"title": "Crash", "desc": "Description", "tag": "BUG", "assignee": self.assignee.id})
+        created = IssueActivity.objects.get(issue_id=response.data["id"])
+        self.assertEqual((created.action, created.target, created.actor), ("create", "issue", self.user))
+        self.assertEqual(created.changes["title"], [None, "Crash"])
+
+        self.request("put", self.issue_url, {"status": "IN PROGRESS"})
+        updated = IssueActivity.objects.get(issue=self.issue)
+        self.assertEqual(updated.action, "update")
+        self.assertEqual(updated.changes, {"status": ["OPEN", "IN PROGRESS"]})
+        self.assertEqual(updated.desc, f"issue {self.issue.id} updated")
+
+    def test_comment_and_issue_deletion(self):
+        response = self.request("post", f'{self.issue_url}comments/', {"desc": "Un commentaire"})
+        comment = IssueActivity.objects.get(issue=self.issue)
+        self.assertEqual((comment.target, comment.target_id), ("comment", response.data["id"]))
+
+        self.request("delete", self.issue_url)
+        # L'activité de l'issue lui survit ; sa suppression est dans celle du projet
+        comment.refresh_from_db()
+        self.assertEqual((comment.issue_id, comment.target_id), (None, response.data["id"]))
+        deleted = ProjectActivity.objects.get(project=self.project)
+        self.assertEqual((deleted.action, deleted.target, deleted.target_id), ("delete", "issue", self.issue.id))
+        self.assertEqual(deleted.changes["title"], ["Test Issue", None])
+
+    def test_failed_entry_rolls_back_the_change(self):
+        # Écrite dans la même transaction : pas de changement sans son entrée
+        with mock.patch.object(IssueActivity.objects, "bulk_create", side_effect=RuntimeError), \
+                self.assertRaises(RuntimeError), transaction.atomic():
+            self.request("put", self.issue_url, {"status": "COMPLETED"})
+        self.assertEqual(Issue.objects.get(pk=self.issue.pk).status, "OPEN")
+
+    def test_project_deletion_is_recorded(self):
+        self.assertEqual(self.request("patch", f'/projects/{self.project.id}/', {"priority": "HIGH"}).status_code, 200)
+        self.assertEqual(self.request("delete", f'/projects/{self.project.id}/').status_code, 204)
+        # Le journal survit au projet : la suppression n'est plus rattachée qu'à target_id
+        entries = list(ProjectActivity.objects.order_by("id"))
+        self.assertEqual([(entry.action, entry.project_id) for entry in entries], [("update", None), ("delete", None)])
+        deleted = entries[1]
+        self.assertEqual((deleted.target, deleted.target_id, deleted.actor), ("project", self.project.id, self.user))
+        self.assertEqual(deleted.changes["title"], ["Test Project", None])
+
+    def test_one_insert_per_table(self):
+        items = [{"title": f"Issue {i}", "desc": "Description", "tag": "BUG", "assignee": self.assignee.id} for i in range(5)]
+        with CaptureQueriesContext(connection) as context:
+            self.request("post", self.issues_url, items)
+        inserts = [q["sql"] for q in context.captured_queries if q["sql"].startswith('INSERT INTO "projects_issueactivity"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(IssueActivity.objects.filter(action="create").count(), 5)
+
+    def test_contributor_bulk(self):
+        new_user = User.objects.create_user(username="newcomer", password="testpass")
+        url = f'/projects/{self.project.id}/contributors/bulk/'
+        self.request("post", url, {"add": [new_user.id], "remove": [self.contributor.id]})
+        changes = list(ProjectActivity.objects.order_by("id").values_list("action", "changes"))
+        self.assertEqual(changes, [
+            ("create", {"user": [None, new_user.id]}),
+            ("delete", {"user": [self.contributor.id, None]}),
+        ])
+
+    def test_rolled_back_change_is_not_recorded(self):
+        recorder = ActivityRecorder(self.user)
+        with self.assertRaises(RuntimeError), transaction.atomic(), recorder.atomic():
+            recorder.record("update", "issue", self.issue, changes={"status": ["OPEN", "COMPLETED"]})
+            raise RuntimeError
+        with recorder.atomic():
+            recorder.record("update", "issue", self.issue, changes={"tag": ["BUG", "TASK"]})
+            # Pas encore écrite : l'INSERT a lieu à la fin du bloc, avant le commit
+            self.assertFalse(IssueActivity.objects.exists())
+        self.assertEqual(list(IssueActivity.objects.values_list("changes", flat=True)), [{"tag": ["BUG", "TASK"]}])
+
+    def test_read_endpoints(self):
+        for status_value in ("IN PROGRESS", "COMPLETED", "OPEN"):
+            self.request("put", self.issue_url, {"status": status_value})
+        self.client.force_authenticate(user=self.contributor)
+        response = self.client.get(f'{self.issue_url}activity/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [entry["changes"]["status"][1] for entry in response.data["results"]],
+            ["OPEN", "COMPLETED", "IN PROGRESS"],
+        )
+        self.assertEqual(self.client.get(f'/projects/{self.project.id}/activity/').status_code, 200)
+
+        self.client.force_authenticate(user=self.other_user)
+        self.assertEqual(self.client.get(f'{self.issue_url}activity/').status_code, 403)
+        self.assertEqual(self.client.get(f'/projects/{self.project.id}/activity/').status_code, 403)
+
+
+class UploadFixturesMixin(ProjectFixturesMixin):
+    """Project fixtures with an empty MEDIA_ROOT, uploads made by the contributor."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        reset_hashers()
+        self.client.force_authenticate(user=self.contributor)
+        self.content = bytes(range(256)) * 40
+
+
+class UploadTest(UploadFixturesMixin, TestCase):
+
+    def start(self, url=None, size=None):
+        url = url or f'/projects/{self.project.id}/uploads/'
+        response = self.client.post(url, {"filename": "report final.pdf", "size": size or len(self.content)}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response
+
+    def send(self, location, start, end, **extra):
+        return self.client.put(
+            location, self.content[start:end], content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f"bytes {start}-{end - 1}/{len(self.content)}", **extra,
+        )
+
+    def test_chunked_upload(self):
+        location = self.start()["Location"]
+        for start in range(0, len(self.content), 4000):
+            response = self.send(location, start, min(start + 4000, len(self.content)))
+            self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["complete"])
+        self.assertEqual(response.data["sha256"], hashlib.sha256(self.content).hexdigest())
+
+        attachment = ProjectAttachment.objects.get(pk=response.data["attachment_id"])
+        self.assertEqual(attachment.project, self.project)
+        self.assertEqual(attachment.file.name, attachment.blob.name)
+        with attachment.file.open("rb") as stored:
+            self.assertEqual(stored.read(), self.content)
+
+    def test_resume_after_interruption(self):
+        location = self.start()["Location"]
+        self.send(location, 0, 3000)
+        # Chunk rejoué ou en avance : 409 avec l'offset à partir duquel reprendre
+        response = self.send(location, 0, 3000)
+        self.assertEqual((response.status_code, response.data["offset"]), (409, 3000))
+        self.assertEqual(self.send(location, 6000, 9000).status_code, 409)
+
+        # Reprise par un autre processus : l'empreinte est recalculée depuis le fichier
+        reset_hashers()
+        self.assertEqual(self.client.get(location).data["offset"], 3000)
+        response = self.client.put(
+            f"{location}?offset=3000", self.content[3000:], content_type='application/octet-stream'
+        )
+        self.assertEqual(response.data["sha256"], hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(self.send(location, 0, 3000).status_code, 409)
+
+    def test_issue_upload(self):
+        location = self.start(f'/projects/{self.project.id}/issues/{self.issue.id}/uploads/')["Location"]
+        response = self.send(location, 0, len(self.content))
+        attachment = IssueAttachment.objects.get(pk=response.data["attachment_id"])
+        self.assertEqual(attachment.issue, self.issue)
+
+    def test_only_the_owner_continues_an_upload(self):
+        location = self.start()["Location"]
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.send(location, 0, 100).status_code, 404)
+        self.client.force_authenticate(user=self.other_user)
+        self.assertEqual(self.send(location, 0, 100).status_code, 403)
+        self.assertEqual(self.client.post(f'/projects/{self.project.id}/uploads/', {}, format='json').status_code, 403)
+
+    def test_limits(self):
+        with override_settings(ATTACHMENT_UPLOADS={"MAX_CHUNK_SIZE": 1000, "MAX_FILE_SIZE": 20000}):
+            location = self.start()["Location"]
+            self.assertEqual(self.send(location, 0, 2000).status_code, 413)
+            response = self.client.post(
+                f'/projects/{self.project.id}/uploads/', {"filename": "big.bin", "size": 20001}, format='json'
+            )
+            self.assertEqual(response.status_code, 413)
+        response = self.client.put(location, b"abc", content_type='application/octet-stream', HTTP_CONTENT_RANGE="bytes 0-9/10")
+        self.assertEqual(response.status_code, 400)
+
+    def test_body_is_read_in_bounded_pieces(self):
+        session = UploadSession.objects.get(pk=self.start().data["id"])
+        reads = []
+
+        class Stream(BytesIO):
+            def read(self, size=-1):
+                reads.append(size)
+                return super().read(size)
+
+        with override_settings(ATTACHMENT_UPLOADS={"BUFFER_SIZE": 1024}):
+            write_chunk(session, Stream(self.content), 0, len(self.content))
+        self.assertTrue(session.complete)
+        self.assertEqual(max(reads), 1024)
+
+    def test_purge_stale_uploads(self):
+        session = UploadSession.objects.get(pk=self.start().data["id"])
+        path = session.name
+        call_command("purge_stale_uploads", stdout=StringIO())
+        self.assertTrue(UploadSession.objects.exists())
+        UploadSession.objects.update(updated_at=session.updated_at - timedelta(days=2))
+        out = StringIO()
+        call_command("purge_stale_uploads", stdout=out)
+        self.assertIn("1 upload(s) deleted.", out.getvalue())
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertFalse(default_storage.exists(path))
+
+
+class BlobStorageTest(UploadFixturesMixin, TestCase):
+
+    def upload(self, url, content):
+        start = self.client.post(url, {"filename": "app.log", "size": len(content)}, format='json')
+        return self.client.put(
+            start["Location"], content, content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f"bytes 0-{len(content) - 1}/{len(content)}",
+        )
+
+    def files(self, directory):
+        root = default_storage.path(directory)
+        return sorted(
+            os.path.relpath(os.path.join(path, name), root)
+            for path, _, names in os.walk(root) for name in names
+        )
+
+    def test_duplicates_share_one_blob(self):
+        issue_url = f'/projects/{self.project.id}/issues/{self.issue.id}/uploads/'
+        first = self.upload(issue_url, self.content).data
+        second = self.upload(f'/projects/{self.project.id}/uploads/', self.content).data
+        self.assertTrue(first["complete"] and second["complete"])
+
+        sha256 = hashlib.sha256(self.content).hexdigest()
+        blob = Blob.objects.get()
+        self.assertEqual((blob.sha256, blob.size, blob.refcount), (sha256, len(self.content), 2))
+        self.assertEqual(self.files("blobs"), [f"{sha256[:2]}/{sha256[2:4]}/{sha256}"])
+        self.assertEqual(self.files("uploads"), [])
+
+    def test_known_content_completes_without_chunks(self):
+        self.upload(f'/projects/{self.project.id}/uploads/', self.content)
+        payload = {"filename": "copy.log", "size": len(self.content), "sha256": hashlib.sha256(self.content).hexdigest()}
+        response = self.client.post(f'/projects/{self.project.id}/issues/{self.issue.id}/uploads/', payload, format='json')
+        self.assertTrue(response.data["complete"])
+        self.assertEqual(IssueAttachment.objects.get(pk=response.data["attachment_id"]).blob, Blob.objects.get())
+        self.assertEqual(Blob.objects.get().refcount, 2)
+
+        # Un autre projet doit envoyer le fichier : connaître l'empreinte ne suffit pas
+        other = Project.objects.create(title="Other", description="Other", type="BACKEND", author=self.contributor)
+        response = self.client.post(f'/projects/{other.id}/uploads/', payload, format='json')
+        self.assertFalse(response.data["complete"])
+
+    def test_garbage_collection(self):
+        self.upload(f'/projects/{self.project.id}/issues/{self.issue.id}/uploads/', self.content)
+        self.upload(f'/projects/{self.project.id}/uploads/', self.content)
+        blob = Blob.objects.get()
+
+        ProjectAttachment.objects.all().delete()
+        call_command("collect_blobs", stdout=StringIO())
+        self.assertEqual(Blob.objects.get().refcount, 1)
+
+        # Suppression en cascade avec l'issue
+        self.issue.delete()
+        self.assertEqual(Blob.objects.get().refcount, 0)
+        out = StringIO()
+        call_command("collect_blobs", batch_size=1, stdout=out)
+        self.assertIn("1 blob(s) deleted.", out.getvalue())
+        self.assertFalse(Blob.objects.exists())
+        self.assertFalse(default_storage.exists(blob.name))
+
+    def test_migrate_existing_files(self):
+        first = default_storage.save("attachments/a.log", ContentFile(self.content))
+        second = default_storage.save("attachments/b.log", ContentFile(self.content))
+        IssueAttachment.objects.create(issue=self.issue, file=first)
+        IssueAttachment.objects.create(issue=self.issue, file=second)
+        ProjectAttachment.objects.create(project=self.project, file=first)
+        ProjectAttachment.objects.create(project=self.project, file="attachments/missing.log")
+
+        out, err = StringIO(), StringIO()
+        call_command("migrate_attachment_blobs", batch_size=1, stdout=out, stderr=err)
+        self.assertIn("2 file(s) migrated, 1 missing.", out.getvalue())
+        self.assertIn("attachments/missing.log", err.getvalue())
+
+        blob = Blob.objects.get()
+        self.assertEqual(blob.refcount, 3)
+        self.assertEqual(blob.name, blob_name(hashlib.sha256(self.content).hexdigest()))
+        self.assertEqual(self.files("attachments"), [])
+        with IssueAttachment.objects.first().file.open("rb") as stored:
+            self.assertEqual(stored.read(), self.content)
+
+
+class DownloadTest(UploadFixturesMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        base = f'/projects/{self.project.id}/issues/{self.issue.id}'
+        start = self.client.post(f'{base}/uploads/', {"filename": "crash log.txt", "size": len(self.content)}, format='json')
+        response = self.client.put(
+            start["Location"], self.content, content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f"bytes 0-{len(self.content) - 1}/{len(self.content)}",
+        )
+        self.url = f'{base}/attachments/{response.data["attachment_id"]}/'
+        self.etag = f'"{hashlib.sha256(self.content).hexdigest()}"'
+
+    def test_full_download(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.content)
+        self.assertEqual(response["ETag"], self.etag)
+        self.assertEqual(response["Content-Type"], "text/plain")
+        self.assertEqual(response["Content-Length"], str(len(self.content)))
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="crash log.txt"')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=self.etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_single_range(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=100-199")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(self.content)}")
+        self.assertEqual(response["Content-Length"], "100")
+        self.assertEqual(b"".join(response.streaming_content), self.content[100:200])
+        # Le fichier est transmis tel quel au serveur WSGI (os.sendfile)
+        self.assertTrue(hasattr(response, "file_to_stream"))
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-50")
+        self.assertEqual(b"".join(response.streaming_content), self.content[-50:])
+
+    def test_multiple_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9, 5000-5019")
+        self.assertEqual(response.status_code, 206)
+        boundary = response["Content-Type"].split("boundary=")[1]
+        body = b"".join(response.streaming_content)
+        self.assertEqual(response["Content-Length"], str(len(body)))
+        parts = body.split(f"--{boundary}".encode())[1:-1]
+        self.assertEqual(len(parts), 2)
+        self.assertIn(f"Content-Range: bytes 5000-5019/{len(self.content)}".encode(), parts[1])
+        self.assertTrue(parts[1].endswith(self.content[5000:5020] + b"\r\n"))
+
+    def test_truncated_blob_aborts_multiple_ranges(self):
+        with open(default_storage.path(blob_name(self.etag.strip('"'))), "r+b") as blob:
+            blob.truncate(5010)
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9, 5000-5019")
+        self.assertEqual(response.status_code, 206)
+        # Content-Length déjà annoncé : la réponse est interrompue plutôt que terminée trop tôt
+        with self.assertRaisesMessage(OSError, "ends at byte 5010, before the end of range 5000-5019"):
+            b"".join(response.streaming_content)
+
+    def test_unsatisfiable_and_ignored_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.content)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.content)}")
+        # Plage sur une ancienne version du fichier, ou illisible : fichier entier
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"old"').status_code, 200)
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE="bytes=9-0").status_code, 200)
+
+    def test_proxy_modes(self):
+        with override_settings(ATTACHMENT_DOWNLOADS={"MODE": "x-accel-redirect", "ACCEL_PREFIX": "/internal/"}):
+            response = self.client.get(self.url)
+        sha256 = self.etag.strip('"')
+        self.assertEqual(response["X-Accel-Redirect"], f"/internal/{blob_name(sha256)}")
+        self.assertEqual(response.content, b"")
+        with override_settings(ATTACHMENT_DOWNLOADS={"MODE": "x-sendfile"}):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Sendfile"], default_storage.path(blob_name(sha256)))
+
+    def test_permissions(self):
+        self.client.force_authenticate(user=self.other_user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(self.url, HTTP_ACCEPT="application/pdf").status_code, 200)
+        self.assertEqual(self.client.get(f'/projects/{self.project.id}/attachments/1/').status_code, 404)
+
+
+
+class ProjectTransferTest(ProjectFixturesMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.project.contributors.add(self.contributor)
+        Comment.objects.bulk_create(
+            Comment(issue=self.issue, desc=f"Commentaire {i}", author=self.contributor) for i in range(5)
+        )
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, "project.ndjson")
+
+    def export(self):
+        err = StringIO()
+        call_command("export_project", self.project.id, output=self.path, chunk_size=2, stderr=err)
+        self.assertIn("rows/s", err.getvalue())
+        with open(self.path, encoding="utf-8") as source:
+            return source.read().splitlines()
+
+    def test_round_trip(self):
+        self.export()
+        out = StringIO()
+        call_command("import_project", self.path, chunk_size=2, stdout=out)
+        self.assertIn("comment: 6 row(s)", out.getvalue())
+
+        imported = Project.objects.exclude(pk=self.project.pk).get()
+        self.assertEqual(imported.title, self.project.title)
+        self.assertEqual(imported.created_time, self.project.created_time)
+        self.assertGreater(imported.version, 0)
+        issue = Issue.objects.get(project=imported)
+        self.assertNotEqual(issue.pk, self.issue.pk)
+        self.assertEqual(issue.created_time, self.issue.created_time)
+        self.assertEqual(issue.assignee.project_id, imported.pk)
+        self.assertEqual(issue.assignee.user, self.contributor)
+        self.assertEqual(Comment.objects.filter(issue=issue).count(), 6)
+        self.assertEqual(list(imported.contributors.all()), [self.contributor])
+        # Travail des signaux contournés par bulk_create
+        self.assertEqual(
+            dict(ProjectMembership.objects.filter(project=imported).values_list("user__username", "role")),
+            {"author": "AUTHOR", "contributor": "CONTRIBUTOR"},
+        )
+        self.assertEqual(
+            {(d, v): c for (_, d, v), c in compute_counters([imported.pk]).items()},
+            {(d, v): c for d, v, c in imported.issue_counters.values_list("dimension", "value", "count")},
+        )
+        if search_available():
+            results = search(self.contributor, "Commentaire", project_id=imported.pk)
+            self.assertEqual({r["issue"] for r in results}, {issue.pk})
+
+    def test_unknown_users_and_default_user(self):
+        lines = self.export()
+        User.objects.filter(username="contributor").update(username="renamed")
+        with self.assertRaisesMessage(CommandError, "Unknown user(s): contributor."):
+            call_command("import_project", self.path, stdout=StringIO())
+        self.assertEqual(Project.objects.count(), 1)
+
+        call_command("import_project", self.path, default_user="otheruser", stdout=StringIO())
+        imported = Project.objects.exclude(pk=self.project.pk).get()
+        self.assertEqual(Contributor.objects.get(project=imported).user, self.other_user)
+        self.assertTrue(lines[0].startswith('{"type": "export"'))
+
+    def test_invalid_export_imports_nothing(self):
+        lines = self.export()
+        # Les commentaires avant les issues : dépendances non respectées
+        comments = [line for line in lines if '"type": "comment"' in line]
+        others = [line for line in lines if '"type": "comment"' not in line]
+        issue_index = next(i for i, line in enumerate(others) if '"type": "issue"' in line)
+        with open(self.path, "w", encoding="utf-8") as target:
+            target.write("\n".join(others[:issue_index] + comments + others[issue_index:]) + "\n")
+        with self.assertRaisesMessage(CommandError, "issue found after comment"):
+            call_command("import_project", self.path, stdout=StringIO())
+        self.assertEqual(Project.objects.count(), 1)
+        self.assertEqual(Contributor.objects.count(), 1)
+
+        # Commentaire d'une issue absente de l'export
+        with open(self.path, "w", encoding="utf-8") as target:
+            target.write("\n".join(others + [comments[0].replace(f'"issue_id": {self.issue.id}', '"issue_id": 0')]))
+        with self.assertRaisesMessage(CommandError, "comment references an unknown issue 0"):
+            call_command("import_project", self.path, stdout=StringIO())
+        self.assertEqual(Issue.objects.count(), 1)
+
+
+class AsyncReadViewTest(ProjectFixturesMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.factory = AsyncRequestFactory()
+        self.project_url = f'/projects/{self.project.id}'
+
+    def token(self, user):
+        return f"Bearer {AccessToken.for_user(user)}"
+
+    def aget(self, view_class, path, user=None, headers=None, **kwargs):
+        headers = dict(headers or {})
+        if user is not None:
+            headers["authorization"] = self.token(user)
+        request = self.factory.get(path, headers=headers)
+        # Exécutée dans une boucle d'événements : tout accès synchrone à l'ORM y lèverait SynchronousOnlyOperation
+        return async_to_sync(view_class.as_view())(request, **kwargs)
+
+    def sync_get(self, path, user):
+        return APIClient().get(path, headers={"authorization": self.token(user)})
+
+    def test_async_views_match_sync_views(self):
+        issue = {"project_pk": self.project.id, "issue_pk": self.issue.id}
+        endpoints = [
+            (async_views.AsyncProjectList, '/projects/', {}),
+            (async_views.AsyncProjectDetail, f'{self.project_url}/', {"pk": self.project.id}),
+            (async_views.AsyncContributorList, f'{self.project_url}/contributors/', {"project_pk": self.project.id}),
+            (async_views.AsyncIssueList, f'{self.project_url}/issues/', {"project_pk": self.project.id}),
+            (async_views.AsyncIssueDetail, f'{self.project_url}/issues/{self.issue.id}/', issue),
+            (async_views.AsyncCommentList, f'{self.project_url}/issues/{self.issue.id}/comments/', issue),
+        ]
+        for view_class, path, kwargs in endpoints:
+            with self.subTest(view=view_class.__name__):
+                get_response_cache().backend.clear()
+                expected = self.sync_get(path, self.contributor)
+                get_response_cache().backend.clear()
+                response = self.aget(view_class, path, self.contributor, **kwargs)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(json.loads(response.content), expected.json())
+                for header in ("Content-Type", "ETag", "Vary", "Allow", "X-Cache"):
+                    self.assertEqual(response.get(header), expected.get(header), header)
+
+    def test_permissions_and_errors(self):
+        path = f'{self.project_url}/issues/'
+        response = self.aget(async_views.AsyncIssueList, path, self.other_user, project_pk=self.project.id)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(json.loads(response.content), self.sync_get(path, self.other_user).json())
+
+        response = self.aget(async_views.AsyncIssueDetail, path, self.user, project_pk=self.project.id, issue_pk=0)
+        self.assertEqual(response.status_code, 404)
+        # Issue absente : CommentPermissions refuse l'accès
+        response = self.aget(async_views.AsyncCommentList, path, self.user, project_pk=self.project.id, issue_pk=0)
+        self.assertEqual(response.status_code, 403)
+
+        # Sans jeton, ou jeton invalide : la vue DRF répond, avec son en-tête WWW-Authenticate
+        response = self.aget(async_views.AsyncIssueList, path, project_pk=self.project.id)
+        self.assertEqual(response.status_code, 401)
+        response = self.aget(
+            async_views.AsyncIssueList, path, headers={"authorization": "Bearer invalid"}, project_pk=self.project.id,
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("WWW-Authenticate", response)
+
+    def test_conditional_get_and_cache_hits(self):
+        kwargs = {"project_pk": self.project.id, "issue_pk": self.issue.id}
+        path = f'{self.project_url}/issues/{self.issue.id}/'
+        etag = self.aget(async_views.AsyncIssueDetail, path, self.user, **kwargs)["ETag"]
+        response = self.aget(async_views.AsyncIssueDetail, path, self.user, headers={"if-none-match": etag}, **kwargs)
+        self.assertEqual(response.status_code, 304)
+
+        path = f'{self.project_url}/contributors/'
+        self.assertEqual(self.aget(async_views.AsyncContributorList, path, self.user, project_pk=self.project.id)["X-Cache"], "MISS")
+        # Utilisateur et rôle en cache : seul le projet (sa version) est lu
+        with self.assertNumQueries(1):
+            response = self.aget(async_views.AsyncContributorList, path, self.user, project_pk=self.project.id)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.content, self.sync_get(path, self.user).content)
+
+    def test_pagination_and_filters(self):
+        Issue.objects.bulk_create(
+            Issue(title=f"Issue {i}", desc="Description", tag="BUG", status="OPEN",
+                  project=self.project, author=self.contributor, assignee=self.assignee)
+            for i in range(14)
+        )
+        url = f'http://testserver{self.project_url}/issues/?pagination=cursor'
+        ids = []
+        while url:
+            response = self.aget(async_views.AsyncIssueList, url, self.user, project_pk=self.project.id)
+            self.assertEqual(response.status_code, 200)
+            page = json.loads(response.content)
+            ids += [issue["id"] for issue in page["results"]]
+            url = page["next"]
+        self.assertEqual(ids, list(Issue.objects.filter(project=self.project).order_by('id').values_list('id', flat=True)))
+
+        response = self.aget(async_views.AsyncIssueList, f'{self.project_url}/issues/?page=2', self.user, project_pk=self.project.id)
+        self.assertEqual(json.loads(response.content)["count"], 15)
+        self.assertEqual(len(json.loads(response.content)["results"]), 5)
+
+        # Filtre validé en base (ModelChoiceFilter) : passé par un thread
+        path = f'{self.project_url}/issues/?author={self.contributor.id}&ordering=-created_time'
+        response = self.aget(async_views.AsyncIssueList, path, self.user, project_pk=self.project.id)
+        self.assertEqual(len(json.loads(response.content)["results"]), 10)
+        self.assertEqual(json.loads(response.content), self.sync_get(path, self.user).json())
+        path = f'{self.project_url}/issues/?author=0'
+        response = self.aget(async_views.AsyncIssueList, path, self.user, project_pk=self.project.id)
+        self.assertEqual(response.status_code, 400)
+
+    def test_writes_use_the_sync_view(self):
+        request = self.factory.post(
+            f'{self.project_url}/issues/',
+            data={"title": "Async", "desc": "Created through the async view", "tag": "BUG", "status": "OPEN", "assignee": self.assignee.id},
+            content_type="application/json",
+            headers={"authorization": self.token(self.contributor)},
+        )
+        response = async_to_sync(async_views.AsyncIssueList.as_view())(request, project_pk=self.project.id)
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Issue.objects.filter(project=self.project, title="Async").exists())
+
+
+class AsyncReadBenchmarkTest(TransactionTestCase):
+
+    def test_serve_reports_both_modes(self):
+        user = User.objects.create_user(username="bench")
+        project = Project.objects.create(
+            title="Bench", description="Bench", type="BACKEND", tags="BUG", priority="LOW", status="OPEN", author=user,
+        )
+        assignee = Contributor.objects.create(user=user, project=project)
+        Issue.objects.create(title="Issue", desc="Description", tag="BUG", status="OPEN", project=project, author=user, assignee=assignee)
+        for mode in ("wsgi", "asgi"):
+            out = StringIO()
+            call_command("bench_async_reads", serve=mode, project=project.id, user=user.id, requests=12, concurrency=3, stdout=out)
+            result = json.loads(out.getvalue())
+            self.assertEqual(result["mode"], mode)
+            self.assertEqual((result["requests"], result["failed"]), (12, 0))
+            self.assertGreater(result["throughput"], 0)
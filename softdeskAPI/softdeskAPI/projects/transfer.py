@@ -0,0 +1,310 @@
+import datetime
+import json
+import time
+from contextlib import contextmanager
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from projects.caching import get_membership_cache
+from projects.membership import sync_project_memberships
+from projects.models import Project, Contributor, Issue, Comment
+from projects.stats import reconcile_counters
+from projects.versioning import bump_project_version
+
+TRANSFER_VERSION = 1
+
+# Lignes lues par aller-retour avec la base, et insérées par bulk_create
+CHUNK_SIZE = 2000
+
+PROJECT_CONTRIBUTOR = Project.contributors.through
+
+# Ordre des dépendances : une ligne ne référence que des lignes des types précédents
+RECORD_TYPES = ["user", "project", "contributor", "project_contributor", "issue", "comment"]
+
+# Clés étrangères renumérotées à l'import, par type de la ligne référencée
+USER_FIELDS = {"author_id", "user_id"}
+FOREIGN_KEYS = {"project_id": "project", "assignee_id": "contributor", "issue_id": "issue"}
+
+
+class TransferEncoder(DjangoJSONEncoder):
+    """
+    JSON encoder keeping the microseconds of datetimes, which DjangoJSONEncoder truncates:
+    the imported rows sort exactly like the exported ones (keyset pagination on created_time).
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class TransferError(Exception):
+    """
+    Raised when a project export cannot be imported: malformed line, unknown user, or
+    record out of dependency order.
+    """
+
+
+def _project_querysets(project_id):
+    return [
+        (
+            "user",
+            # Sous-requêtes IN plutôt que des jointures : pas de DISTINCT sur des millions de lignes
+            User.objects.filter(
+                Q(pk__in=Project.objects.filter(pk=project_id).values("author_id"))
+                | Q(pk__in=Contributor.objects.filter(project_id=project_id).values("user_id"))
+                | Q(pk__in=PROJECT_CONTRIBUTOR.objects.filter(project_id=project_id).values("user_id"))
+                | Q(pk__in=Issue.objects.filter(project_id=project_id).values("author_id"))
+                | Q(pk__in=Comment.objects.filter(issue__project_id=project_id).values("author_id"))
+            ),
+            ["id", "username"],
+        ),
+        ("project", Project.objects.filter(pk=project_id), None),
+        ("contributor", Contributor.objects.filter(project_id=project_id), None),
+        ("project_contributor", PROJECT_CONTRIBUTOR.objects.filter(project_id=project_id), None),
+        ("issue", Issue.objects.filter(project_id=project_id), None),
+        ("comment", Comment.objects.filter(issue__project_id=project_id), None),
+    ]
+
+
+def export_project(project_id, chunk_size=CHUNK_SIZE):
+    """
+    Yields a project, its contributors, issues and comments, one dict per row, in dependency order.
+
+    Users are exported by username only: they are matched with the users of the target
+    database at import. Each type is read with `iterator(chunk_size=…)`, so memory stays
+    constant whatever the number of comments.
+
+    Yields:
+        dict: {"type": record type, "data": {field: value}}.
+    """
+    yield {"type": "export", "data": {"version": TRANSFER_VERSION, "project": project_id, "created": timezone.now()}}
+    for record_type, queryset, fields in _project_querysets(project_id):
+        if fields is None:
+            fields = [field.attname for field in queryset.model._meta.concrete_fields if field.name != "version"]
+        for row in queryset.order_by("pk").values(*fields).iterator(chunk_size=chunk_size):
+            yield {"type": record_type, "data": row}
+
+
+def write_ndjson(records, target):
+    """
+    Writes records to a text file as NDJSON, one JSON document per line.
+
+    Returns:
+        int: The number of records written.
+    """
+    encoder = TransferEncoder(ensure_ascii=False)
+    count = 0
+    for record in records:
+        target.write(encoder.encode(record) + "\n")
+        count += 1
+    return count
+
+
+def read_ndjson(source):
+    """
+    Yields the records of an NDJSON text file, decoding one line at a time.
+
+    Yields:
+        tuple: (line number, record).
+
+    Raises:
+        TransferError: If a line is not a JSON record.
+    """
+    for number, line in enumerate(source, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            raise TransferError(f"Line {number}: invalid JSON ({error}).")
+        if not isinstance(record, dict) or "type" not in record or not isinstance(record.get("data"), dict):
+            raise TransferError(f"Line {number}: expected an object with \"type\" and \"data\".")
+        yield number, record
+
+
+@contextmanager
+def _preserve_timestamps(*models):
+    """
+    Keeps the `created_time` and `updated_at` values read from the export during the block.
+
+    `bulk_create` sets auto_now and auto_now_add fields to the current time; they are
+    switched off for the block. Meant for management commands only: the flags are shared
+    by every thread of the process.
+    """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    flags = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
+
+
+class ProjectImporter:
+    """
+    Imports a project exported by `export_project` under new primary keys.
+
+    Records are buffered per type and inserted with `bulk_create` every `chunk_size` rows,
+    each chunk in its own savepoint. The old → new key maps of users, contributors and
+    issues are kept to remap the foreign keys of the following records; comments, which
+    nothing references, are not mapped, so memory grows with the number of issues at most.
+
+    Inserts bypass the model signals: `finish()` runs their work once for the whole project
+    (memberships, issue counters, membership cache, project version). The full-text index
+    is filled by its SQL triggers.
+
+    Attributes:
+        chunk_size (int): Rows per `bulk_create`.
+        default_user (User): Replaces the users of the export that do not exist here, or None.
+        progress (callable): Called with (record type, rows, seconds) when a type is done.
+        project (Project): The imported project, once its record is read.
+    """
+
+    MODELS = {"contributor": Contributor, "project_contributor": PROJECT_CONTRIBUTOR, "issue": Issue, "comment": Comment}
+    MAPPED = {"contributor", "issue"}
+
+    def __init__(self, chunk_size=CHUNK_SIZE, default_user=None, progress=None):
+        self.chunk_size = chunk_size
+        self.default_user = default_user
+        self.progress = progress
+        self.project = None
+        self.maps = {"user": {}, "project": {}, "contributor": {}, "issue": {}}
+        self.counts = {}
+        self._type = None
+        self._buffer = []
+        self._started = None
+
+    def _fields(self, model):
+        return {field.attname for field in model._meta.concrete_fields if not field.primary_key}
+
+    def _remap(self, record_type, data, number):
+        values = {}
+        for name, value in data.items():
+            target = "user" if name in USER_FIELDS else FOREIGN_KEYS.get(name)
+            if target is not None and value is not None:
+                value = self.maps[target].get(value)
+                if value is None:
+                    raise TransferError(f"Line {number}: {record_type} references an unknown {target} {data[name]}.")
+            values[name] = value
+        return values
+
+    def _read_users(self, rows):
+        usernames = {row["username"]: row["id"] for _, row in rows}
+        found = dict(User.objects.filter(username__in=usernames).values_list("username", "id"))
+        missing = set(usernames) - set(found)
+        if missing and self.default_user is None:
+            raise TransferError(f"Unknown user(s): {', '.join(sorted(missing)[:20])}.")
+        for username, old_id in usernames.items():
+            self.maps["user"][old_id] = found.get(username, self.default_user and self.default_user.pk)
+
+    def _flush(self):
+        rows, self._buffer = self._buffer, []
+        if not rows:
+            return
+        record_type = self._type
+        if record_type == "user":
+            self._read_users(rows)
+        elif record_type == "project":
+            if self.project is not None or len(rows) > 1:
+                raise TransferError(f"Line {rows[-1][0]}: an export holds a single project.")
+            number, data = rows[0]
+            fields = self._fields(Project) - {"version"}
+            values = self._remap(record_type, {k: v for k, v in data.items() if k in fields}, number)
+            # Projet créé par save() : ses signaux enregistrent l'auteur comme membre
+            self.project = Project.objects.create(**values)
+            self.maps["project"][data["id"]] = self.project.pk
+        else:
+            model = self.MODELS[record_type]
+            fields = self._fields(model)
+            objects = [
+                model(**self._remap(record_type, {k: v for k, v in data.items() if k in fields}, number))
+                for number, data in rows
+            ]
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create(objects)
+            except Exception as error:
+                raise TransferError(f"Lines {rows[0][0]}-{rows[-1][0]}: {record_type} rejected ({error}).")
+            if record_type in self.MAPPED:
+                # Clés renvoyées par INSERT … RETURNING, dans l'ordre des objets
+                self.maps[record_type].update((data["id"], obj.pk) for (_, data), obj in zip(rows, objects))
+        self.counts[record_type] = self.counts.get(record_type, 0) + len(rows)
+
+    def _end_type(self):
+        self._flush()
+        if self._type is not None and self.progress is not None:
+            self.progress(self._type, self.counts.get(self._type, 0), time.monotonic() - self._started)
+
+    def add(self, number, record):
+        """
+        Buffers a record, inserting the buffer when it is full or when the type changes.
+        """
+        record_type = record["type"]
+        if record_type == "export":
+            if record["data"].get("version") != TRANSFER_VERSION:
+                raise TransferError(f"Line {number}: unsupported export version {record['data'].get('version')}.")
+            return
+        if record_type not in RECORD_TYPES:
+            raise TransferError(f"Line {number}: unknown record type \"{record_type}\".")
+        if record_type != self._type:
+            if self._type is not None and RECORD_TYPES.index(record_type) < RECORD_TYPES.index(self._type):
+                raise TransferError(f"Line {number}: {record_type} found after {self._type}.")
+            self._end_type()
+            self._type = record_type
+            self._started = time.monotonic()
+        self._buffer.append((number, record["data"]))
+        # Les utilisateurs sont résolus en une requête par lot, comme les autres types
+        if len(self._buffer) >= self.chunk_size:
+            self._flush()
+
+    def finish(self):
+        """
+        Inserts the last buffered records and runs the work of the bypassed signals.
+
+        Returns:
+            Project: The imported project.
+        """
+        self._end_type()
+        if self.project is None:
+            raise TransferError("The export holds no project.")
+        project_id = self.project.pk
+        sync_project_memberships(project_id)
+        reconcile_counters([project_id])
+        get_membership_cache().invalidate_project(project_id)
+        bump_project_version(project_id)
+        return self.project
+
+
+def import_project(source, chunk_size=CHUNK_SIZE, default_user=None, progress=None):
+    """
+    Imports a project from an NDJSON export, in a single transaction.
+
+    Args:
+        source (file): The text file to read, line by line.
+        chunk_size (int): Rows per `bulk_create` and savepoint.
+        default_user (User): Replaces the users that do not exist in this database; without
+            it, unknown users are an error.
+        progress (callable): Called with (record type, rows, seconds) after each type.
+
+    Returns:
+        Project: The imported project.
+
+    Raises:
+        TransferError: If the export cannot be imported; nothing is imported then.
+    """
+    if not connection.features.can_return_rows_from_bulk_insert:
+        raise TransferError("Importing requires a database returning the keys of bulk inserts.")
+    importer = ProjectImporter(chunk_size, default_user, progress)
+    with transaction.atomic(), _preserve_timestamps(Project, Issue, Comment):
+        for number, record in read_ndjson(source):
+            importer.add(number, record)
+        return importer.finish()
@@ -0,0 +1,223 @@
+import hashlib
+import os
+import re
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+from projects.caching import LRUCache
+from projects.models import UploadSession, IssueAttachment, ProjectAttachment
+from projects.blobs import find_project_blob, get_blob
+from projects.storage import get_blob_storage
+
+# Fichiers en cours d'envoi, sur le même système de fichiers que les blobs
+UPLOAD_TO = "uploads"
+
+DEFAULT_OPTIONS = {
+    "MAX_FILE_SIZE": 2 * 1024 ** 3,
+    "MAX_CHUNK_SIZE": 8 * 1024 ** 2,
+    # Taille des lectures dans le corps de la requête : la mémoire utilisée par un chunk
+    "BUFFER_SIZE": 64 * 1024,
+    "HASHER_CACHE_ENTRIES": 1000,
+}
+
+_CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class UploadError(Exception):
+    """
+    A chunk that cannot be accepted; `status` is the HTTP status to answer with.
+    """
+
+    def __init__(self, detail, status=400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status = status
+
+
+def get_upload_options():
+    return {**DEFAULT_OPTIONS, **getattr(settings, "ATTACHMENT_UPLOADS", {})}
+
+
+_hashers = None
+
+
+def get_hashers():
+    """
+    Returns the process-wide cache of running SHA-256 states, keyed by upload id.
+
+    Each entry is an (offset, hasher) pair: the state is only reused if the upload has not
+    moved since, otherwise the received bytes are hashed again from storage.
+    """
+    global _hashers
+    if _hashers is None:
+        _hashers = LRUCache(get_upload_options()["HASHER_CACHE_ENTRIES"])
+    return _hashers
+
+
+def reset_hashers():
+    global _hashers
+    _hashers = None
+
+
+def parse_content_range(header, length):
+    """
+    Returns the (start, end, total) of a `Content-Range: bytes start-end/total` header.
+
+    Raises:
+        UploadError: If the header is malformed or does not match the body length.
+    """
+    match = _CONTENT_RANGE.match(header.strip())
+    if match is None:
+        raise UploadError("Content-Range must be 'bytes <start>-<end>/<size>'.")
+    start, end, total = (int(group) for group in match.groups())
+    if end < start or end - start + 1 != length:
+        raise UploadError("Content-Range does not match Content-Length.")
+    return start, end, total
+
+
+def _attach(session, blob):
+    fields = {"file": blob.name, "blob": blob, "filename": session.filename}
+    if session.issue_id is not None:
+        return IssueAttachment.objects.create(issue_id=session.issue_id, **fields)
+    return ProjectAttachment.objects.create(project_id=session.project_id, **fields)
+
+
+def start_upload(owner, project, filename, size, issue=None, sha256=None):
+    """
+    Creates an upload session and reserves the name of its file in storage.
+
+    The file is created empty, under a name no other file uses, next to the blob storage;
+    the chunks are then written into it. If the client gives the SHA-256 of a file already
+    attached in the project, the upload completes at once, without any chunk.
+    """
+    if size > get_upload_options()["MAX_FILE_SIZE"]:
+        raise UploadError("File too large.", status=413)
+    blob = find_project_blob(project.pk, sha256, size) if sha256 else None
+    if blob is not None:
+        with transaction.atomic():
+            now = timezone.now()
+            session = UploadSession.objects.create(
+                owner=owner, project=project, issue=issue, filename=filename, name=blob.name, size=size,
+                offset=size, sha256=blob.sha256, completed_time=now,
+            )
+            session.attachment_id = _attach(session, blob).pk
+            session.save(update_fields=["attachment_id"])
+        return session
+
+    name = default_storage.save(f"{UPLOAD_TO}/{get_valid_filename(filename)}", ContentFile(b""))
+    return UploadSession.objects.create(
+        owner=owner, project=project, issue=issue, filename=filename, name=name, size=size
+    )
+
+
+def _hasher(session):
+    entry = get_hashers().get(session.pk, None)
+    if entry is not None and entry[0] == session.offset:
+        return entry[1].copy()
+
+    # Reprise dans un autre processus ou état évincé : on relit les octets déjà reçus
+    hasher = hashlib.sha256()
+    buffer_size = get_upload_options()["BUFFER_SIZE"]
+    remaining = session.offset
+    with default_storage.open(session.name, "rb") as received:
+        while remaining:
+            data = received.read(min(buffer_size, remaining))
+            if not data:
+                break
+            hasher.update(data)
+            remaining -= len(data)
+    return hasher
+
+
+def write_chunk(session, stream, start, length):
+    """
+    Writes a chunk read from `stream` at `start` in the file of the upload.
+
+    The body is copied in BUFFER_SIZE pieces straight into the file, and hashed on the way, so
+    memory does not depend on the chunk or file size. The offset only moves once the whole chunk
+    is on disk, with an UPDATE conditional on the previous offset: a chunk sent twice, or by two
+    clients at once, is accepted only once. The last chunk creates the attachment in the same
+    transaction as the completion of the session, and moves the file into the blob storage.
+
+    Args:
+        session (UploadSession): The upload, as loaded for the request.
+        stream (file): The request body.
+        start (int): The position of the chunk in the file.
+        length (int): The number of bytes of the chunk.
+
+    Returns:
+        UploadSession: The session, with its new offset.
+
+    Raises:
+        UploadError: If the upload is complete, the chunk does not start at the current offset
+            (409), is too large (413) or was interrupted.
+    """
+    options = get_upload_options()
+    if session.complete:
+        raise UploadError("Upload already complete.", status=409)
+    if start != session.offset:
+        raise UploadError(f"Expected a chunk starting at {session.offset}.", status=409)
+    if length > options["MAX_CHUNK_SIZE"]:
+        raise UploadError("Chunk too large.", status=413)
+    if length == 0 or start + length > session.size:
+        raise UploadError("Chunk exceeds the declared file size.")
+
+    hasher = _hasher(session)
+    remaining = length
+    with open(default_storage.path(session.name), "r+b") as target:
+        target.seek(start)
+        while remaining:
+            data = stream.read(min(options["BUFFER_SIZE"], remaining))
+            if not data:
+                break
+            target.write(data)
+            hasher.update(data)
+            remaining -= len(data)
+        target.flush()
+        os.fsync(target.fileno())
+    if remaining:
+        # Connexion coupée : les octets écrits seront recouverts par le prochain envoi
+        raise UploadError("Incomplete chunk.")
+
+    offset = start + length
+    complete = offset == session.size
+    now = timezone.now()
+    with transaction.atomic():
+        fields = {"offset": offset, "updated_at": now}
+        if complete:
+            fields.update(sha256=hasher.hexdigest(), completed_time=now)
+        claimed = UploadSession.objects.filter(pk=session.pk, offset=start, completed_time=None).update(**fields)
+        if not claimed:
+            raise UploadError("Chunk already received.", status=409)
+        if complete:
+            blob = get_blob(fields["sha256"], session.size)
+            path = default_storage.path(session.name)
+            fields.update(name=blob.name, attachment_id=_attach(session, blob).pk)
+            UploadSession.objects.filter(pk=session.pk).update(name=blob.name, attachment_id=fields["attachment_id"])
+            # En dernier : le fichier rejoint les blobs, ou est supprimé si son contenu y est déjà
+            get_blob_storage().adopt(path, blob.name)
+
+    for field, value in fields.items():
+        setattr(session, field, value)
+    if complete:
+        get_hashers().delete(session.pk)
+    else:
+        get_hashers().set(session.pk, (offset, hasher))
+    return session
+
+
+def purge_stale_uploads(before):
+    """
+    Deletes the incomplete uploads without a chunk since `before`, and their files.
+
+    Returns:
+        int: The number of uploads deleted.
+    """
+    stale = list(UploadSession.objects.filter(completed_time=None, updated_at__lt=before).values_list("pk", "name"))
+    for _, name in stale:
+        default_storage.delete(name)
+    UploadSession.objects.filter(pk__in=[pk for pk, _ in stale]).delete()
+    return len(stale)
@@ -1,16 +1,36 @@
-﻿from django.urls import path
+﻿from django.conf import settings
+from django.urls import path
 from rest_framework.urlpatterns import format_suffix_patterns
-from projects import views
+from projects import async_views, views
+
+
+def read_view(name):
+    # Sous ASGI (ASYNC_VIEWS), les lectures sont servies par les vues asynchrones ; les vues DRF sinon
+    if settings.ASYNC_VIEWS:
+        return getattr(async_views, f"Async{name}").as_view()
+    return getattr(views, name).as_view()
+
 
 urlpatterns = [
-    path('', views.ProjectList.as_view()),
-    path('<int:pk>/', views.ProjectDetail.as_view()),
-    path('<int:project_pk>/contributors/', views.ContributorList.as_view()),
-    path('<int:project_pk>/users/', views.ContributorList.as_view(), name='project-contributors'),
+    path('', read_view('ProjectList')),
+    path('<int:pk>/', read_view('ProjectDetail')),
+    path('<int:pk>/stats/', views.ProjectStats.as_view(), name='project-stats'),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('cache-stats/', views.CacheStatsView.as_view(), name='cache-stats'),
+    path('<int:project_pk>/activity/', views.ProjectActivityList.as_view(), name='project-activity'),
+    path('<int:project_pk>/uploads/', views.UploadList.as_view(), name='project-uploads'),
+    path('<int:project_pk>/uploads/<int:upload_pk>/', views.UploadDetail.as_view(), name='upload-detail'),
+    path('<int:project_pk>/attachments/<int:attachment_pk>/', views.AttachmentDownload.as_view(), name='project-attachment'),
+    path('<int:project_pk>/contributors/', read_view('ContributorList')),
+    path('<int:project_pk>/contributors/bulk/', views.ContributorBulk.as_view(), name='project-contributors-bulk'),
+    path('<int:project_pk>/users/', read_view('ContributorList'), name='project-contributors'),
     path('<int:project_pk>/contributors/<int:contributor_pk>/', views.ContributorDetail.as_view(), name='project-contributor-detail'),
-    path('<int:project_pk>/issues/', views.IssueList.as_view()),
-    path('<int:project_pk>/issues/<int:issue_pk>/', views.IssueDetail.as_view()),
-    path('<int:project_pk>/issues/<int:issue_pk>/comments/', views.CommentList.as_view()),
+    path('<int:project_pk>/issues/', read_view('IssueList')),
+    path('<int:project_pk>/issues/<int:issue_pk>/', read_view('IssueDetail')),
+    path('<int:project_pk>/issues/<int:issue_pk>/activity/', views.IssueActivityList.as_view(), name='issue-activity'),
+    path('<int:project_pk>/issues/<int:issue_pk>/uploads/', views.UploadList.as_view(), name='issue-uploads'),
+    path('<int:project_pk>/issues/<int:issue_pk>/attachments/<int:attachment_pk>/', views.AttachmentDownload.as_view(), name='issue-attachment'),
+    path('<int:project_pk>/issues/<int:issue_pk>/comments/', read_view('CommentList')),
     path('<int:project_pk>/issues/<int:issue_pk>/comments/<int:comment_pk>/', views.CommentDetail.as_view()),
     path('<int:project_pk>/users/<int:user_pk>/', views.ContributorDetail.as_view(), name='project-contributor-detail'),
 ]
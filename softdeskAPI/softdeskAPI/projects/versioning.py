@@ -0,0 +1,68 @@
+import hashlib
+from django.db.models import F, QuerySet
+from django.utils import timezone
+from projects.models import Project
+
+
+def _already_bumped(origin, key):
+    """
+    Tells whether the deletion started by `origin` already bumped this project.
+
+    A cascade deletes many rows with the same origin (an instance or a queryset): the
+    project version only needs to be bumped once for all of them.
+    """
+    if origin is None:
+        return False
+    if isinstance(origin, Project) or (isinstance(origin, QuerySet) and origin.model is Project):
+        # Le projet lui-même est supprimé : inutile de le versionner
+        return True
+    bumped = origin.__dict__.setdefault("_bumped_versions", set())
+    if key in bumped:
+        return True
+    bumped.add(key)
+    return False
+
+
+def bump_project_version(project_id, origin=None):
+    """
+    Increments the version of a project and refreshes its `updated_at`, in a single UPDATE.
+
+    Args:
+        project_id (int): The project whose content changed.
+        origin: The origin of the deletion, when called from a `post_delete` handler.
+    """
+    if _already_bumped(origin, ("project", project_id)):
+        return
+    Project.objects.filter(pk=project_id).update(version=F("version") + 1, updated_at=timezone.now())
+
+
+def bump_project_versions(project_ids):
+    """
+    Bumps the version of several projects in a single UPDATE, after a batched change.
+    """
+    if project_ids:
+        Project.objects.filter(pk__in=project_ids).update(version=F("version") + 1, updated_at=timezone.now())
+
+
+def bump_issue_project_version(issue_id, origin=None):
+    """
+    Bumps the version of the project owning an issue, without loading the issue.
+    """
+    if _already_bumped(origin, ("issue", issue_id)):
+        return
+    Project.objects.filter(issue__id=issue_id).update(version=F("version") + 1, updated_at=timezone.now())
+
+
+def make_etag(*parts):
+    """
+    Returns a strong ETag built from the given parts.
+    """
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def project_etag(project, *parts):
+    """
+    Returns the ETag of a project-scoped representation, derived from the project version.
+    """
+    return make_etag("project", project.pk, project.version, project.updated_at.isoformat(), *parts)
@@ -1,32 +1,194 @@
 from django.shortcuts import render
 from rest_framework import serializers
-from django.db.models import Q
 # Create your views here.
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from projects.models import Project, Contributor, Issue, Comment
+from rest_framework.negotiation import BaseContentNegotiation
+from projects.models import Project, Contributor, Issue, Comment, Notification, ProjectActivity, IssueActivity, UploadSession
+from projects.models import IssueAttachment, ProjectAttachment
 from django.shortcuts import get_object_or_404
 from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.http import HttpResponse
+from django.db.models import Prefetch, prefetch_related_objects
 from projects.serializers import (
     ProjectSerializer,
     ContributorSerializer,
+    ContributorBulkSerializer,
     IssueSerializer,
+    IssueBulkSerializer,
     CommentSerializer,
     ProjectDetailSerializer,
     CommentDetailSerializer,
+    NotificationSerializer,
+    ProjectActivitySerializer,
+    IssueActivitySerializer,
+    UploadSessionSerializer,
 )
 from projects.permissions import (
     ProjectPermissions,
     ContributorPermissions,
     IssuePermissions,
     CommentPermissions,
+    UploadPermissions,
+    AttachmentPermissions,
 )
+from projects.membership import get_project_access, deferred_membership_sync, schedule_membership_sync
+from projects.caching import get_membership_cache, get_response_cache
+from projects.pagination import CURSOR
+from projects.versioning import bump_project_version, make_etag, project_etag
+from projects.search import search
+from projects.filters import IssueFilter, StableOrderingFilter
+from projects.stats import get_project_stats
+from projects.notifications import enqueue, issue_created_event, comment_created_event
+from projects.uploads import UploadError, parse_content_range, start_upload, write_chunk
+from projects.downloads import serve_blob
+from projects.activity import (
+    CREATE, UPDATE, DELETE, PROJECT, CONTRIBUTOR, ISSUE, COMMENT,
+    get_activity_recorder, field_values, diff,
+)
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from django.contrib.auth.models import User
 
-class ProjectList(generics.ListCreateAPIView):
+
+class RelatedQuerysetMixin:
+    """
+    Loads the relations the serializer needs along with the queryset, to avoid one query per object.
+
+    Attributes:
+        select_related_fields (tuple): Foreign keys fetched with a JOIN in the same query.
+        prefetch_related_fields (tuple): Many-to-many relations (or Prefetch objects) fetched with one extra query.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.select_related_fields:
+            queryset = queryset.select_related(*self.select_related_fields)
+        if self.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*self.prefetch_related_fields)
+        return queryset
+
+    def prefetch_related_for(self, instance):
+        """Loads the declared relations on an object that did not come from `get_queryset`."""
+        if self.prefetch_related_fields:
+            prefetch_related_objects([instance], *self.prefetch_related_fields)
+        return instance
+
+
+class ConditionalGetMixin:
+    """
+    Answers GET requests with 304 Not Modified when the client's copy is still current.
+
+    Views implement `get_validators()`, returning the (etag, last_modified) pair of the
+    representation. Both come from version columns loaded with the permission check,
+    so a 304 is sent without running the list query or serializing anything. Without
+    validators (None), the response is built as usual, with no conditional headers.
+    """
+
+    def get_validators(self):
+        return None
+
+    def get(self, request, *args, **kwargs):
+        validators = self.get_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+        etag, last_modified = validators
+        timestamp = int(last_modified.timestamp())
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(timestamp)
+        return response
+
+
+class CachedListMixin:
+    """
+    Serves project-scoped list pages from the response cache.
+
+    Entries are keyed by endpoint, project version, page or cursor and the caller's role,
+    and hold the rendered bytes. Any write under the project bumps its version, which
+    implicitly invalidates every cached page of the project. Only JSON responses are cached.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != "json":
+            return super().list(request, *args, **kwargs)
+
+        access = self.project_access
+        cache = get_response_cache()
+        key = cache.make_key(
+            type(self).__name__, access.project_pk, access.project.version,
+            request.get_full_path(), access.role,
+        )
+        entry = cache.get(key)
+        if entry is not None:
+            content, content_type = entry
+            response = HttpResponse(content, content_type=content_type)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = super().list(request, *args, **kwargs)
+        # Rendu anticipé (normalement fait par finalize_response) pour stocker les octets
+        response.accepted_renderer = request.accepted_renderer
+        response.accepted_media_type = request.accepted_media_type
+        response.renderer_context = self.get_renderer_context()
+        response.render()
+        cache.set(key, response.content, response["Content-Type"])
+        response["X-Cache"] = "MISS"
+        return response
+
+
+class ActivityMixin:
+    """
+    Records the changes made through the view in the activity log.
+
+    Updates and deletions made by the generic views are recorded under `activity_target`;
+    creations are recorded by each view's `perform_create`. Changes are made inside
+    `self.activity.atomic()`, which writes their entries in the same transaction.
+    """
+    activity_target = None
+
+    @property
+    def activity(self):
+        return get_activity_recorder(self.request)
+
+    def perform_update(self, serializer):
+        before = field_values(serializer.instance)
+        with self.activity.atomic():
+            instance = serializer.save()
+            self.activity.record(UPDATE, self.activity_target, instance, changes=diff(before, field_values(instance)))
+
+    def perform_destroy(self, instance):
+        with self.activity.atomic():
+            self.activity.record(DELETE, self.activity_target, instance)
+            instance.delete()
+
+
+class ProjectAccessMixin:
+    """
+    Gives views access to the project, role and issue resolved for the current request.
+
+    The lookup is shared with the permission classes, so it only runs once per request.
+    """
+
+    @property
+    def project_access(self):
+        return get_project_access(self.request, self)
+
+
+# Le serializer n'a besoin que des identifiants des contributeurs
+CONTRIBUTOR_IDS = Prefetch("contributors", queryset=User.objects.only("id"))
+
+
+class ProjectList(ActivityMixin, RelatedQuerysetMixin, generics.ListCreateAPIView):
     """
-    API endpoint to list all projects or create a new project.
+    API endpoint to list the projects of the current user or create a new project.
 
     Attributes:
         serializer_class (class): The serializer class for the project model.
@@ -35,18 +197,16 @@ class ProjectList(generics.ListCreateAPIView):
 
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated]
+    prefetch_related_fields = (CONTRIBUTOR_IDS,)
 
     def get_queryset(self):
-        return Project.objects.all().order_by('id')
         """
         Returns:
             QuerySet: A queryset containing projects where the current user is either a contributor or the author.
         """
+        # Parcours de l'index (user, project) de ProjectMembership : une ligne par projet, sans doublons
         user = self.request.user
-        return Project.objects.filter(
-            Q(author=user) |
-            Q(contributors=user)
-        )
+        return Project.objects.filter(memberships__user=user).order_by('id')
 
     def perform_create(self, serializer):
         """
@@ -58,11 +218,13 @@ class ProjectList(generics.ListCreateAPIView):
         Returns:
             None
         """
-        serializer.save(author=self.request.user)
+        with self.activity.atomic():
+            project = serializer.save(author=self.request.user)
+            self.activity.record(CREATE, PROJECT, project)
 
 
 
-class ProjectDetail(generics.RetrieveUpdateDestroyAPIView):
+class ProjectDetail(ActivityMixin, ConditionalGetMixin, RelatedQuerysetMixin, ProjectAccessMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint to retrieve, update, or delete a specific project.
 
@@ -73,6 +235,8 @@ class ProjectDetail(generics.RetrieveUpdateDestroyAPIView):
 
     serializer_class = ProjectSerializer
     permission_classes = [ProjectPermissions]
+    prefetch_related_fields = (CONTRIBUTOR_IDS,)
+    activity_target = PROJECT
 
     def get_queryset(self):
         # Récupère l'ID du projet à partir de l'URL
@@ -83,8 +247,36 @@ class ProjectDetail(generics.RetrieveUpdateDestroyAPIView):
         project_pk = self.kwargs.get('pk')
         return Project.objects.filter(id=project_pk)
 
+    def get_object(self):
+        # Le projet a déjà été chargé lors de la vérification des permissions
+        project = self.project_access.project
+        self.check_object_permissions(self.request, project)
+        return self.prefetch_related_for(project)
+
+    def get_validators(self):
+        project = self.project_access.project
+        return project_etag(project, self.request.accepted_renderer.format), project.updated_at
+
+
+class ProjectStats(ConditionalGetMixin, ProjectAccessMixin, generics.RetrieveAPIView):
+    """
+    API endpoint returning the issue statistics of a project: counts by status, priority and
+    tag, and open issues per assignee.
+
+    The figures come from the counters maintained on every issue write, not from aggregating
+    the issues, and are validated by the project version like the issue list.
+    """
+    permission_classes = [ProjectPermissions]
+
+    def get_validators(self):
+        project = self.project_access.project
+        return project_etag(project, "stats", self.request.accepted_renderer.format), project.updated_at
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(get_project_stats(self.project_access.project_pk))
+
 
-class ContributorList(generics.ListCreateAPIView):
+class ContributorList(ActivityMixin, CachedListMixin, RelatedQuerysetMixin, ProjectAccessMixin, generics.ListCreateAPIView):
     """
     API endpoint to list all contributors of a project or add a new contributor to a project.
 
@@ -109,10 +301,12 @@ class ContributorList(generics.ListCreateAPIView):
         return Contributor.objects.filter(project__id=self.kwargs["project_pk"]).order_by('id')
 
     def perform_create(self, serializer):
-        serializer.save(project_id=self.kwargs['project_pk'])
+        with self.activity.atomic():
+            contributor = serializer.save(project_id=self.kwargs['project_pk'])
+            self.activity.record(CREATE, CONTRIBUTOR, contributor)
 
 
-class ContributorDetail(generics.RetrieveUpdateDestroyAPIView):
+class ContributorDetail(ActivityMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint to retrieve, update, or delete a contributor of a specific project.
 
@@ -125,6 +319,7 @@ class ContributorDetail(generics.RetrieveUpdateDestroyAPIView):
     """
     serializer_class = ContributorSerializer
     permission_classes = [ContributorPermissions]
+    activity_target = CONTRIBUTOR
 
     def get_object(self):
         # Utilise 'user_pk' et 'project_pk' pour obtenir l'objet Contributor spécifique
@@ -152,7 +347,65 @@ class ContributorDetail(generics.RetrieveUpdateDestroyAPIView):
         return super().destroy(request, *args, **kwargs)
 
 
-class IssueList(generics.ListCreateAPIView):
+class ContributorBulk(ActivityMixin, ProjectAccessMixin, APIView):
+    """
+    API endpoint to add and remove many contributors of a project in one request.
+
+    Body: {"add": [user ids], "remove": [user ids]}. Users are resolved in one query, existing
+    contributors are skipped by the (user, project) unique constraint, and both the `Contributor`
+    table and `Project.contributors` are updated with set-based statements.
+    The project author cannot be removed.
+    """
+    permission_classes = [ContributorPermissions]
+
+    def post(self, request, project_pk):
+        serializer = ContributorBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        add = set(serializer.validated_data["add"])
+        remove = set(serializer.validated_data["remove"])
+        project = self.project_access.project
+
+        known = set(User.objects.filter(id__in=add | remove).values_list("id", flat=True))
+        unknown = sorted((add | remove) - known)
+        if unknown:
+            return Response({"detail": f"Unknown users: {unknown}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        authors = set(
+            Contributor.objects.filter(project=project, user_id__in=remove, role="AUTHOR").values_list("user_id", flat=True)
+        )
+        if project.author_id in remove or authors:
+            return Response({"detail": "Project author cannot be deleted."}, status=status.HTTP_400_BAD_REQUEST)
+
+        with self.activity.atomic(), deferred_membership_sync():
+            existing = set(
+                Contributor.objects.filter(project=project, user_id__in=add).values_list("user_id", flat=True)
+            )
+            Contributor.objects.bulk_create(
+                [Contributor(project=project, user_id=user_id) for user_id in add - existing],
+                ignore_conflicts=True,
+            )
+            removed = set(
+                Contributor.objects.filter(project=project, user_id__in=remove).values_list("user_id", flat=True)
+            )
+            Contributor.objects.filter(project=project, user_id__in=removed).delete()
+            if add:
+                project.contributors.add(*add)
+            if remove:
+                project.contributors.remove(*remove)
+            schedule_membership_sync(project.pk, add | remove)
+            # Lignes insérées sans récupérer leur id : l'entrée porte l'utilisateur
+            for user_id in sorted(add - existing):
+                self.activity.record(CREATE, CONTRIBUTOR, project_id=project.pk, changes={"user": [None, user_id]})
+            for user_id in sorted(removed):
+                self.activity.record(DELETE, CONTRIBUTOR, project_id=project.pk, changes={"user": [user_id, None]})
+
+        # bulk_create n'envoie pas de signal : on invalide les rôles en cache et on versionne le projet
+        get_membership_cache().invalidate_project(project.pk)
+        bump_project_version(project.pk)
+        return Response({"added": sorted(add - existing), "removed": sorted(removed)})
+
+
+class IssueList(ActivityMixin, ConditionalGetMixin, CachedListMixin, RelatedQuerysetMixin, ProjectAccessMixin, generics.ListCreateAPIView):
     """
     API endpoint to list all issues of a project or create a new issue for a project.
 
@@ -166,6 +419,15 @@ class IssueList(generics.ListCreateAPIView):
 
     serializer_class = IssueSerializer
     permission_classes = [IssuePermissions]
+    # project, author et assignee sont sérialisés par identifiant : aucune jointure nécessaire
+    select_related_fields = ()
+    # Pagination par numéro de page par défaut ; ?pagination=cursor (ou ?cursor=) pagine par
+    # curseur sur l'id, en temps constant quelle que soit la profondeur de la page
+    # ?status=&priority=&tag=&assignee=&author=&created_time_after=&created_time_before=&ordering=
+    filter_backends = [DjangoFilterBackend, StableOrderingFilter]
+    filterset_class = IssueFilter
+    ordering_fields = ["id", "created_time"]
+    ordering = ["id"]
 
     def get_queryset(self):
         """
@@ -176,12 +438,52 @@ class IssueList(generics.ListCreateAPIView):
         """
         return Issue.objects.filter(project__id=self.kwargs["project_pk"]).order_by('id')
 
-    def perform_create(self, serializer):
-        project = get_object_or_404(Project, id=self.kwargs['project_pk'])
-        serializer.save(author=self.request.user, project=project)
+    def get_validators(self):
+        # La version du projet change à chaque écriture sur ses issues : elle suffit à valider la page
+        project = self.project_access.project
+        etag = project_etag(project, self.request.get_full_path(), self.request.accepted_renderer.format)
+        return etag, project.updated_at
 
+    bulk_max_items = 10000
+
+    def perform_create(self, serializer):
+        # Notifications : un événement dans l'outbox, dans la même transaction que l'issue
+        with self.activity.atomic():
+            issue = serializer.save(author=self.request.user, project=self.project_access.project)
+            enqueue(issue_created_event(issue, self.request.user))
+            self.activity.record(CREATE, ISSUE, issue)
+
+    def create(self, request, *args, **kwargs):
+        # Un tableau JSON crée plusieurs issues en une seule requête
+        if isinstance(request.data, list):
+            return self.bulk_create(request)
+        return super().create(request, *args, **kwargs)
+
+    def bulk_create(self, request):
+        """
+        Creates every issue of a JSON array, or none of them.
 
-class IssueDetail(generics.RetrieveUpdateDestroyAPIView):
+        Returns:
+            Response: The created issues (201), or one error object per item (400).
+        """
+        if len(request.data) > self.bulk_max_items:
+            return Response(
+                {"detail": f"At most {self.bulk_max_items} issues can be created at once."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        project = self.project_access.project
+        context = dict(self.get_serializer_context(), project=project)
+        serializer = IssueBulkSerializer(data=request.data, many=True, context=context)
+        serializer.is_valid(raise_exception=True)
+        with self.activity.atomic():
+            issues = serializer.save(author=request.user, project=project)
+            enqueue(*[issue_created_event(issue, request.user) for issue in issues])
+            for issue in issues:
+                self.activity.record(CREATE, ISSUE, issue)
+        return Response(IssueSerializer(issues, many=True).data, status=status.HTTP_201_CREATED)
+
+
+class IssueDetail(ActivityMixin, ConditionalGetMixin, ProjectAccessMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint to retrieve, update, or delete a specific issue of a specific project.
 
@@ -194,37 +496,43 @@ class IssueDetail(generics.RetrieveUpdateDestroyAPIView):
     """
     serializer_class = IssueSerializer
     permission_classes = [IssuePermissions]
+    activity_target = ISSUE
 
     def get_object(self):
-        # Utilise 'project_pk' et 'issue_pk' pour obtenir l'objet Issue spécifique
-        project_pk = self.kwargs.get('project_pk')
-        issue_pk = self.kwargs.get('issue_pk')
-        return get_object_or_404(Issue, project__id=project_pk, id=issue_pk).order_by('id')
+        # L'issue a été récupérée avec son projet lors de la vérification des permissions
+        issue = self.project_access.issue
+        self.check_object_permissions(self.request, issue)
+        return issue
+
+    def get_validators(self):
+        issue = self.project_access.issue
+        etag = make_etag("issue", issue.pk, issue.updated_at.isoformat(), self.request.accepted_renderer.format)
+        return etag, issue.updated_at
 
     def update(self, request, *args, **kwargs):
         issue = self.get_object()
         serializer = self.get_serializer(issue, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
+            self.perform_update(serializer)
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class CommentList(generics.ListCreateAPIView):
+class CommentList(ActivityMixin, CachedListMixin, RelatedQuerysetMixin, ProjectAccessMixin, generics.ListCreateAPIView):
     serializer_class = CommentSerializer
     permission_classes = [CommentPermissions]
 
     def get_queryset(self):
-        issue_pk = self.kwargs.get("issue_pk")
-        project_pk = self.kwargs.get("project_pk")
-        return Comment.objects.filter(issue__id=issue_pk, issue__project__id=project_pk).order_by('id')
+        # CommentPermissions a vérifié que l'issue appartient au projet : pas besoin de jointure
+        return Comment.objects.filter(issue_id=self.project_access.issue.id).order_by('id')
 
     def perform_create(self, serializer):
-        issue_pk = self.kwargs.get("issue_pk")
-        issue = get_object_or_404(Issue, pk=issue_pk)
-        serializer.save(author=self.request.user, issue=issue)
+        with self.activity.atomic():
+            comment = serializer.save(author=self.request.user, issue=self.project_access.issue)
+            enqueue(comment_created_event(comment, self.request.user))
+            self.activity.record(CREATE, COMMENT, comment)
 
 
-class CommentDetail(generics.RetrieveUpdateDestroyAPIView):
+class CommentDetail(ActivityMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint to retrieve, update, or delete a comment of a specific issue.
 
@@ -238,6 +546,7 @@ class CommentDetail(generics.RetrieveUpdateDestroyAPIView):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [CommentPermissions]
+    activity_target = COMMENT
 
     def get_queryset(self):
         """
@@ -254,3 +563,235 @@ class CommentDetail(generics.RetrieveUpdateDestroyAPIView):
             return Comment.objects.get(pk=comment_id, issue__id=self.kwargs.get('issue_pk'))
         except Comment.DoesNotExist:
             raise Http404
+
+
+class SearchView(APIView):
+    """
+    API endpoint searching the issues and comments of the projects the user belongs to.
+
+    Query parameters: `q` (the words to look for), `project` (optional project id) and `page`.
+    Results are ranked by relevance and carry a highlighted snippet. Pages are read with
+    LIMIT/OFFSET on the full-text index, without counting every match. Without FTS5, the search
+    falls back to `icontains` lookups and results are not ranked.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    page_size = 10
+    max_page = 100
+
+    def get(self, request):
+        text = request.query_params.get("q", "")
+        project = request.query_params.get("project")
+        page = request.query_params.get("page", "1")
+        if not page.isdigit() or not 1 <= int(page) <= self.max_page:
+            return Response({"detail": "Invalid page."}, status=status.HTTP_400_BAD_REQUEST)
+        if project is not None and not project.isdigit():
+            return Response({"detail": "Invalid project."}, status=status.HTTP_400_BAD_REQUEST)
+        page = int(page)
+
+        # Un résultat de plus que la page : indique s'il existe une page suivante
+        results = search(
+            request.user, text,
+            project_id=int(project) if project is not None else None,
+            limit=self.page_size + 1,
+            offset=(page - 1) * self.page_size,
+        )
+        url = request.build_absolute_uri()
+        next_url = None
+        if len(results) > self.page_size and page < self.max_page:
+            next_url = replace_query_param(url, "page", page + 1)
+        previous_url = None
+        if page > 1:
+            previous_url = replace_query_param(url, "page", page - 1) if page > 2 else remove_query_param(url, "page")
+        return Response({
+            "next": next_url,
+            "previous": previous_url,
+            "results": results[:self.page_size],
+        })
+
+
+class UploadList(ProjectAccessMixin, generics.CreateAPIView):
+    """
+    API endpoint starting a resumable upload of a project attachment, or of an issue attachment
+    when the URL names an issue.
+
+    Body: {"filename": str, "size": int, "sha256": optional str}. The chunks are then sent to
+    `UploadDetail`, unless the file is already attached in the project (see `start_upload`).
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [UploadPermissions]
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        access = self.project_access
+        try:
+            session = start_upload(
+                request.user,
+                access.project,
+                serializer.validated_data["filename"],
+                serializer.validated_data["size"],
+                issue=access.issue,
+                sha256=serializer.validated_data.get("sha256"),
+            )
+        except UploadError as error:
+            return Response({"detail": error.detail}, status=error.status)
+        location = f"/projects/{access.project_pk}/uploads/{session.pk}/"
+        return Response(self.get_serializer(session).data, status=status.HTTP_201_CREATED, headers={"Location": location})
+
+
+class UploadDetail(ProjectAccessMixin, generics.RetrieveAPIView):
+    """
+    API endpoint reporting the progress of an upload (GET) and receiving its chunks (PUT).
+
+    A chunk is the raw request body, positioned by a `Content-Range: bytes start-end/size`
+    header, or by an `offset` query parameter. It must start at the current offset: after an
+    interruption, the client reads the offset and resends from there. A chunk that does not
+    start at the offset is answered with 409 and the offset to resume from.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [UploadPermissions]
+    # Le corps d'un chunk est lu en flux par put(), jamais chargé en mémoire par un parser
+    parser_classes = []
+
+    def get_object(self):
+        return get_object_or_404(
+            UploadSession, pk=self.kwargs["upload_pk"], project_id=self.kwargs["project_pk"], owner=self.request.user
+        )
+
+    def put(self, request, *args, **kwargs):
+        session = self.get_object()
+        try:
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+            header = request.META.get("HTTP_CONTENT_RANGE")
+            if header:
+                start, _, total = parse_content_range(header, length)
+                if total != session.size:
+                    raise UploadError("Content-Range size does not match the upload size.")
+            else:
+                try:
+                    start = int(request.query_params["offset"])
+                except (KeyError, ValueError):
+                    raise UploadError("A Content-Range header or an offset parameter is required.")
+            write_chunk(session, request.stream, start, length)
+        except UploadError as error:
+            session.refresh_from_db(fields=["offset"])
+            return Response({"detail": error.detail, "offset": session.offset}, status=error.status)
+        return Response(self.get_serializer(session).data)
+
+
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """
+    Content negotiation for views returning files: the Accept header names the file type, not
+    a renderer, and must not cause a 406. Errors are rendered with the first renderer.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0] if parsers else None
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class AttachmentDownload(ProjectAccessMixin, APIView):
+    """
+    API endpoint downloading a project attachment, or an issue attachment when the URL names
+    an issue.
+
+    Supports Range (single and multiple ranges), If-Range and If-None-Match, with the SHA-256
+    of the content as ETag. The bytes are sent by `serve_blob`, or by the front proxy after
+    the permission check when ATTACHMENT_DOWNLOADS["MODE"] is "x-accel-redirect" or
+    "x-sendfile".
+    """
+    permission_classes = [AttachmentPermissions]
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    def get(self, request, project_pk, attachment_pk, issue_pk=None):
+        if issue_pk is not None:
+            # AttachmentPermissions a vérifié que l'issue appartient au projet
+            attachments = IssueAttachment.objects.filter(issue_id=issue_pk)
+        else:
+            attachments = ProjectAttachment.objects.filter(project_id=project_pk)
+        # Les fichiers pas encore déplacés par migrate_attachment_blobs n'ont pas de blob
+        attachment = get_object_or_404(attachments.select_related("blob"), pk=attachment_pk, blob__isnull=False)
+        return serve_blob(request, attachment.blob, attachment.filename)
+
+
+class NotificationList(generics.ListAPIView):
+    """
+    API endpoint listing the unread notifications of the current user, newest first.
+
+    Pages are read by keyset on the (user, is_read, id) index.
+    """
+    serializer_class = NotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_mode = CURSOR
+    cursor_ordering = "-id"
+
+    def get_queryset(self):
+        return Notification.objects.filter(user=self.request.user, is_read=False).order_by('-id')
+
+
+class ProjectActivityList(ProjectAccessMixin, generics.ListAPIView):
+    """
+    API endpoint listing the activity of a project, newest first.
+
+    Covers the changes made to the project and its contributors, and the deletion of its issues.
+    Pages are read by keyset on the (project, created_time) index.
+    """
+    serializer_class = ProjectActivitySerializer
+    permission_classes = [ContributorPermissions]
+    pagination_mode = CURSOR
+    cursor_ordering = ("-created_time", "-id")
+
+    def get_queryset(self):
+        return ProjectActivity.objects.filter(project_id=self.kwargs['project_pk']).order_by('-created_time', '-id')
+
+
+class IssueActivityList(ProjectAccessMixin, generics.ListAPIView):
+    """
+    API endpoint listing the activity of an issue and its comments, newest first.
+
+    Pages are read by keyset on the (issue, created_time) index.
+    """
+    serializer_class = IssueActivitySerializer
+    permission_classes = [IssuePermissions]
+    pagination_mode = CURSOR
+    cursor_ordering = ("-created_time", "-id")
+
+    def get_queryset(self):
+        # IssuePermissions a vérifié que l'issue appartient au projet
+        return IssueActivity.objects.filter(issue_id=self.kwargs['issue_pk']).order_by('-created_time', '-id')
+
+
+class NotificationRead(APIView):
+    """
+    API endpoint marking the current user's notifications as read.
+
+    Body: {"up_to": <notification id>} marks every unread notification up to that id, in one
+    UPDATE, so a client can acknowledge everything it has displayed.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        up_to = request.data.get("up_to")
+        if not isinstance(up_to, int) or isinstance(up_to, bool):
+            return Response({"up_to": ["A notification id is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        marked = Notification.objects.filter(user=request.user, is_read=False, id__lte=up_to).update(is_read=True)
+        return Response({"marked": marked})
+
+
+class CacheStatsView(APIView):
+    """
+    API endpoint exposing the counters of the in-process caches, to help size them.
+
+    Only available to administrators.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        cache = get_membership_cache()
+        data = {
+            "membership": dict(cache.stats.as_dict(), size=len(cache.local)),
+            "responses": get_response_cache().stats.as_dict(),
+        }
+        return Response(data)
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'softdeskAPI.settings')
+# Lectures des projets servies par les vues asynchrones (settings.ASYNC_VIEWS)
+os.environ.setdefault('SOFTDESK_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -75,11 +76,17 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'softdeskAPI.wsgi.application'
 
+# Lectures des projets (listes, détails) servies par les vues asynchrones de projects.async_views.
+# Activé par asgi.py : sous WSGI, une vue asynchrone coûterait une boucle d'événements par requête.
+ASYNC_VIEWS = os.environ.get('SOFTDESK_ASYNC_VIEWS', '0') == '1'
+
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # Pagination par numéro de page (?page=) ou par curseur (?cursor=, ?pagination=cursor)
+    'DEFAULT_PAGINATION_CLASS': 'projects.pagination.FlexiblePagination',
     'PAGE_SIZE': 10,
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication avec un cache des utilisateurs : voir USER_CACHE
+        'users.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ),
@@ -116,6 +123,78 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Cache des rôles (utilisateur, projet) partagé par toutes les requêtes du processus.
+# Limite multi-workers : sans CACHE_ALIAS, une invalidation (contributeur retiré) n'atteint que le
+# processus qui a fait l'écriture ; les autres accordent encore l'accès jusqu'à LOCAL_TIMEOUT secondes.
+# Avec plusieurs workers, renseigner CACHE_ALIAS (backend partagé Redis/Memcached, pas locmem) :
+# les invalidations sont alors immédiates partout et TIMEOUT s'applique.
+MEMBERSHIP_CACHE = {
+    'MAX_ENTRIES': 10000,
+    'CACHE_ALIAS': None,
+    'TIMEOUT': 300,
+    'LOCAL_TIMEOUT': 5,
+}
+
+# Cache des réponses des listes d'un projet (contributeurs, issues, commentaires).
+# Les clés contiennent la version du projet : toute écriture invalide implicitement les entrées.
+RESPONSE_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
+# Cache en mémoire des utilisateurs authentifiés par JWT, invalidé à chaque enregistrement.
+# Les autres processus ne voient pas les invalidations : TIMEOUT borne leur retard.
+USER_CACHE = {
+    'MAX_ENTRIES': 10000,
+    'TIMEOUT': 60,
+}
+
+
+# Tâches de fond (exports de données) : pool de threads du processus.
+# EAGER les exécute au commit, dans le thread de la requête (tests).
+BACKGROUND_JOBS = {
+    'MAX_WORKERS': 2,
+    'EAGER': False,
+}
+
+DATA_ERASURE = {
+    'BATCH_SIZE': 500,
+    'PAUSE': 0.0,
+}
+
+
+# Hachage des mots de passe (inscription, connexion) dans un pool de threads borné.
+# Pool et file pleins : 503 avec Retry-After. MAX_WORKERS à 0 : hachage dans le thread de la requête.
+PASSWORD_HASHING = {
+    'MAX_WORKERS': 2,
+    'MAX_QUEUE': 32,
+    'TIMEOUT': 10,
+    'RETRY_AFTER': 1,
+}
+
+# Import d'utilisateurs en masse (commande import_users, endpoint /import-users/).
+# WORKERS à None : un processus de hachage par cœur (commande seulement ; l'endpoint hache dans sa tâche de fond).
+USER_PROVISIONING = {
+    'BATCH_SIZE': 1000,
+    'WORKERS': None,
+    'MIN_POOL_ROWS': 16,
+    'MAX_ROWS': 5000,
+}
+
+AUTHENTICATION_BACKENDS = [
+    'users.backends.PooledModelBackend',
+]
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -152,6 +231,27 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+
+# Media files (attachments)
+
+MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_URL = 'media/'
+
+# Envoi des pièces jointes par morceaux : tailles maximales (octets) et taille des lectures du corps.
+ATTACHMENT_UPLOADS = {
+    'MAX_FILE_SIZE': 2 * 1024 ** 3,
+    'MAX_CHUNK_SIZE': 8 * 1024 ** 2,
+    'BUFFER_SIZE': 64 * 1024,
+}
+
+# Téléchargement des pièces jointes : 'direct' (Django envoie le fichier), 'x-accel-redirect' (nginx,
+# ACCEL_PREFIX étant une location `internal` pointant sur MEDIA_ROOT) ou 'x-sendfile' (Apache, lighttpd).
+ATTACHMENT_DOWNLOADS = {
+    'MODE': 'direct',
+    'ACCEL_PREFIX': '/protected-media/',
+    'MAX_RANGES': 16,
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
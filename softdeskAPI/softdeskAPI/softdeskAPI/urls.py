@@ -26,6 +26,8 @@ from projects import views
 urlpatterns = [
     path("", include("users.urls")),
     path("projects/", include("projects.urls")),
+    path("notifications/", views.NotificationList.as_view(), name="notifications"),
+    path("notifications/read/", views.NotificationRead.as_view(), name="notifications-read"),
 ]
 
 urlpatterns = format_suffix_patterns(urlpatterns)
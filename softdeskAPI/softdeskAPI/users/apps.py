@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "users"
+
+    def ready(self):
+        # Enregistre les signaux d'invalidation du cache des utilisateurs authentifiés
+        from users import signals  # noqa: F401
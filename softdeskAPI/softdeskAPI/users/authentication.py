@@ -0,0 +1,170 @@
+import itertools
+import threading
+from django.conf import settings
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from projects.caching import MISSING, LRUCache
+
+try:
+    from rest_framework_simplejwt.utils import get_md5_hash_password
+except ImportError:
+    # simplejwt < 5.3 : pas de révocation des jetons au changement de mot de passe
+    get_md5_hash_password = None
+
+DEFAULT_OPTIONS = {
+    "MAX_ENTRIES": 10000,
+    # Durée de vie courte : borne le retard des autres processus, qui ne voient pas les invalidations
+    "TIMEOUT": 60,
+}
+
+
+class UserCache:
+    """
+    Process-wide cache of the field values of the users authenticated by JWT, keyed by user id.
+
+    Values, not instances, are cached: each request gets its own `User`, so a view modifying
+    `request.user` never leaks into another request. Entries are dropped when the user is
+    saved or deleted (`users.signals`); a lookup that started before an invalidation does
+    not store its result, so a concurrent deactivation is never overwritten by an older read.
+
+    Args:
+        max_entries (int): Size bound of the LRU.
+        timeout (float): Lifetime of an entry, in seconds.
+    """
+
+    def __init__(self, max_entries=10000, timeout=60):
+        self.entries = LRUCache(max_entries, ttl=timeout)
+        self.stats = self.entries.stats
+        self._invalidations = itertools.count()
+        self._generation = next(self._invalidations)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        options = {**DEFAULT_OPTIONS, **getattr(settings, "USER_CACHE", {})}
+        return cls(max_entries=options["MAX_ENTRIES"], timeout=options["TIMEOUT"])
+
+    def generation(self):
+        """
+        Returns a token to pass to `set`, taken before reading the user from the database.
+        """
+        return self._generation
+
+    # Clés en chaînes : simplejwt écrit l'identifiant dans le jeton sous forme de chaîne
+    def get(self, user_id):
+        return self.entries.get(str(user_id))
+
+    def set(self, user_id, values, generation):
+        with self._lock:
+            if generation == self._generation:
+                self.entries.set(str(user_id), values)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._generation = next(self._invalidations)
+            self.entries.delete(str(user_id))
+
+    def clear(self):
+        with self._lock:
+            self._generation = next(self._invalidations)
+            self.entries.clear()
+
+
+_user_cache = None
+
+
+def get_user_cache():
+    """
+    Returns the process-wide UserCache, built from the `USER_CACHE` setting.
+    """
+    global _user_cache
+    if _user_cache is None:
+        _user_cache = UserCache.from_settings()
+    return _user_cache
+
+
+def reset_user_cache():
+    global _user_cache
+    _user_cache = None
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication resolving the user from `UserCache` instead of a SELECT per request.
+
+    The token is still decoded and verified on every request; only the user lookup is
+    cached. The "user is inactive" and "password changed" checks run on cached users too.
+    `aauthenticate` is the same check for async views (`projects.async_views`): a cached
+    user is resolved without leaving the event loop.
+    """
+
+    def _check_user(self, user, validated_token):
+        # Réglages absents des versions antérieures à simplejwt 5.3 : mêmes contrôles que leur get_user
+        if getattr(api_settings, "CHECK_USER_IS_ACTIVE", True) and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if get_md5_hash_password is not None and getattr(api_settings, "CHECK_REVOKE_TOKEN", False):
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        cache = get_user_cache()
+        fields = [field.attname for field in self.user_model._meta.concrete_fields]
+        values = cache.get(user_id)
+        if values is MISSING:
+            generation = cache.generation()
+            # Utilisateurs absents ou inactifs : l'exception est levée avant la mise en cache
+            user = super().get_user(validated_token)
+            cache.set(user_id, tuple(getattr(user, field) for field in fields), generation)
+            return user
+
+        user = self.user_model.from_db(router.db_for_read(self.user_model), fields, values)
+        self._check_user(user, validated_token)
+        return user
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        cache = get_user_cache()
+        fields = [field.attname for field in self.user_model._meta.concrete_fields]
+        values = cache.get(user_id)
+        if values is MISSING:
+            generation = cache.generation()
+            try:
+                user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+            self._check_user(user, validated_token)
+            cache.set(user_id, tuple(getattr(user, field) for field in fields), generation)
+            return user
+
+        user = self.user_model.from_db(router.db_for_read(self.user_model), fields, values)
+        self._check_user(user, validated_token)
+        return user
+
+    async def aauthenticate(self, request):
+        """
+        Async `authenticate`: the header and the token are checked in the event loop, the
+        user is read from the cache or with the async ORM.
+
+        Returns:
+            tuple: (user, validated token), or None when the request carries no JWT.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
@@ -0,0 +1,185 @@
+import logging
+import time
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from projects.models import (
+    Issue, Comment, ProjectComment, IssueComment, ProjectActivity, IssueActivity, Notification,
+    NotificationOutbox, UploadSession,
+)
+from projects.versioning import bump_project_versions
+from users.models import UserData, UserConsent, DataExport, ErasureJob
+
+logger = logging.getLogger(__name__)
+
+REDACTED = "[deleted]"
+
+# Étape de suppression des lignes, plutôt que d'anonymisation
+DELETE = None
+
+DEFAULT_OPTIONS = {
+    # Lignes par transaction : SQLite n'est verrouillé que le temps d'un lot
+    "BATCH_SIZE": 500,
+    # Pause entre deux lots, en secondes, pour laisser passer les autres écritures
+    "PAUSE": 0.0,
+}
+
+
+def _redact_changes(batch):
+    """
+    Replaces the old and new values of the activity entries of a batch, keeping the names of
+    the changed fields.
+    """
+    entries = list(batch.only("pk", "changes"))
+    for entry in entries:
+        entry.changes = {
+            name: [None if value is None else REDACTED for value in values]
+            for name, values in entry.changes.items()
+        }
+    batch.model.objects.bulk_update(entries, ["changes"])
+
+
+def _delete_exports(batch):
+    """
+    Deletes the archives of a batch of DataExport, then the rows.
+    """
+    for name in batch.exclude(file="").values_list("file", flat=True):
+        default_storage.delete(name)
+    batch.delete()
+
+
+def _activities(model, user):
+    # Entrées de l'utilisateur, et suppressions de ses issues ou commentaires par d'autres :
+    # leur diff contient le titre et la description complets
+    return model.objects.filter(Q(actor=user) | Q(changes__author__0=user.pk))
+
+
+# Les notifications écrites avant le champ actor n'ont que leur texte, qui se termine par le nom
+# d'utilisateur de l'auteur
+def _notifications(user):
+    return Notification.objects.filter(
+        Q(issue__author=user) | Q(user=user) | Q(actor=user)
+        | Q(actor__isnull=True, desc__endswith=f" by {user.username}.")
+    )
+
+
+# (nom, queryset des lignes de l'utilisateur, champ du projet à versionner, valeurs, DELETE ou
+# fonction appliquée au lot)
+STEPS = [
+    ("issue", lambda user: Issue.objects.filter(author=user), "project_id", {"title": REDACTED, "desc": REDACTED}),
+    ("comment", lambda user: Comment.objects.filter(author=user), "issue__project_id", {"desc": REDACTED}),
+    ("project_comment", lambda user: ProjectComment.objects.filter(author=user), "project_id", {"desc": REDACTED}),
+    ("issue_comment", lambda user: IssueComment.objects.filter(author=user), "issue__project_id", {"desc": REDACTED}),
+    ("project_activity", lambda user: _activities(ProjectActivity, user), "project_id", _redact_changes),
+    (
+        "issue_activity",
+        lambda user: _activities(IssueActivity, user) | IssueActivity.objects.filter(issue__author=user),
+        "issue__project_id",
+        _redact_changes,
+    ),
+    ("notification", _notifications, None, {"desc": REDACTED}),
+    (
+        "notification_outbox",
+        lambda user: NotificationOutbox.objects.filter(Q(actor=user) | Q(issue__author=user)),
+        None,
+        {"desc": REDACTED},
+    ),
+    ("upload_session", lambda user: UploadSession.objects.filter(owner=user), None, {"filename": REDACTED}),
+    ("data_export", lambda user: DataExport.objects.filter(user=user), None, _delete_exports),
+    ("user_data", lambda user: UserData.objects.filter(user=user), None, DELETE),
+    ("consent", lambda user: UserConsent.objects.filter(user=user), None, DELETE),
+]
+
+
+def get_erasure_options():
+    return {**DEFAULT_OPTIONS, **getattr(settings, "DATA_ERASURE", {})}
+
+
+def _process_batch(job, step, last_id, batch_size):
+    """
+    Anonymizes or deletes the next batch of a step, and records the checkpoint, in one transaction.
+
+    Returns:
+        int: The identifier of the last row processed, or None when the step is finished.
+    """
+    name, get_queryset, project_field, values = step
+    queryset = get_queryset(job.user)
+    with transaction.atomic():
+        rows = list(
+            queryset.filter(pk__gt=last_id).order_by("pk").values_list("pk", project_field or "pk")[:batch_size]
+        )
+        if not rows:
+            return None
+        batch = queryset.model.objects.filter(pk__in=[pk for pk, _ in rows])
+        if values is DELETE:
+            batch.delete()
+        elif callable(values):
+            values(batch)
+        else:
+            # update() ne renseigne pas les champs auto_now : les ETag des issues en dépendent
+            if any(field.name == "updated_at" for field in queryset.model._meta.concrete_fields):
+                values = {**values, "updated_at": timezone.now()}
+            batch.update(**values)
+        if project_field:
+            # Les listes en cache des projets touchés sont invalidées ; l'index de recherche
+            # est tenu à jour par ses triggers
+            bump_project_versions({project_id for _, project_id in rows})
+        last_id = rows[-1][0]
+        ErasureJob.objects.filter(pk=job.pk).update(
+            step=name, last_id=last_id, processed=F("processed") + len(rows), updated_at=timezone.now()
+        )
+    return last_id
+
+
+def _anonymize_user(user):
+    user.email = "deleted@domain.com"
+    user.first_name = ""
+    user.last_name = ""
+    user.save(update_fields=["email", "first_name", "last_name"])
+
+
+def run_erasure(job_id, resume=False, batch_size=None):
+    """
+    Runs an ErasureJob: every step in fixed-size batches, then the `User` fields.
+
+    Each batch is a short transaction of one SELECT of identifiers, one UPDATE or DELETE by
+    primary key and the checkpoint. The job is claimed with an UPDATE conditional on its
+    status, so it runs once even if submitted twice.
+
+    Args:
+        job_id (int): The job to run.
+        resume (bool): Also run a job that was interrupted ("running") or "failed", from its
+            checkpoint. Used by the `resume_erasures` command.
+        batch_size (int): Rows per transaction; defaults to DATA_ERASURE["BATCH_SIZE"].
+
+    Returns:
+        bool: True if the job was run, False if it was not in a runnable status.
+    """
+    options = get_erasure_options()
+    batch_size = batch_size or options["BATCH_SIZE"]
+    statuses = [ErasureJob.PENDING, ErasureJob.RUNNING, ErasureJob.FAILED] if resume else [ErasureJob.PENDING]
+    claimed = ErasureJob.objects.filter(pk=job_id, status__in=statuses).update(
+        status=ErasureJob.RUNNING, error="", updated_at=timezone.now()
+    )
+    if not claimed:
+        return False
+
+    job = ErasureJob.objects.select_related("user").get(pk=job_id)
+    names = [step[0] for step in STEPS]
+    first = names.index(job.step) if job.step in names else 0
+    try:
+        for step in STEPS[first:]:
+            last_id = job.last_id if step[0] == job.step else 0
+            while last_id is not None:
+                last_id = _process_batch(job, step, last_id, batch_size)
+                if last_id is not None and options["PAUSE"]:
+                    time.sleep(options["PAUSE"])
+        with transaction.atomic():
+            _anonymize_user(job.user)
+            ErasureJob.objects.filter(pk=job_id).update(status=ErasureJob.DONE, completed_time=timezone.now())
+    except Exception as error:
+        logger.exception("Erasure job %s failed.", job_id)
+        ErasureJob.objects.filter(pk=job_id).update(status=ErasureJob.FAILED, error=str(error))
+    return True
@@ -0,0 +1,148 @@
+import logging
+import os
+import uuid
+import zipfile
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+from projects.models import (
+    Project, Contributor, Issue, Comment, Notification, ProjectActivity, IssueActivity, UploadSession,
+    ProjectComment, IssueComment, ProjectContributor, IssueContributor, ProjectIssue,
+)
+from users.models import UserData, UserConsent, DataExport
+
+logger = logging.getLogger(__name__)
+
+EXPORT_VERSION = 1
+
+# Lignes lues par aller-retour avec la base : la mémoire ne dépend pas du volume exporté
+CHUNK_SIZE = 2000
+
+# Taille des morceaux envoyés au client
+BUFFER_SIZE = 64 * 1024
+
+# Jamais exportés, même pour leur propriétaire
+EXCLUDED_FIELDS = {"password"}
+
+# (type des lignes, fonction renvoyant le queryset de l'utilisateur)
+SECTIONS = [
+    ("user", lambda user: User.objects.filter(pk=user.pk)),
+    ("user_data", lambda user: UserData.objects.filter(user=user)),
+    ("consent", lambda user: UserConsent.objects.filter(user=user)),
+    ("project", lambda user: Project.objects.filter(author=user)),
+    ("contributor", lambda user: Contributor.objects.filter(user=user)),
+    ("project_membership", lambda user: Project.contributors.through.objects.filter(user=user)),
+    ("issue", lambda user: Issue.objects.filter(Q(author=user) | Q(assignee__user=user))),
+    ("comment", lambda user: Comment.objects.filter(author=user)),
+    ("notification", lambda user: Notification.objects.filter(user=user)),
+    ("project_activity", lambda user: ProjectActivity.objects.filter(actor=user)),
+    ("issue_activity", lambda user: IssueActivity.objects.filter(actor=user)),
+    ("upload", lambda user: UploadSession.objects.filter(owner=user)),
+    ("project_comment", lambda user: ProjectComment.objects.filter(author=user)),
+    ("issue_comment", lambda user: IssueComment.objects.filter(author=user)),
+    ("project_contributor", lambda user: ProjectContributor.objects.filter(user=user)),
+    ("issue_contributor", lambda user: IssueContributor.objects.filter(user=user)),
+    ("project_issue", lambda user: ProjectIssue.objects.filter(Q(author=user) | Q(assignee=user))),
+]
+
+
+def export_records(user, chunk_size=CHUNK_SIZE):
+    """
+    Yields the personal data of a user, one dict per row, section after section.
+
+    The first record describes the export. Each section is read with
+    `iterator(chunk_size=…)`, which streams rows from the database (server-side cursors where
+    supported) instead of loading the section, so memory stays constant whatever its size.
+
+    Yields:
+        dict: {"type": section, "data": {field: value}}.
+    """
+    yield {"type": "export", "data": {"version": EXPORT_VERSION, "user": user.pk, "created": timezone.now()}}
+    for section, get_queryset in SECTIONS:
+        queryset = get_queryset(user)
+        fields = [
+            field.attname for field in queryset.model._meta.concrete_fields if field.name not in EXCLUDED_FIELDS
+        ]
+        for row in queryset.order_by("pk").values(*fields).iterator(chunk_size=chunk_size):
+            yield {"type": section, "data": row}
+
+
+def export_ndjson(user, chunk_size=CHUNK_SIZE, buffer_size=BUFFER_SIZE):
+    """
+    Yields the export of a user as NDJSON (one JSON document per line), in pieces of about
+    `buffer_size` bytes.
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    buffer = []
+    buffered = 0
+    for record in export_records(user, chunk_size):
+        line = (encoder.encode(record) + "\n").encode()
+        buffer.append(line)
+        buffered += len(line)
+        if buffered >= buffer_size:
+            yield b"".join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def write_export_archive(user, target, chunk_size=CHUNK_SIZE):
+    """
+    Writes the NDJSON export of a user, compressed, as `export.ndjson` in a zip file.
+
+    The entry is written as it is produced: neither the export nor the archive is held in
+    memory.
+
+    Args:
+        user (User): The user whose data is exported.
+        target (file): A writable binary file.
+
+    Returns:
+        int: The number of records written.
+    """
+    count = 0
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        with archive.open("export.ndjson", "w", force_zip64=True) as entry:
+            encoder = DjangoJSONEncoder(ensure_ascii=False)
+            for record in export_records(user, chunk_size):
+                entry.write((encoder.encode(record) + "\n").encode())
+                count += 1
+    return count
+
+
+def run_data_export(export_id):
+    """
+    Produces the archive of a DataExport requested by `ExportDataView` (background job).
+
+    The export is claimed with an UPDATE conditional on its "pending" status, so it runs once
+    even if it was submitted twice. The archive is written under MEDIA_ROOT/exports/.
+    """
+    claimed = DataExport.objects.filter(pk=export_id, status=DataExport.PENDING).update(status=DataExport.RUNNING)
+    if not claimed:
+        return
+    export = DataExport.objects.select_related("user").get(pk=export_id)
+    name = f"exports/{export.user_id}/{uuid.uuid4().hex}.zip"
+    path = default_storage.path(name)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as target:
+            records = write_export_archive(export.user, target)
+    except Exception as error:
+        logger.exception("Data export %s failed.", export_id)
+        if os.path.exists(path):
+            os.unlink(path)
+        DataExport.objects.filter(pk=export_id).update(
+            status=DataExport.FAILED, error=str(error), completed_time=timezone.now()
+        )
+        return
+    finished = DataExport.objects.filter(pk=export_id).update(
+        status=DataExport.DONE, file=name, size=os.path.getsize(path), records=records,
+        completed_time=timezone.now(),
+    )
+    if not finished:
+        # Export supprimé pendant l'écriture (effacement des données) : l'archive ne doit pas rester
+        os.unlink(path)
+
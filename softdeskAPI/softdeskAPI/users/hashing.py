@@ -0,0 +1,153 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+DEFAULT_OPTIONS = {
+    # Hachages simultanés ; 0 : dans le thread de la requête, sans limite (comparaison, scripts)
+    "MAX_WORKERS": 2,
+    # Hachages en attente d'un thread ; au-delà, la requête reçoit un 503
+    "MAX_QUEUE": 32,
+    # Attente maximale du résultat, file comprise, en secondes
+    "TIMEOUT": 10,
+    # Valeur de l'en-tête Retry-After des 503, en secondes
+    "RETRY_AFTER": 1,
+}
+
+
+def get_hashing_options():
+    return {**DEFAULT_OPTIONS, **getattr(settings, "PASSWORD_HASHING", {})}
+
+
+class HashingUnavailable(APIException):
+    """
+    Raised when the password hashing pool is saturated; rendered as 503 with Retry-After.
+
+    Outside DRF views (e.g. the admin login), it surfaces as a server error.
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many sign-ins in progress, try again shortly."
+    default_code = "hashing_unavailable"
+
+    def __init__(self, wait):
+        super().__init__()
+        # Lu par le gestionnaire d'exceptions de DRF pour l'en-tête Retry-After
+        self.wait = wait
+
+
+class HashingPool:
+    """
+    Bounded pool of threads computing password hashes, with a bounded queue.
+
+    PBKDF2 (hashlib) releases the GIL: the hashes run in parallel with the other requests
+    of the worker, but never more than `max_workers` at once, so a burst of signups or
+    logins cannot take every CPU of the worker. When `max_workers + max_queue` hashes are
+    already in progress or waiting, new ones are refused at once with `HashingUnavailable`
+    instead of piling up behind the others.
+
+    Args:
+        max_workers (int): Threads computing hashes.
+        max_queue (int): Hashes allowed to wait for a thread.
+        timeout (float): Maximum wait for a result, in seconds.
+        retry_after (int): Seconds suggested to refused clients.
+    """
+
+    def __init__(self, max_workers=2, max_queue=32, timeout=10, retry_after=1):
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hashing")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+
+    @classmethod
+    def from_settings(cls):
+        options = get_hashing_options()
+        return cls(
+            max_workers=options["MAX_WORKERS"],
+            max_queue=options["MAX_QUEUE"],
+            timeout=options["TIMEOUT"],
+            retry_after=options["RETRY_AFTER"],
+        )
+
+    def run(self, func, *args):
+        """
+        Returns `func(*args)`, computed by a thread of the pool.
+
+        Raises:
+            HashingUnavailable: If the pool and its queue are full, or the result takes longer
+            than `timeout`.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise HashingUnavailable(self.retry_after)
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # Le hachage continue et libère sa place en se terminant
+            future.cancel()
+            raise HashingUnavailable(self.retry_after)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = None
+_lock = threading.Lock()
+
+
+def get_hashing_pool():
+    """
+    Returns the process-wide HashingPool, built from the `PASSWORD_HASHING` setting, or None
+    when hashes are computed in the request thread (MAX_WORKERS = 0).
+    """
+    global _pool
+    with _lock:
+        if _pool is None and get_hashing_options()["MAX_WORKERS"]:
+            _pool = HashingPool.from_settings()
+    return _pool
+
+
+def reset_hashing_pool():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+
+
+def run_hashing(func, *args):
+    pool = get_hashing_pool()
+    if pool is None:
+        return func(*args)
+    return pool.run(func, *args)
+
+
+def hash_password(raw_password):
+    """
+    Returns the encoded hash of a password, computed in the hashing pool.
+    """
+    return run_hashing(make_password, raw_password)
+
+
+def verify_password(user, raw_password):
+    """
+    Checks the password of a user in the hashing pool, like `User.check_password`.
+
+    A hash made with an outdated algorithm or iteration count is upgraded, also in the pool,
+    and saved from the calling thread: the pool threads never touch the database.
+
+    Returns:
+        bool: True if the password is correct.
+    """
+    outdated = []
+    valid = run_hashing(check_password, raw_password, user.password, outdated.append)
+    if valid and outdated:
+        user.password = hash_password(raw_password)
+        user.save(update_fields=["password"])
+    return valid
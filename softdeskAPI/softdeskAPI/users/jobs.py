@@ -0,0 +1,58 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OPTIONS = {
+    "MAX_WORKERS": 2,
+    # Exécute les tâches immédiatement, dans le thread appelant (tests, scripts)
+    "EAGER": False,
+}
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_job_options():
+    return {**DEFAULT_OPTIONS, **getattr(settings, "BACKGROUND_JOBS", {})}
+
+
+def get_executor():
+    """
+    Returns the process-wide thread pool running background jobs.
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_job_options()["MAX_WORKERS"], thread_name_prefix="background-job"
+            )
+    return _executor
+
+
+def _run(func, args):
+    # Chaque tâche utilise sa propre connexion, fermée à la fin comme après une requête
+    close_old_connections()
+    try:
+        func(*args)
+    except Exception:
+        logger.exception("Background job %s failed.", func.__name__)
+    finally:
+        close_old_connections()
+
+
+def submit(func, *args):
+    """
+    Runs `func(*args)` in the background once the current transaction commits.
+
+    The job then sees the rows written by the request that submitted it. Jobs are kept in
+    memory: a job not yet started when the process stops is lost, and must be resubmitted.
+    With BACKGROUND_JOBS["EAGER"], the job runs in the calling thread instead.
+    """
+    if get_job_options()["EAGER"]:
+        transaction.on_commit(lambda: func(*args))
+    else:
+        transaction.on_commit(lambda: get_executor().submit(_run, func, args))
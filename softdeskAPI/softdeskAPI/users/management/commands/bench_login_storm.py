@@ -0,0 +1,99 @@
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from users.hashing import get_hashing_options
+
+
+def percentile(values, rank):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[rank - 1]
+
+
+class Command(BaseCommand):
+    """
+    Measures the latency of an unrelated endpoint while a burst of logins is in progress.
+
+    Logins are sent to `/login/` from `--concurrency` threads while one thread requests
+    `--probe-url` in a loop, all in this process through the Django test client. With
+    --compare, the storm is run a second time hashing in the request threads
+    (PASSWORD_HASHING["MAX_WORKERS"] = 0), as before the hashing pool. A temporary user is
+    created in the configured database and deleted at the end.
+    """
+    help = "Benchmarks the p99 latency of an endpoint during a login storm."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=200, help="Logins sent during the storm.")
+        parser.add_argument("--concurrency", type=int, default=16, help="Threads sending logins.")
+        parser.add_argument("--probe-url", default="/consent/", help="Endpoint whose latency is measured.")
+        parser.add_argument("--host", default="localhost", help="Host header, allowed by ALLOWED_HOSTS.")
+        parser.add_argument("--compare", action="store_true", help="Also run with hashing in the request threads.")
+
+    def storm(self, user, password, options):
+        login = {"username": user.username, "password": password}
+        token = f"Bearer {AccessToken.for_user(user)}"
+        done = threading.Event()
+        latencies = []
+
+        def send_login(_):
+            try:
+                return Client(HTTP_HOST=options["host"]).post("/login/", login, content_type="application/json").status_code
+            finally:
+                connections.close_all()
+
+        def probe():
+            client = Client(HTTP_HOST=options["host"], HTTP_AUTHORIZATION=token)
+            try:
+                while not done.is_set():
+                    started = time.perf_counter()
+                    client.get(options["probe_url"])
+                    latencies.append((time.perf_counter() - started) * 1000)
+            finally:
+                connections.close_all()
+
+        prober = threading.Thread(target=probe)
+        prober.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            statuses = list(executor.map(send_login, range(options["logins"])))
+        elapsed = time.perf_counter() - started
+        done.set()
+        prober.join()
+        return statuses, elapsed, latencies
+
+    def report(self, label, statuses, elapsed, latencies):
+        probes = "no probe completed"
+        if latencies:
+            probes = (
+                f"probe p50 {percentile(latencies, 50):.1f} ms, p99 {percentile(latencies, 99):.1f} ms "
+                f"({len(latencies)} requests)"
+            )
+        self.stdout.write(
+            f"{label}: {statuses.count(200)} login(s) ok, {statuses.count(503)} refused (503), "
+            f"{len(statuses) - statuses.count(200) - statuses.count(503)} failed, "
+            f"{len(statuses) / elapsed:.1f} logins/s; {probes}"
+        )
+
+    def handle(self, *args, **options):
+        if options["logins"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--logins and --concurrency must be positive.")
+
+        password = uuid.uuid4().hex
+        user = User.objects.create_user(username=f"bench-{uuid.uuid4().hex[:12]}", password=password)
+        try:
+            runs = [("pool", get_hashing_options())]
+            if options["compare"]:
+                runs.append(("request thread", {**get_hashing_options(), "MAX_WORKERS": 0}))
+            for label, hashing in runs:
+                with override_settings(PASSWORD_HASHING=hashing):
+                    self.report(label, *self.storm(user, password, options))
+        finally:
+            user.delete()
+
@@ -0,0 +1,37 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+from users.erasure import run_erasure
+from users.models import ErasureJob
+
+
+class Command(BaseCommand):
+    """
+    Resumes the erasures of user data interrupted by a restart or an error, from their checkpoint.
+    """
+    help = "Resumes pending, failed or stalled erasure jobs from their last checkpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--job", type=int, help="Only resume this job.")
+        parser.add_argument("--batch-size", type=int, help="Rows per transaction.")
+        parser.add_argument(
+            "--stale-minutes", type=float, default=15,
+            help="Time without progress after which a running job is considered interrupted.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] is not None and options["batch_size"] <= 0:
+            raise CommandError("--batch-size must be positive.")
+        stale = timezone.now() - timedelta(minutes=options["stale_minutes"])
+        # Un job « running » récent est sans doute encore en cours dans un autre processus
+        jobs = ErasureJob.objects.filter(
+            Q(status__in=[ErasureJob.PENDING, ErasureJob.FAILED])
+            | Q(status=ErasureJob.RUNNING, updated_at__lt=stale)
+        )
+        if options["job"] is not None:
+            jobs = jobs.filter(pk=options["job"])
+        resumed = 0
+        for job_id in jobs.order_by("pk").values_list("pk", flat=True):
+            resumed += run_erasure(job_id, resume=True, batch_size=options["batch_size"])
+        self.stdout.write(f"{resumed} erasure job(s) resumed.")
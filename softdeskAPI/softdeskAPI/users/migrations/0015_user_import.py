@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0014_erasure_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('running', 'running'), ('done', 'done'), ('failed', 'failed')], default='pending', max_length=7)),
+                ('format', models.CharField(max_length=6)),
+                ('dry_run', models.BooleanField(default=False)),
+                ('content', models.TextField(blank=True)),
+                ('created', models.PositiveIntegerField(null=True)),
+                ('skipped', models.PositiveIntegerField(null=True)),
+                ('errors', models.JSONField(default=list)),
+                ('error', models.TextField(blank=True)),
+                ('created_time', models.DateTimeField(auto_now_add=True)),
+                ('completed_time', models.DateTimeField(null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_imports', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -32,4 +32,108 @@ class UserConsent(models.Model):
     can_data_be_shared = models.BooleanField(default=False)
 
     def __str__(self):
-        return f"{self.user.username} - {self.consent_type}"
\ No newline at end of file
+        return f"{self.user.username} - {self.consent_type}"
+
+class DataExport(models.Model):
+    """
+    Represents an export of a user's data, produced in the background as a zip archive.
+
+    Attributes:
+        user (User): The user whose data is exported.
+        status (str): "pending", "running", "done" or "failed".
+        file (str): The name of the archive in storage, once done.
+        size (int): The size of the archive, in bytes.
+        records (int): The number of records exported.
+        error (str): The reason of a failure.
+        created_time (datetime): The time the export was requested.
+        completed_time (datetime): The time the export ended.
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = [(PENDING, PENDING), (RUNNING, RUNNING), (DONE, DONE), (FAILED, FAILED)]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="data_exports")
+    status = models.CharField(max_length=7, choices=STATUSES, default=PENDING)
+    file = models.CharField(max_length=255, blank=True)
+    size = models.PositiveBigIntegerField(null=True)
+    records = models.PositiveIntegerField(null=True)
+    error = models.TextField(blank=True)
+    created_time = models.DateTimeField(auto_now_add=True)
+    completed_time = models.DateTimeField(null=True)
+
+
+class ErasureJob(models.Model):
+    """
+    Represents the erasure of a user's personal data, run in the background in batches.
+
+    The job goes through the steps of `users.erasure.STEPS` in order. After each batch it
+    records the step and the last identifier processed, so an interrupted job resumes where
+    it stopped (see the `resume_erasures` command).
+
+    Attributes:
+        user (User): The user whose data is erased.
+        status (str): "pending", "running", "done" or "failed".
+        step (str): The step in progress, or the last one once done.
+        last_id (int): The identifier of the last row processed in the step.
+        processed (int): The number of rows anonymized or deleted so far.
+        error (str): The reason of a failure.
+        created_time (datetime): The time the erasure was requested.
+        updated_at (datetime): The time of the last checkpoint.
+        completed_time (datetime): The time the erasure ended.
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = [(PENDING, PENDING), (RUNNING, RUNNING), (DONE, DONE), (FAILED, FAILED)]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="erasure_jobs")
+    status = models.CharField(max_length=7, choices=STATUSES, default=PENDING)
+    step = models.CharField(max_length=50, blank=True)
+    last_id = models.PositiveBigIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_time = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_time = models.DateTimeField(null=True)
+
+
+class UserImport(models.Model):
+    """
+    Represents a bulk creation of users submitted to the import endpoint, run in the background.
+
+    The file is kept in `content` until the job ends, then cleared: it holds the passwords in
+    clear text.
+
+    Attributes:
+        user (User): The administrator who submitted the file.
+        status (str): "pending", "running", "done" or "failed".
+        format (str): "csv" or "ndjson".
+        dry_run (bool): Whether the rows are only validated.
+        content (str): The submitted file, until the job ends.
+        created (int): The number of users created (or that would be, for a dry run).
+        skipped (int): The number of rows skipped.
+        errors (list): One {"line", "username", "errors"} dict per skipped row.
+        error (str): The reason of a failure.
+        created_time (datetime): The time the import was submitted.
+        completed_time (datetime): The time the import ended.
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = [(PENDING, PENDING), (RUNNING, RUNNING), (DONE, DONE), (FAILED, FAILED)]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="user_imports")
+    status = models.CharField(max_length=7, choices=STATUSES, default=PENDING)
+    format = models.CharField(max_length=6)
+    dry_run = models.BooleanField(default=False)
+    content = models.TextField(blank=True)
+    created = models.PositiveIntegerField(null=True)
+    skipped = models.PositiveIntegerField(null=True)
+    errors = models.JSONField(default=list)
+    error = models.TextField(blank=True)
+    created_time = models.DateTimeField(auto_now_add=True)
+    completed_time = models.DateTimeField(null=True)
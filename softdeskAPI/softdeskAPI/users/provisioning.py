@@ -0,0 +1,361 @@
+import csv
+import io
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from users.models import UserData, UserConsent, UserImport
+
+logger = logging.getLogger(__name__)
+
+CSV = "csv"
+NDJSON = "ndjson"
+FORMATS = [CSV, NDJSON]
+
+DEFAULT_OPTIONS = {
+    # Lignes vérifiées (une requête d'unicité) et insérées (une transaction) ensemble
+    "BATCH_SIZE": 1000,
+    # Processus de hachage de la commande import_users ; None : un par cœur
+    "WORKERS": None,
+    # En deçà, les mots de passe sont hachés dans le processus courant : démarrer un pool coûte plus cher
+    "MIN_POOL_ROWS": 16,
+    # Lignes acceptées par une requête sur l'endpoint d'import
+    "MAX_ROWS": 5000,
+}
+
+FIELDS = [
+    "username", "email", "password", "first_name", "last_name", "date_of_birth",
+    "data_processing_consent", "can_be_contacted", "can_data_be_shared",
+]
+
+MINIMUM_AGE = 15
+
+CONSENT_DETAILS = "Consentement recueilli lors de l'import de l'utilisateur par un administrateur."
+
+
+def get_provisioning_options():
+    return {**DEFAULT_OPTIONS, **getattr(settings, "USER_PROVISIONING", {})}
+
+
+class ProvisioningError(Exception):
+    """
+    Raised when a user file cannot be read at all (unknown format, malformed line).
+    """
+
+
+def read_rows(source, format):
+    """
+    Yields the users of a CSV (with a header line) or NDJSON text file, one dict per row.
+
+    Yields:
+        tuple: (line number, row).
+
+    Raises:
+        ProvisioningError: If the format is unknown, or a line is not a JSON object.
+    """
+    if format == CSV:
+        reader = csv.DictReader(source)
+        for row in reader:
+            yield reader.line_num, row
+    elif format == NDJSON:
+        for number, line in enumerate(source, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as error:
+                raise ProvisioningError(f"Line {number}: invalid JSON ({error}).")
+            if not isinstance(row, dict):
+                raise ProvisioningError(f"Line {number}: expected a JSON object.")
+            yield number, row
+    else:
+        raise ProvisioningError(f"Unknown format \"{format}\", expected one of {', '.join(FORMATS)}.")
+
+
+def _boolean(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in ("1", "true", "yes", "y", "oui")
+
+
+def clean_row(row):
+    """
+    Validates a row like SignupSerializer, except for uniqueness, checked per batch.
+
+    Returns:
+        tuple: (cleaned values, errors as {field: [messages]}).
+    """
+    values = {field: row.get(field) for field in FIELDS}
+    errors = {}
+    for field in ("username", "email", "first_name", "last_name", "password", "date_of_birth"):
+        values[field] = str(values[field] or "")
+        if field != "password":
+            values[field] = values[field].strip()
+    for field in ("username", "email"):
+        if not values[field]:
+            errors[field] = ["This field is required."]
+    values["username"] = User.normalize_username(values["username"])
+    values["email"] = User.objects.normalize_email(values["email"])
+    if values["email"]:
+        try:
+            validate_email(values["email"])
+        except ValidationError as error:
+            errors["email"] = error.messages
+    if len(values["username"]) > User._meta.get_field("username").max_length:
+        errors["username"] = ["Ensure this field has no more than 150 characters."]
+
+    if values["date_of_birth"]:
+        try:
+            born = date.fromisoformat(values["date_of_birth"])
+        except ValueError:
+            errors["date_of_birth"] = ["Expected a YYYY-MM-DD date."]
+        else:
+            today = date.today()
+            age = today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+            if age < MINIMUM_AGE:
+                errors["date_of_birth"] = [f"Users must be at least {MINIMUM_AGE} years old."]
+            values["date_of_birth"] = born
+    else:
+        values["date_of_birth"] = None
+
+    # Sans mot de passe, l'utilisateur le définira par la réinitialisation
+    if values["password"]:
+        try:
+            validate_password(
+                values["password"],
+                User(username=values["username"], email=values["email"],
+                     first_name=values["first_name"], last_name=values["last_name"]),
+            )
+        except ValidationError as error:
+            errors["password"] = error.messages
+
+    for field in ("data_processing_consent", "can_be_contacted", "can_data_be_shared"):
+        values[field] = _boolean(values[field])
+    return values, errors
+
+
+def _setup_worker():
+    # Processus démarrés par "spawn" (macOS, Windows) : Django n'y est pas encore configuré
+    if not settings.configured:
+        django.setup()
+
+
+def _hash(password):
+    return make_password(password or None)
+
+
+class PasswordHasher:
+    """
+    Hashes passwords across a ProcessPoolExecutor, one process per core by default.
+
+    PBKDF2 is CPU-bound: processes use every core, whatever the GIL. Small batches are
+    hashed in the current process. Use as a context manager: the pool is started on the
+    first large batch and stopped on exit.
+
+    Args:
+        workers (int): Processes of the pool; None for one per core.
+        min_pool_rows (int): Batches smaller than this are hashed in the current process.
+    """
+
+    def __init__(self, workers=None, min_pool_rows=16):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_pool_rows = min_pool_rows
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def hash(self, passwords):
+        """
+        Returns the encoded hashes of `passwords`, in order; an empty password gives an
+        unusable one.
+        """
+        if self.workers < 2 or len(passwords) < self.min_pool_rows:
+            return [_hash(password) for password in passwords]
+        if self._executor is None:
+            os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE)
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_setup_worker)
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self._executor.map(_hash, passwords, chunksize=chunksize))
+
+
+class UserProvisioner:
+    """
+    Creates users in batches: one uniqueness query, one parallel hashing pass and one
+    transaction of `bulk_create` (`User`, `UserData`, `UserConsent`) per batch.
+
+    Invalid rows and rows whose username or email is already taken (in the database or
+    earlier in the file) are skipped and reported; the other rows are created.
+
+    Attributes:
+        created (int): Users created so far.
+        errors (list): One {"line", "username", "errors"} dict per skipped row.
+    """
+
+    def __init__(self, hasher, batch_size=1000, dry_run=False):
+        self.hasher = hasher
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.created = 0
+        self.errors = []
+        self._seen_usernames = set()
+        self._seen_emails = set()
+        self._batch = []
+
+    def _reject(self, number, values, errors):
+        self.errors.append({"line": number, "username": values.get("username", ""), "errors": errors})
+
+    def add(self, number, row):
+        values, errors = clean_row(row)
+        if errors:
+            self._reject(number, values, errors)
+            return
+        self._batch.append((number, values))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def _taken(self, batch):
+        usernames = [values["username"] for _, values in batch]
+        emails = [values["email"] for _, values in batch]
+        taken_usernames, taken_emails = set(), set()
+        # Une seule requête par lot pour les deux contraintes, comme les UniqueValidator de l'inscription
+        for username, email in User.objects.filter(Q(username__in=usernames) | Q(email__in=emails)).values_list(
+            "username", "email"
+        ):
+            taken_usernames.add(username)
+            taken_emails.add(email)
+        return taken_usernames, taken_emails
+
+    def _accept(self, batch):
+        taken_usernames, taken_emails = self._taken(batch)
+        accepted = []
+        for number, values in batch:
+            errors = {}
+            if values["username"] in taken_usernames or values["username"] in self._seen_usernames:
+                errors["username"] = ["A user with that username already exists."]
+            if values["email"] in taken_emails or values["email"] in self._seen_emails:
+                errors["email"] = ["This field must be unique."]
+            if errors:
+                self._reject(number, values, errors)
+                continue
+            self._seen_usernames.add(values["username"])
+            self._seen_emails.add(values["email"])
+            accepted.append((number, values))
+        return accepted
+
+    def _insert(self, batch, passwords):
+        users = [
+            User(
+                username=values["username"], email=values["email"], password=password,
+                first_name=values["first_name"], last_name=values["last_name"],
+            )
+            for (_, values), password in zip(batch, passwords)
+        ]
+        with transaction.atomic():
+            # Clés renvoyées par INSERT … RETURNING : les lignes liées sont créées dans la foulée
+            User.objects.bulk_create(users)
+            UserData.objects.bulk_create(
+                UserData(user=user, date_of_birth=values["date_of_birth"])
+                for user, (_, values) in zip(users, batch) if values["date_of_birth"]
+            )
+            UserConsent.objects.bulk_create(
+                UserConsent(
+                    user=user,
+                    consent_type="Import",
+                    details=CONSENT_DETAILS,
+                    data_processing_consent=values["data_processing_consent"],
+                    can_be_contacted=values["can_be_contacted"],
+                    can_data_be_shared=values["can_data_be_shared"],
+                )
+                for user, (_, values) in zip(users, batch)
+            )
+
+    def flush(self):
+        batch, self._batch = self._batch, []
+        batch = self._accept(batch)
+        if not batch:
+            return
+        if self.dry_run:
+            self.created += len(batch)
+            return
+        # Hachage hors transaction : les écritures ne bloquent pas la base pendant le calcul
+        passwords = self.hasher.hash([values["password"] for _, values in batch])
+        try:
+            self._insert(batch, passwords)
+        except IntegrityError:
+            # Inscription concurrente entre la vérification et l'insertion : on revérifie le lot
+            self._seen_usernames.difference_update(values["username"] for _, values in batch)
+            self._seen_emails.difference_update(values["email"] for _, values in batch)
+            by_number = dict(zip((number for number, _ in batch), passwords))
+            batch = self._accept(batch)
+            self._insert(batch, [by_number[number] for number, _ in batch])
+        self.created += len(batch)
+
+
+def provision_users(rows, batch_size=None, workers=None, dry_run=False):
+    """
+    Creates the users of `rows` (as yielded by `read_rows`).
+
+    Args:
+        rows (iterable): (line number, row) pairs.
+        batch_size (int): Rows per uniqueness query and transaction.
+        workers (int): Hashing processes; defaults to USER_PROVISIONING["WORKERS"].
+        dry_run (bool): Validate, but create nothing.
+
+    Returns:
+        UserProvisioner: With the number of users created and the rejected rows.
+    """
+    options = get_provisioning_options()
+    hasher = PasswordHasher(workers or options["WORKERS"], options["MIN_POOL_ROWS"])
+    with hasher:
+        provisioner = UserProvisioner(hasher, batch_size or options["BATCH_SIZE"], dry_run)
+        for number, row in rows:
+            provisioner.add(number, row)
+        provisioner.flush()
+    return provisioner
+
+
+def run_user_import(import_id):
+    """
+    Creates the users of a UserImport submitted to `BulkUserImportView` (background job).
+
+    The import is claimed with an UPDATE conditional on its "pending" status, so it runs once
+    even if it was submitted twice. Passwords are hashed in the job's thread: the process
+    pool of the `import_users` command is never started inside a web worker. The file is
+    cleared when the job ends, whatever its outcome.
+    """
+    claimed = UserImport.objects.filter(pk=import_id, status=UserImport.PENDING).update(status=UserImport.RUNNING)
+    if not claimed:
+        return
+    user_import = UserImport.objects.get(pk=import_id)
+    try:
+        # Un seul processus : le hachage reste dans le thread de la tâche
+        result = provision_users(
+            read_rows(io.StringIO(user_import.content), user_import.format), workers=1, dry_run=user_import.dry_run
+        )
+    except Exception as error:
+        logger.exception("User import %s failed.", import_id)
+        UserImport.objects.filter(pk=import_id).update(
+            status=UserImport.FAILED, content="", error=str(error), completed_time=timezone.now()
+        )
+        return
+    UserImport.objects.filter(pk=import_id).update(
+        status=UserImport.DONE, content="", created=result.created, skipped=len(result.errors),
+        errors=result.errors, completed_time=timezone.now(),
+    )
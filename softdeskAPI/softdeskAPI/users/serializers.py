@@ -1,8 +1,10 @@
 ﻿from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
-from users.models import UserConsent, UserData
+from users.models import UserConsent, UserData, DataExport, ErasureJob, UserImport
+from users.hashing import hash_password
 from datetime import date
 
 """Serializer for user registration."""
@@ -43,7 +45,6 @@ class SignupSerializer(serializers.ModelSerializer):
         }
 
     def validate(self, attrs):
-        print(attrs)
         if attrs["password"] != attrs["password2"]:
             raise serializers.ValidationError({"password": "Password fields did not match."})
 
@@ -71,25 +72,67 @@ class SignupSerializer(serializers.ModelSerializer):
         can_be_contacted = validated_data.pop('can_be_contacted', None)
         can_data_be_shared = validated_data.pop('can_data_be_shared', None)
 
-        user = User.objects.create_user(
-            username=validated_data.get("username"),
-            email=validated_data.get("email"),
-            first_name=validated_data.get("first_name"),
-            last_name=validated_data.get("last_name"),
-        )
-        user.set_password(validated_data.get("password"))
-        user.save()
-
-        if date_of_birth_data:
-            UserData.objects.create(user=user, date_of_birth=date_of_birth_data)
-
-        UserConsent.objects.create(
-            user=user,
-            consent_type="Inscription",
-            details="Consentement donné lors de l'inscription pour le traitement des données.",
-            data_processing_consent=data_processing_consent,
-            can_be_contacted=can_be_contacted,
-            can_data_be_shared=can_data_be_shared
-        )
+        # Hachage dans le pool, avant la transaction : elle ne reste pas ouverte pendant le calcul
+        password = hash_password(validated_data.get("password"))
+
+        # Un seul INSERT de l'utilisateur, déjà muni de son mot de passe, au lieu de create_user + save
+        with transaction.atomic():
+            user = User.objects.create(
+                username=User.normalize_username(validated_data.get("username")),
+                email=User.objects.normalize_email(validated_data.get("email")),
+                first_name=validated_data.get("first_name"),
+                last_name=validated_data.get("last_name"),
+                password=password,
+            )
+
+            if date_of_birth_data:
+                UserData.objects.create(user=user, date_of_birth=date_of_birth_data)
+
+            UserConsent.objects.create(
+                user=user,
+                consent_type="Inscription",
+                details="Consentement donné lors de l'inscription pour le traitement des données.",
+                data_processing_consent=data_processing_consent,
+                can_be_contacted=can_be_contacted,
+                can_data_be_shared=can_data_be_shared
+            )
 
-        return user
\ No newline at end of file
+        return user
+
+
+class DataExportSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the DataExport model.
+
+    Reports the progress of a background export and, once done, the size of its archive.
+    """
+    class Meta:
+        model = DataExport
+        fields = ["id", "status", "size", "records", "error", "created_time", "completed_time"]
+        read_only_fields = fields
+
+
+class ErasureJobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the ErasureJob model.
+
+    Reports the current step of an erasure and the number of rows already processed.
+    """
+    class Meta:
+        model = ErasureJob
+        fields = ["id", "status", "step", "processed", "error", "created_time", "completed_time"]
+        read_only_fields = fields
+
+
+class UserImportSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the UserImport model.
+
+    Reports the progress of a bulk import and, once done, the users created and the rows skipped.
+    """
+    class Meta:
+        model = UserImport
+        fields = [
+            "id", "status", "dry_run", "created", "skipped", "errors", "error", "created_time", "completed_time",
+        ]
+        read_only_fields = fields
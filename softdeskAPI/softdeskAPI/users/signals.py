@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+from users.authentication import get_user_cache, reset_user_cache
+from users.hashing import reset_hashing_pool
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, **kwargs):
+    # Désactivation, changement de mot de passe, anonymisation : l'utilisateur est relu en base.
+    # Invalidé de nouveau au commit : une lecture faite entre-temps voyait encore l'ancienne ligne
+    user_id = getattr(instance, api_settings.USER_ID_FIELD)
+    get_user_cache().invalidate(user_id)
+    transaction.on_commit(lambda: get_user_cache().invalidate(user_id))
+
+
+@receiver(setting_changed)
+def users_setting_changed(sender, setting, **kwargs):
+    if setting == "USER_CACHE":
+        reset_user_cache()
+    if setting == "PASSWORD_HASHING":
+        reset_hashing_pool()
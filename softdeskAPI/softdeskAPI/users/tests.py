@@ -1,3 +1,500 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import types
+import zipfile
+from unittest import mock
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core import serializers
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from projects.models import (
+    Project, Contributor, Issue, Comment, ProjectComment, IssueComment, ProjectActivity, Notification,
+    NotificationOutbox, UploadSession,
+)
+from projects.notifications import drain_outbox
+from users.models import UserConsent, UserData, DataExport, ErasureJob, UserImport
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from users.authentication import CachedJWTAuthentication, get_user_cache
+from users.erasure import REDACTED, run_erasure
+from users.hashing import get_hashing_pool
+from users.provisioning import provision_users
+from users.export import export_ndjson, run_data_export, SECTIONS
 
-# Create your tests here.
+
+def parse_ndjson(content):
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+class ExportDataTest(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, BACKGROUND_JOBS={"EAGER": True})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="testpass")
+        self.other_user = User.objects.create_user(username="bob", password="testpass")
+        UserData.objects.create(user=self.user, date_of_birth="1990-01-01")
+        UserConsent.objects.create(user=self.user, consent_type="inscription", details="RGPD")
+        self.project = Project.objects.create(title="Projet", description="Description", type="BACKEND", author=self.user)
+        assignee = Contributor.objects.create(user=self.other_user, project=self.project)
+        self.issue = Issue.objects.create(
+            title="Issue", desc="Description", tag="BUG", project=self.project, author=self.user, assignee=assignee
+        )
+        Comment.objects.create(issue=self.issue, desc="Mon commentaire", author=self.user)
+        Comment.objects.create(issue=self.issue, desc="Commentaire de Bob", author=self.other_user)
+        self.client.force_authenticate(user=self.user)
+
+    def test_streamed_export(self):
+        response = self.client.get('/export-data/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        records = parse_ndjson(b"".join(response.streaming_content))
+
+        types = [record["type"] for record in records]
+        self.assertEqual(types[0], "export")
+        for expected in ("user", "user_data", "consent", "project", "issue", "comment"):
+            self.assertIn(expected, types)
+        user = next(record["data"] for record in records if record["type"] == "user")
+        self.assertEqual(user["email"], "alice@example.com")
+        self.assertNotIn("password", user)
+        comments = [record["data"]["desc"] for record in records if record["type"] == "comment"]
+        self.assertEqual(comments, ["Mon commentaire"])
+
+    def test_queries_do_not_grow_with_rows(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as context:
+                pieces = list(export_ndjson(self.user, chunk_size=10, buffer_size=256))
+            return len(context), pieces
+
+        small, _ = count_queries()
+        Comment.objects.bulk_create([Comment(issue=self.issue, desc=f"Commentaire {i}", author=self.user) for i in range(50)])
+        large, pieces = count_queries()
+        # Une requête par section, lue par lots de `chunk_size` lignes par le curseur
+        self.assertEqual(large, small)
+        self.assertEqual(large, len(SECTIONS))
+        self.assertGreater(len(pieces), 1)
+
+    def test_background_export(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/export-data/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response["Location"], f"/export-data/{response.data['id']}/")
+
+        status = self.client.get(response["Location"]).data
+        self.assertEqual(status["status"], DataExport.DONE)
+        download = self.client.get(f"{response['Location']}download/")
+        self.assertEqual(download["Content-Type"], "application/zip")
+        with zipfile.ZipFile(io.BytesIO(b"".join(download.streaming_content))) as archive:
+            records = parse_ndjson(archive.read("export.ndjson"))
+        self.assertEqual(len(records), status["records"])
+
+        self.client.force_authenticate(user=self.other_user)
+        self.assertEqual(self.client.get(response["Location"]).status_code, 404)
+        self.assertEqual(self.client.get(f"{response['Location']}download/").status_code, 404)
+
+    def test_failed_export(self):
+        export = DataExport.objects.create(user=self.user)
+        with self.assertLogs("users.export", "ERROR"):
+            with override_settings(MEDIA_ROOT="/dev/null/exports"):
+                run_data_export(export.pk)
+        export.refresh_from_db()
+        self.assertEqual(export.status, DataExport.FAILED)
+        self.assertEqual(self.client.get(f"/export-data/{export.pk}/download/").status_code, 404)
+
+
+@override_settings(BACKGROUND_JOBS={"EAGER": True})
+class ErasureTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="alice", email="alice@example.com", first_name="Alice", last_name="Martin", password="testpass"
+        )
+        self.other_user = User.objects.create_user(username="bob", password="testpass")
+        UserData.objects.create(user=self.user, date_of_birth="1990-01-01")
+        UserConsent.objects.create(user=self.user, consent_type="inscription", details="RGPD")
+        self.project = Project.objects.create(title="Projet", description="Description", type="BACKEND", author=self.other_user)
+        assignee = Contributor.objects.create(user=self.other_user, project=self.project)
+        self.issues = [
+            Issue.objects.create(
+                title=f"Issue {i}", desc="Description", tag="BUG", project=self.project, author=self.user, assignee=assignee
+            )
+            for i in range(3)
+        ]
+        self.comment = Comment.objects.create(issue=self.issues[0], desc="Mon commentaire", author=self.user)
+        self.kept = Comment.objects.create(issue=self.issues[0], desc="Commentaire de Bob", author=self.other_user)
+        ProjectComment.objects.create(project=self.project, desc="Sur le projet", author=self.user)
+        IssueComment.objects.create(issue=self.issues[0], desc="Sur l'issue", author=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def test_delete_erases_in_background(self):
+        version = Project.objects.get(pk=self.project.pk).version
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete('/delete-data/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response["Location"], f"/delete-data/{response.data['id']}/")
+
+        status = self.client.get(response["Location"]).data
+        self.assertEqual(status["status"], ErasureJob.DONE)
+        # 3 issues, 1 commentaire, 1 commentaire de projet, 1 d'issue, les données et le consentement
+        self.assertEqual(status["processed"], 8)
+        self.assertFalse(Issue.objects.filter(author=self.user).exclude(title=REDACTED).exists())
+        self.assertEqual(Comment.objects.get(pk=self.comment.pk).desc, REDACTED)
+        self.assertEqual(Comment.objects.get(pk=self.kept.pk).desc, "Commentaire de Bob")
+        self.assertEqual(ProjectComment.objects.get(author=self.user).desc, REDACTED)
+        self.assertEqual(IssueComment.objects.get(author=self.user).desc, REDACTED)
+        self.assertFalse(UserData.objects.filter(user=self.user).exists())
+        self.assertFalse(UserConsent.objects.filter(user=self.user).exists())
+        self.assertGreater(Project.objects.get(pk=self.project.pk).version, version)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.email, self.user.first_name, self.user.last_name), ("deleted@domain.com", "", ""))
+
+        self.client.force_authenticate(user=self.other_user)
+        self.assertEqual(self.client.get(response["Location"]).status_code, 404)
+
+    def test_no_original_text_survives(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        assignee = Contributor.objects.create(user=self.user, project=self.project)
+        issues_url = f"/projects/{self.project.pk}/issues/"
+        with self.captureOnCommitCallbacks(execute=True):
+            issue_id = self.client.post(issues_url, {
+                "title": "Titre secret", "desc": "Description secrete", "tag": "BUG", "status": "OPEN",
+                "assignee": assignee.pk,
+            }, format="json").data["id"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f"{issues_url}{issue_id}/", {"title": "Titre modifie"}, format="json")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"{issues_url}{self.issues[0].pk}/comments/", {"desc": "Commentaire secret"}, format="json")
+        drain_outbox()
+        # Événement encore dans l'outbox
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"{issues_url}{self.issues[1].pk}/comments/", {"desc": "Second commentaire"}, format="json")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(f"{issues_url}{self.issues[2].pk}/").status_code, 204)
+        # Suppression par un autre membre d'une issue de l'utilisateur
+        ProjectActivity.objects.create(
+            project=self.project, action="delete", target="issue", actor=self.other_user,
+            changes={"title": ["Issue supprimee", None], "author": [self.user.pk, None]},
+        )
+        UploadSession.objects.create(owner=self.user, project=self.project, filename="secret.pdf", name="partial", size=1)
+        self.assertTrue(Notification.objects.exists())
+        self.assertTrue(NotificationOutbox.objects.exists())
+
+        with override_settings(MEDIA_ROOT=media_root):
+            export = DataExport.objects.create(user=self.user)
+            run_data_export(export.pk)
+            archive = os.path.join(media_root, DataExport.objects.get(pk=export.pk).file)
+            self.assertTrue(os.path.exists(archive))
+            self.assertTrue(run_erasure(ErasureJob.objects.create(user=self.user).pk))
+
+        self.assertFalse(os.path.exists(archive))
+        self.assertFalse(DataExport.objects.filter(user=self.user).exists())
+        dump = "".join(
+            serializers.serialize("json", model.objects.all())
+            for model in apps.get_app_config("projects").get_models()
+        )
+        originals = [
+            "Titre secret", "Description secrete", "Titre modifie", "Commentaire secret", "Second commentaire",
+            "Issue 0", "Issue 1", "Issue 2", "Issue supprimee", "Mon commentaire", "Sur le projet", "Sur l'issue",
+            "secret.pdf", "by alice",
+        ]
+        self.assertEqual([text for text in originals if text in dump], [])
+        self.assertIn("Commentaire de Bob", dump)
+
+    def test_notifications_are_matched_on_actor(self):
+        third = User.objects.create_user(username="carol", password="testpass")
+        issue = Issue.objects.create(
+            title="Issue de Bob", desc="Description", tag="BUG", project=self.project, author=self.other_user,
+            assignee=self.issues[0].assignee,
+        )
+        by_alice = Notification.objects.create(
+            user=third, actor=self.user, issue=issue, desc='New comment on issue "Issue de Bob" by alice.'
+        )
+        by_bob = Notification.objects.create(
+            user=third, actor=self.other_user, issue=issue, desc='New issue "Note de alice" by bob.'
+        )
+        # Notifications antérieures au champ actor : seul le texte désigne l'auteur
+        legacy_alice = Notification.objects.create(issue=issue, desc='New issue "Ancienne" by alice.')
+        legacy_bob = Notification.objects.create(user=third, issue=issue, desc='New issue "Ancienne" by bob.')
+        self.assertTrue(run_erasure(ErasureJob.objects.create(user=self.user).pk))
+        self.assertEqual(
+            dict(Notification.objects.filter(issue=issue).values_list("pk", "desc")),
+            {
+                by_alice.pk: REDACTED, by_bob.pk: by_bob.desc,
+                legacy_alice.pk: REDACTED, legacy_bob.pk: legacy_bob.desc,
+            },
+        )
+
+    def test_ongoing_job_is_reused(self):
+        job = ErasureJob.objects.create(user=self.user, status=ErasureJob.RUNNING)
+        response = self.client.delete('/delete-data/')
+        self.assertEqual(response.data["id"], job.pk)
+        self.assertEqual(ErasureJob.objects.count(), 1)
+
+    def test_batches_are_checkpointed(self):
+        job = ErasureJob.objects.create(user=self.user)
+        with override_settings(DATA_ERASURE={"BATCH_SIZE": 2}):
+            with CaptureQueriesContext(connection) as context:
+                self.assertTrue(run_erasure(job.pk))
+        job.refresh_from_db()
+        self.assertEqual(job.status, ErasureJob.DONE)
+        self.assertEqual((job.step, job.processed), ("consent", 8))
+        # Les 3 issues sont traitées en deux lots, chacun suivi de son point de reprise
+        checkpoints = [query for query in context.captured_queries if query["sql"].startswith('UPDATE "users_erasurejob"')]
+        self.assertEqual(len(checkpoints), 7 + 2)
+        # Un job déjà terminé n'est pas relancé
+        self.assertFalse(run_erasure(job.pk))
+
+    def test_interrupted_job_is_resumed(self):
+        # Interrompu après le premier lot d'issues
+        job = ErasureJob.objects.create(
+            user=self.user, status=ErasureJob.RUNNING, step="issue", last_id=self.issues[0].pk, processed=1
+        )
+        ErasureJob.objects.filter(pk=job.pk).update(updated_at="2000-01-01T00:00:00Z")
+        out = io.StringIO()
+        call_command("resume_erasures", batch_size=1, stdout=out)
+        self.assertIn("1 erasure job(s) resumed.", out.getvalue())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed), (ErasureJob.DONE, 8))
+        # Le lot déjà traité n'est pas repris
+        self.assertEqual(Issue.objects.get(pk=self.issues[0].pk).title, "Issue 0")
+        self.assertEqual(Issue.objects.get(pk=self.issues[1].pk).title, REDACTED)
+
+
+class CachedJWTAuthenticationTest(TestCase):
+
+    def setUp(self):
+        get_user_cache().clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="alice", password="testpass")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def get_consents(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/consent/')
+        user_queries = [query for query in context.captured_queries if 'FROM "auth_user"' in query["sql"]]
+        return response, len(user_queries)
+
+    def test_user_is_read_once(self):
+        response, queries = self.get_consents()
+        self.assertEqual((response.status_code, queries), (200, 1))
+        response, queries = self.get_consents()
+        self.assertEqual((response.status_code, queries), (200, 0))
+        self.assertEqual(response.wsgi_request.user, self.user)
+        # Chaque requête reçoit sa propre instance
+        self.assertIsNot(response.wsgi_request.user, self.get_consents()[0].wsgi_request.user)
+
+    def test_invalidated_on_save_and_delete(self):
+        self.get_consents()
+        self.user.is_active = False
+        self.user.save()
+        response, queries = self.get_consents()
+        self.assertEqual((response.status_code, queries), (401, 1))
+
+        self.user.is_active = True
+        self.user.save()
+        self.get_consents()
+        self.user.delete()
+        self.assertEqual(self.get_consents()[0].status_code, 401)
+
+    @override_settings(BACKGROUND_JOBS={"EAGER": True})
+    def test_invalidated_by_delete_data(self):
+        self.get_consents()
+        User.objects.filter(pk=self.user.pk).update(first_name="Alice")
+        response = self.client.delete('/delete-data/')
+        self.assertEqual(response.status_code, 202)
+        response, queries = self.get_consents()
+        self.assertEqual(queries, 1)
+        self.assertEqual(response.wsgi_request.user.first_name, "Alice")
+
+    def test_simplejwt_without_revocation_settings(self):
+        # simplejwt < 5.3 : ni CHECK_USER_IS_ACTIVE, ni CHECK_REVOKE_TOKEN, ni get_md5_hash_password
+        old_settings = types.SimpleNamespace(USER_ID_CLAIM="user_id", USER_ID_FIELD="id")
+        with mock.patch("users.authentication.api_settings", old_settings), \
+                mock.patch("users.authentication.get_md5_hash_password", None):
+            self.get_consents()
+            response, queries = self.get_consents()
+            self.assertEqual((response.status_code, queries), (200, 0))
+            # Le contrôle d'activité s'applique toujours aux utilisateurs en cache
+            self.user.is_active = False
+            with self.assertRaises(AuthenticationFailed):
+                CachedJWTAuthentication()._check_user(self.user, AccessToken.for_user(self.user))
+
+
+SIGNUP = {
+    "username": "carol",
+    "email": "carol@example.com",
+    "password": "Un-mot-de-passe-solide-42",
+    "password2": "Un-mot-de-passe-solide-42",
+    "first_name": "Carol",
+    "last_name": "Dupont",
+    "input_date_of_birth": "1990-01-01",
+    "data_processing_consent": True,
+    "can_be_contacted": False,
+    "can_data_be_shared": False,
+}
+
+
+@override_settings(PASSWORD_HASHING={"MAX_WORKERS": 1, "MAX_QUEUE": 0, "TIMEOUT": 5, "RETRY_AFTER": 3})
+class PasswordHashingPoolTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def block_pool(self):
+        release = threading.Event()
+        started = threading.Event()
+        future = get_hashing_pool().executor.submit(lambda: (started.set(), release.wait(5)))
+        # La place prise dans le pool : la tâche bloquante compte comme un hachage en cours
+        self.assertTrue(get_hashing_pool()._slots.acquire(blocking=False))
+        future.add_done_callback(lambda _: get_hashing_pool()._slots.release())
+        started.wait(5)
+        self.addCleanup(release.set)
+        return release
+
+    def test_signup_writes_user_once(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post('/signup/', SIGNUP, format='json')
+        self.assertEqual(response.status_code, 201)
+        user_writes = [
+            query for query in context.captured_queries
+            if query["sql"].startswith(('INSERT INTO "auth_user"', 'UPDATE "auth_user"'))
+        ]
+        self.assertEqual(len(user_writes), 1)
+        user = User.objects.get(username="carol")
+        self.assertTrue(user.check_password(SIGNUP["password"]))
+        self.assertTrue(UserConsent.objects.filter(user=user).exists())
+
+    def test_login_through_pool(self):
+        User.objects.create_user(username="dave", password="testpass")
+        response = self.client.post('/login/', {"username": "dave", "password": "testpass"}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access", response.data)
+        response = self.client.post('/login/', {"username": "dave", "password": "wrong"}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_saturated_pool_answers_503(self):
+        User.objects.create_user(username="dave", password="testpass")
+        release = self.block_pool()
+        response = self.client.post('/login/', {"username": "dave", "password": "testpass"}, format='json')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "3")
+        response = self.client.post('/signup/', SIGNUP, format='json')
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(User.objects.filter(username="carol").exists())
+
+        release.set()
+        get_hashing_pool().executor.submit(lambda: None).result(5)
+        response = self.client.post('/login/', {"username": "dave", "password": "testpass"}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+
+class LoginStormBenchmarkTest(TransactionTestCase):
+
+    def test_command_reports_probe_latency(self):
+        out = io.StringIO()
+        call_command("bench_login_storm", logins=4, concurrency=2, host="testserver", compare=True, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith("pool: 4 login(s) ok, 0 refused (503), 0 failed"))
+        self.assertIn("p99", lines[1])
+        self.assertFalse(User.objects.exists())
+
+
+def users_csv(count, start=0):
+    lines = ["username,email,password,first_name,last_name,date_of_birth,data_processing_consent,can_be_contacted"]
+    lines += [
+        f"employe{i},employe{i}@example.com,Mot-de-passe-{i}-solide,Prénom,Nom,1990-01-01,true,0"
+        for i in range(start, start + count)
+    ]
+    return "\n".join(lines) + "\n"
+
+
+class BulkUserImportTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username="admin", email="admin@example.com", password="testpass", is_staff=True)
+        User.objects.create_user(username="employe1", email="autre@example.com", password="testpass")
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, "users.csv")
+
+    @override_settings(USER_PROVISIONING={"MIN_POOL_ROWS": 2})
+    def test_command_creates_users_in_batches(self):
+        content = users_csv(12) + "employe2,doublon@example.com,Mot-de-passe-2-solide,,,,,\n" + "sans-email,,x,,,,,\n"
+        with open(self.path, "w", encoding="utf-8") as target:
+            target.write(content)
+        out, err = io.StringIO(), io.StringIO()
+        with CaptureQueriesContext(connection) as context:
+            call_command("import_users", self.path, batch_size=6, workers=2, stdout=out, stderr=err)
+        self.assertIn("11 user(s) created, 3 row(s) skipped", out.getvalue())
+        self.assertIn("Line 3 (employe1): username: A user with that username already exists.", err.getvalue())
+        self.assertIn("Line 14 (employe2): username", err.getvalue())
+        self.assertIn("Line 15 (sans-email): email: This field is required.", err.getvalue())
+
+        # Deux lots de 6 lignes, un INSERT d'utilisateurs chacun ; le troisième, fait du seul doublon, est vide
+        inserts = [query for query in context.captured_queries if query["sql"].startswith('INSERT INTO "auth_user"')]
+        self.assertEqual(len(inserts), 2)
+        user = User.objects.get(username="employe5")
+        self.assertTrue(user.check_password("Mot-de-passe-5-solide"))
+        self.assertEqual(str(user.userdata.date_of_birth), "1990-01-01")
+        self.assertTrue(user.userconsent.data_processing_consent)
+        self.assertFalse(user.userconsent.can_be_contacted)
+
+    def test_dry_run_creates_nothing(self):
+        result = provision_users([(2, {"username": "zoe", "email": "zoe@example.com"})], dry_run=True)
+        self.assertEqual((result.created, result.errors), (1, []))
+        self.assertFalse(User.objects.filter(username="zoe").exists())
+
+    def import_users(self, body, content_type):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/import-users/', body, content_type=content_type)
+        self.assertEqual(response.status_code, 202)
+        return self.client.get(response["Location"]).data
+
+    def test_endpoint_is_admin_only(self):
+        body = users_csv(3, start=10)
+        self.client.force_authenticate(user=User.objects.get(username="employe1"))
+        self.assertEqual(self.client.post('/import-users/', body, content_type="text/csv").status_code, 403)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post('/import-users/', body, content_type="application/json")
+        self.assertEqual(response.status_code, 415)
+        ndjson = "\n".join(
+            json.dumps({"username": f"ndjson{i}", "email": f"ndjson{i}@example.com", "password": "Mot-de-passe-solide"})
+            for i in range(2)
+        )
+        with override_settings(BACKGROUND_JOBS={"EAGER": True}, USER_PROVISIONING={"MIN_POOL_ROWS": 2}), \
+                mock.patch("users.provisioning.ProcessPoolExecutor") as process_pool:
+            self.assertEqual(self.import_users(ndjson, "application/x-ndjson")["created"], 2)
+            result = self.import_users(body, "text/csv")
+            self.assertEqual((result["status"], result["created"]), ("done", 3))
+            # Les mêmes lignes une seconde fois : toutes ignorées
+            result = self.import_users(body, "text/csv")
+            self.assertEqual((result["created"], result["skipped"]), (0, 3))
+        # Pas de pool de processus dans un worker web ; le fichier, mots de passe compris, est effacé
+        process_pool.assert_not_called()
+        self.assertFalse(UserImport.objects.exclude(content="").exists())
+        self.client.force_authenticate(user=User.objects.get(username="employe1"))
+        self.assertEqual(self.client.get(f'/import-users/{UserImport.objects.first().pk}/').status_code, 403)
+        self.client.force_authenticate(user=self.admin)
+
+        with override_settings(USER_PROVISIONING={"MAX_ROWS": 2}):
+            response = self.client.post('/import-users/', users_csv(3, start=20), content_type="text/csv")
+        self.assertEqual(response.status_code, 413)
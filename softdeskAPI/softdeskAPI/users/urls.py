@@ -1,7 +1,10 @@
 ﻿from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.urls import path
-from .views import SignupView, ExportDataView, DeleteDataView, UserConsentView
+from .views import (
+    SignupView, ExportDataView, DataExportDetailView, DataExportDownloadView, DeleteDataView, ErasureJobDetailView,
+    UserConsentView, BulkUserImportView, UserImportDetailView,
+)
 
 from . import views
 
@@ -10,8 +13,13 @@ urlpatterns = [
     path("signup/", SignupView.as_view(), name="signup"),
     path("login/", TokenObtainPairView.as_view(), name="login"),
     path("export-data/", ExportDataView.as_view(), name="export-data"),
+    path("export-data/<int:pk>/", DataExportDetailView.as_view(), name="export-data-detail"),
+    path("export-data/<int:pk>/download/", DataExportDownloadView.as_view(), name="export-data-download"),
     path("delete-data/", DeleteDataView.as_view(), name="delete-data"),
+    path("delete-data/<int:pk>/", ErasureJobDetailView.as_view(), name="delete-data-detail"),
     path("consent/", UserConsentView.as_view(), name="user-consent"),
+    path("import-users/", BulkUserImportView.as_view(), name="import-users"),
+    path("import-users/<int:pk>/", UserImportDetailView.as_view(), name="import-users-detail"),
 ]
 
 
@@ -22,8 +30,9 @@ This module defines the URL patterns for user-related endpoints in the Softdesk
 
 - signup: Endpoint for user registration.
 - login: Endpoint for user login and token generation.
-- export-data: Endpoint for exporting user data.
-- delete-data: Endpoint for deleting user data.
+- export-data: Endpoint for exporting user data (streamed, or as a background archive).
+- delete-data: Endpoint for deleting user data (in a resumable background job).
 - consent: Endpoint for user consent.
+- import-users: Endpoint for creating users in bulk (administrators only, in a background job).
 
 """
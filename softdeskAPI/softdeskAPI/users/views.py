@@ -1,4 +1,6 @@
 # from django.shortcuts import render
+import io
+import itertools
 from django.contrib.auth.models import User
 from rest_framework import generics
 from rest_framework.permissions import AllowAny
@@ -6,9 +8,19 @@ from rest_framework.permissions import AllowAny
 from .serializers import SignupSerializer
 from rest_framework import generics, status
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from .models import UserConsent
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from .models import UserConsent, DataExport, ErasureJob, UserImport
 from rest_framework.views import APIView
+from django.core.files.storage import default_storage
+from django.http import FileResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.http import content_disposition_header
+from .serializers import DataExportSerializer, ErasureJobSerializer, UserImportSerializer
+from .export import export_ndjson, run_data_export
+from .authentication import get_user_cache
+from .erasure import run_erasure
+from .provisioning import CSV, NDJSON, ProvisioningError, get_provisioning_options, read_rows, run_user_import
+from .jobs import submit
 
 
 class SignupView(generics.CreateAPIView):
@@ -35,82 +47,195 @@ class ExportDataView(APIView):
     """
     A view for exporting user data.
 
-    This view allows authenticated users to export their data, including
-    username, email, first name, last name, and any other desired fields.
+    Exports every personal record of the authenticated user: the `User` row (without the
+    password), `UserData`, `UserConsent`, authored projects, contributions, issues, comments,
+    notifications, activity and uploads. See `users.export.SECTIONS`.
 
     Endpoint: /export-data/
-    Method: GET
+    Methods:
+        GET: Streams the export as NDJSON, read from the database in chunks.
+        POST: Starts a background export to a zip archive and returns 202 with its status URL.
     """
 
     def get(self, request):
-            """
-            Retrieve the user's information.
+        """
+        Stream the user's data as NDJSON, one {"type": ..., "data": {...}} object per line.
 
-            Args:
-                request (HttpRequest): The HTTP request object.
+        Args:
+            request (HttpRequest): The HTTP request object.
 
-            Returns:
-                Response: The response containing the user's information.
-            """
-            user = self.request.user
+        Returns:
+            StreamingHttpResponse: The export, produced while it is sent.
+        """
+        user = self.request.user
+        response = StreamingHttpResponse(export_ndjson(user), content_type="application/x-ndjson")
+        response["Content-Disposition"] = content_disposition_header(True, f"export-{user.username}.ndjson")
+        return response
 
-            data = {
-                "username": user.username,
-                "email": user.email,
-                "first_name": user.first_name,
-                "last_name": user.last_name,
-                # "date_of_birth": user.date_of_birth,
-                # ... Add any other fields to export here ...
-            }
+    def post(self, request):
+        """
+        Start a background export of the user's data.
+
+        Returns:
+            Response: 202 with the export status and the URL to poll.
+        """
+        export = DataExport.objects.create(user=self.request.user)
+        submit(run_data_export, export.pk)
+        data = DataExportSerializer(export).data
+        data["url"] = f"/export-data/{export.pk}/"
+        return Response(data, status=status.HTTP_202_ACCEPTED, headers={"Location": data["url"]})
 
-            return Response(data)
+
+class DataExportDetailView(generics.RetrieveAPIView):
+    """
+    API endpoint reporting the status of a background export of the user's data.
+
+    Endpoint: /export-data/<id>/
+    """
+    serializer_class = DataExportSerializer
+
+    def get_queryset(self):
+        return DataExport.objects.filter(user=self.request.user)
+
+
+class DataExportDownloadView(APIView):
+    """
+    API endpoint downloading the zip archive of a completed background export.
+
+    Endpoint: /export-data/<id>/download/
+    """
+
+    def get(self, request, pk):
+        export = get_object_or_404(DataExport, pk=pk, user=request.user, status=DataExport.DONE)
+        return FileResponse(
+            default_storage.open(export.file, "rb"),
+            as_attachment=True,
+            filename=f"export-{request.user.username}.zip",
+            content_type="application/zip",
+        )
 
 
 class DeleteDataView(APIView):
     """
     View for deleting or anonymizing user data.
 
-    This view is used to delete or anonymize all data associated with a user.
-    The user's email, first name, last name, and other fields can be modified
-    to remove personal information. The user can also be permanently deleted
-    by calling the `delete()` method.
+    This view starts an ErasureJob, which anonymizes the issues and comments written by the
+    user and the copies of their text (activity log, notifications, upload file names),
+    deletes their data exports, personal data and consents, then anonymizes the user itself. The job
+    runs in the background, in short batches, so that a user with a large history does not
+    hold the database for the length of the request; it can be resumed after an interruption
+    with the `resume_erasures` command.
 
     Methods:
-    - delete: Deletes or anonymizes user data and returns a success message.
+    - delete: Starts (or returns the ongoing) erasure of the user's data.
 
     Returns:
-    - Response: A response object with a success message and a status code.
+    - Response: 202 with the status of the job and the URL to poll.
     """
     def delete(self, request):
             """
             Delete or anonymize user data.
 
-            This method deletes or anonymizes all data associated with the user.
-            The user's email is set to "deleted@domain.com" and their first name and last name are cleared.
-            Other fields that need to be anonymized should be handled accordingly.
-
-            To permanently delete the user (this action is irreversible), uncomment the line `user.delete()`.
+            The user's email is set to "deleted@domain.com" and their first name and last name are
+            cleared once every other step is done. A second request while a job is pending or
+            running returns that job instead of starting another one.
 
             Returns:
-                A Response object with a message indicating that the user data has been deleted or anonymized successfully.
+                Response: 202 with the erasure status and the URL to poll.
             """
             user = self.request.user
+            # Les requêtes suivantes relisent l'utilisateur, dont les données vont changer
+            get_user_cache().invalidate(user.pk)
+            job = ErasureJob.objects.filter(
+                user=user, status__in=[ErasureJob.PENDING, ErasureJob.RUNNING]
+            ).first()
+            if job is None:
+                job = ErasureJob.objects.create(user=user)
+                submit(run_erasure, job.pk)
 
-            user.email = "deleted@domain.com"
-            user.first_name = ""
-            user.last_name = ""
-            # ... Other fields to be anonymized ...
+            data = ErasureJobSerializer(job).data
+            data["url"] = f"/delete-data/{job.pk}/"
+            return Response(data, status=status.HTTP_202_ACCEPTED, headers={"Location": data["url"]})
 
-            # To permanently delete the user (this action is irreversible):
-            # user.delete()
 
-            user.save()
+class ErasureJobDetailView(generics.RetrieveAPIView):
+    """
+    API endpoint reporting the progress of an erasure of the user's data.
 
+    Endpoint: /delete-data/<id>/
+    """
+    serializer_class = ErasureJobSerializer
+
+    def get_queryset(self):
+        return ErasureJob.objects.filter(user=self.request.user)
+
+
+class BulkUserImportView(APIView):
+    """
+    API endpoint creating users in bulk, for administrators.
+
+    The body is a CSV file with a header line (Content-Type: text/csv) or NDJSON
+    (application/x-ndjson), with the columns of the `import_users` command. Invalid and
+    duplicate rows are skipped and reported; the others are created. With `?dry_run=1`,
+    the rows are only validated.
+
+    The file is checked (format, number of rows) in the request, then the users are created
+    by a background UserImport job: hashing thousands of passwords does not hold the request.
+
+    Endpoint: /import-users/
+    """
+    permission_classes = [IsAdminUser]
+    # Corps lu tel quel : ni JSON ni formulaire
+    parser_classes = []
+
+    FORMATS = {"text/csv": CSV, "application/x-ndjson": NDJSON}
+
+    def post(self, request):
+        """
+        Start a background creation of the users of the request body.
+
+        Returns:
+            Response: 202 with the import status and the URL to poll, 413 above
+            USER_PROVISIONING["MAX_ROWS"] rows, 415 for another content type.
+        """
+        format = self.FORMATS.get(request.content_type.split(";")[0].strip())
+        if format is None:
+            return Response(
+                {"detail": "Expected text/csv or application/x-ndjson."},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+        max_rows = get_provisioning_options()["MAX_ROWS"]
+        dry_run = request.query_params.get("dry_run") in ("1", "true")
+        try:
+            content = request.body.decode("utf-8-sig")
+            rows = list(itertools.islice(read_rows(io.StringIO(content), format), max_rows + 1))
+        except (ProvisioningError, UnicodeDecodeError) as error:
+            return Response({"detail": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > max_rows:
             return Response(
-                {"message": "User data deleted or anonymized successfully."},
-                status=status.HTTP_204_NO_CONTENT,
+                {"detail": f"At most {max_rows} users per request; use the import_users command."},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             )
 
+        user_import = UserImport.objects.create(user=request.user, format=format, dry_run=dry_run, content=content)
+        submit(run_user_import, user_import.pk)
+        data = UserImportSerializer(user_import).data
+        data["url"] = f"/import-users/{user_import.pk}/"
+        return Response(data, status=status.HTTP_202_ACCEPTED, headers={"Location": data["url"]})
+
+
+class UserImportDetailView(generics.RetrieveAPIView):
+    """
+    API endpoint reporting the progress and the result of a bulk import of users.
+
+    Endpoint: /import-users/<id>/
+    """
+    permission_classes = [IsAdminUser]
+    serializer_class = UserImportSerializer
+
+    def get_queryset(self):
+        return UserImport.objects.filter(user=self.request.user)
+
 
 class UserConsentView(generics.ListAPIView):
     """